@@ -2,7 +2,7 @@ from json import JSONEncoder
 from ._version import __version__
 
 from .axisbinding import AxisBinding
-from .core import Interval, Axis
+from .core import Interval, Axis, RegularAxis, PiecewiseRegularAxis
 from .axisbuilder import IntervalBaseAxisBuilder, FixedIntervalAxisBuilder, RollingWindowAxisBuilder, \
     IntervalBaseAxis, FixedIntervalAxis, RollingWindowAxis
 from .timeaxisbuilders import DailyTimeAxisBuilder, WeeklyTimeAxisBuilder, TimeAxisBuilderFromDataTicks, \
@@ -10,6 +10,8 @@ from .timeaxisbuilders import DailyTimeAxisBuilder, WeeklyTimeAxisBuilder, TimeA
     DailyTimeAxis, WeeklyTimeAxis, TimeAxisFromDataTicks, RollingWindowTimeAxis, MonthlyTimeAxis, \
     YearlyTimeAxis
 
+from .weightcache import WeightMatrixCache, WeightMatrixStore
 from .axisremapper import AxisRemapper
+from .streaming import StreamingAxisRemapper
 
 
@@ -4,7 +4,7 @@ from typing import Iterable
 
 import numpy as np
 
-from axisutilities import Axis
+from axisutilities import Axis, RegularAxis
 
 
 class AxisBuilder(metaclass=ABCMeta):
@@ -204,7 +204,7 @@ class IntervalBaseAxisBuilder(AxisBuilder):
                                 "(Iterable)")
 
             data_ticks = (1 - self._fraction) * lower_bound + self._fraction * upper_bound
-            return Axis(lower_bound, upper_bound, data_ticks=data_ticks)
+            return Axis.fromBounds(np.stack((lower_bound, upper_bound)), data_ticks=data_ticks)
 
 
 def IntervalBaseAxis(**kwargs) -> Axis:
@@ -341,14 +341,31 @@ class FixedIntervalAxisBuilder(IntervalBaseAxisBuilder):
                 # this means end, interval, and n_interval are provided
                 self._start = self._end - self._n_interval * self._interval
 
-            lower_bound = self._start + np.arange(self._n_interval, dtype="int64") * self._interval
-            upper_bound = lower_bound + self._interval
+            offset = _regular_data_tick_offset(self._fraction, self._interval, self._start, self._end)
+            if offset is not None:
+                if self._start + self._n_interval * self._interval != self._end:
+                    raise ValueError(f"last element of upper_bound (i.e. "
+                                     f"{self._start + self._n_interval * self._interval}) is not the same as provided "
+                                     f"end (i.e. {self._end}).")
+                return RegularAxis(
+                    start=self._start,
+                    stride=self._interval,
+                    nelem=self._n_interval,
+                    data_tick_offset=offset
+                )
+
+            # the bounds are filled in place; so, the axis stores them without any copy.
+            bounds = np.empty((2, int(self._n_interval)), dtype="int64")
+            lower_bound, upper_bound = bounds[0, :], bounds[1, :]
+            np.multiply(np.arange(self._n_interval, dtype="int64"), self._interval, out=lower_bound)
+            lower_bound += self._start
+            np.add(lower_bound, self._interval, out=upper_bound)
             if upper_bound[-1] != self._end:
                 raise ValueError(f"last element of upper_bound (i.e. {upper_bound[-1]}) is not the same "
                                  f"as provided end (i.e. {self._end}).")
 
             data_ticks = (1 - self._fraction) * lower_bound + self._fraction * upper_bound
-            return Axis(lower_bound, upper_bound, data_ticks=data_ticks)
+            return Axis.fromBounds(bounds, data_ticks=data_ticks.astype("int64"), trusted=self._interval > 0)
 
 
 def FixedIntervalAxis(**kwargs) -> Axis:
@@ -514,19 +531,59 @@ class RollingWindowAxisBuilder(AxisBuilder):
             if self._n_window < 1:
                 raise ValueError("the provided end_date and start_date resulted in 0 n_window.")
 
+            window_length = self._window_size * self._base
+            end = self._start + (self._n_window - 1) * self._base + window_length
+            offset = _regular_data_tick_offset(0.5, window_length, self._start, end)
+            if (offset is not None) and float(self._base).is_integer():
+                return RegularAxis(
+                    start=self._start,
+                    stride=self._base,
+                    nelem=self._n_window,
+                    width=window_length,
+                    data_tick_offset=offset
+                )
+
             lower_bound = self._start + \
                           np.arange(self._n_window, dtype="int64") * self._base
 
-            window_length = self._window_size * self._base
             upper_bound = lower_bound + window_length
             data_tick = 0.5 * (lower_bound + upper_bound)
-            return Axis(
-                lower_bound=lower_bound,
-                upper_bound=upper_bound,
-                data_ticks=data_tick
+
+            # `base` could be fractional; so, the bounds are truncated into the (2, n) array that the axis stores.
+            bounds = np.empty((2, lower_bound.size), dtype="int64")
+            bounds[0, :] = lower_bound
+            bounds[1, :] = upper_bound
+            return Axis.fromBounds(
+                bounds,
+                data_ticks=data_tick.astype("int64"),
+                trusted=self._base > 0
             )
 
 
 def RollingWindowAxis(**kwargs) -> Axis:
     return RollingWindowAxisBuilder(**kwargs).build()
 
+
+def _regular_data_tick_offset(fraction, width, *values) -> (int, None):
+    """
+    The builders calculate the data ticks as `(1 - fraction) * lower_bound + fraction * upper_bound` in floating
+    point. Returns the offset of the data ticks from the lower bounds if that is exactly `lower_bound + offset` for
+    every element, i.e. the fraction is 0, 1, or 0.5 of an even width, and all the `values`, e.g. the start and end, are
+    exactly representable; otherwise, returns `None`, i.e. the axis must be materialized to keep the same data ticks.
+    """
+    fraction = np.asarray(fraction, dtype="float64")
+    if (fraction.size != 1) or (not float(width).is_integer()):
+        return None
+
+    if any((not float(v).is_integer()) or (abs(v) >= 2 ** 52) for v in values):
+        return None
+
+    f = float(fraction.reshape(-1)[0])
+    width = int(width)
+    if f == 0.0:
+        return 0
+    if f == 1.0:
+        return width
+    if (f == 0.5) and (width % 2 == 0):
+        return width // 2
+    return None
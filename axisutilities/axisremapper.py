@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import os
+from collections import deque
+from concurrent.futures import Executor
+from functools import partial
 from typing import Iterable, Callable
 
 import numpy as np
 import dask.array as da
-from numba import prange
-from scipy.sparse import csr_matrix
+from scipy.sparse import csr_matrix, diags
 
-from axisutilities import Axis
+from axisutilities import Axis, RegularAxis
+from axisutilities import daskremap
+from axisutilities.kernels import prange, resolve_engine, regular_parameters, coverage_regular, coverage_numba, \
+    coverage_numpy, weighted_average, reduce_rows, detect_structure, reduce_structured, resolve_block_size, \
+    column_block_indices, trailing_order, shared_executor, NUMBA_AVAILABLE
+from axisutilities.weightcache import WeightMatrixCache, WeightMatrixStore
 
 
 class AxisRemapper:
@@ -25,8 +33,10 @@ class AxisRemapper:
     `AxisRemapper` applies the calculation on multi-dimensional data as well. By default, it assumes that the axis is
     the first dimension. If it is not the case, you could define the axis that that the conversion needs to happen.
 
-    Currently it supports calculating `average`, `minimum`, `maximum`, or any user defined function (any Python
-    Callable object).
+    Currently it supports calculating `average`, `minimum`, `maximum`, `sum`, `count`, variance (`var`), standard
+    deviation (`std`), or any user defined function (any Python Callable object). The built-in reductions are compiled
+    and run in parallel, when numba is available, and are much faster than passing the equivalent function to
+    `apply_function`.
 
     Examples:
 
@@ -148,11 +158,72 @@ class AxisRemapper:
         ...     assure_no_bound_mismatch=False
         ... )
 
+        * Picking the coverage engine: The coverage, i.e. the weight matrix, is calculated in closed form if the
+          source axis has a fixed interval, e.g. those created by `DailyTimeAxisBuilder`. Otherwise, it is calculated
+          using a numba compiled kernel if numba is available, or a vectorized NumPy implementation if not. All of them
+          generate identical results. You could explicitly pick one by passing `coverage_engine` set to "analytic",
+          "numba", "numpy", or "auto" (the default).
+
+        >>> tc = AxisRemapper(from_axis=from_axis, to_axis=to_axis, coverage_engine="numpy")
+
+        * Reusing weight matrices: The weight matrices are kept in a process-wide LRU cache, i.e.
+          `AxisRemapper.weight_cache`, keyed by the content of the bounds of both axes. Hence, creating another
+          `AxisRemapper` for the same pair of axes does not recompute the weight matrix. To bypass the cache pass
+          `use_cache=False`; check `WeightMatrixCache` for further information.
+
+        >>> tc = AxisRemapper(from_axis=from_axis, to_axis=to_axis, use_cache=False)
+
+        * Persisting weight matrices: Optionally, the weight matrices could be stored on disk and memory-mapped back
+          whenever the same pair of axes is seen again, even by another process. To do so, pass `weight_store` set to
+          a `WeightMatrixStore` object or a directory path, or set `AxisRemapper.weight_store` process-wide.
+
+        >>> tc = AxisRemapper(from_axis=from_axis, to_axis=to_axis, weight_store="/scratch/axisutilities_weights")
+
+        * Remapping dask arrays: All the operations accept a `dask.array.Array` as well and return one lazily.
+          The source axis is not rechunked; each chunk of the output depends only on the source chunks that it
+          overlaps, and the built-in reductions are calculated from per-chunk partial results, which are merged as a
+          tree, i.e. `AxisRemapper.dask_split_every` at a time. Hence, a long time series is never loaded into one
+          task.
+
+        >>> import dask.array as da
+        >>> daily_data = da.random.random((14, 1000, 1000), chunks=(7, 500, 500))
+        >>> weekly_avg = ac.average(daily_data)
+        >>> weekly_avg.chunks[0]
+        (1, 1)
+
+        * Bounding the memory: The dimensions other than the source axis are processed in blocks of columns, and
+          written into the output incrementally; hence, the source axis is never moved to the front by copying the
+          entire input. The compiled reductions make no temporaries; so, by default, they process all the columns at
+          once. Otherwise, e.g. `apply_function` or without numba, the block size is picked based on the cache size.
+          The block size could be set explicitly as well:
+
+        >>> ac = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis, block_size=4096)
+        >>> weekly_avg = ac.average(np.random.random((1000, 1000, 14)), dimension=2)
+
+        * Using several threads: The column blocks could be remapped concurrently, by passing `workers`, i.e. the
+          number of threads of a process-wide pool that is shared by all the remappers, or your own
+          `concurrent.futures.Executor` as `executor`. The compiled kernels release the GIL while running on the worker
+          threads, and each column is calculated exactly the same way; so, the results are identical to the serial
+          ones.
+
+        >>> ac = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis, workers=8)
+        >>> weekly_avg = ac.average(np.random.random((14, 1000, 1000)))
+
+        * Chaining remappers: Two `AxisRemapper` objects, e.g. hourly to daily and daily to monthly, could be composed
+          into one, e.g. hourly to monthly, with a single precomputed weight matrix. Check `AxisRemapper.compose` for
+          further information.
+
+        >>> hourly_to_monthly = AxisRemapper.compose(hourly_to_daily, daily_to_monthly)
+
     """
+    weight_cache = WeightMatrixCache()
+    weight_store = None
+    dask_split_every = daskremap.SPLIT_EVERY
+
     @staticmethod
     def _assure_no_bound_missmatch(fromAxis: Axis, toAxis: Axis) -> bool:
-        return  (fromAxis.lower_bound[0, 0] == toAxis.lower_bound[0, 0]) and \
-                (fromAxis.upper_bound[0, -1] == toAxis.upper_bound[0, -1])
+        return  (fromAxis.start == toAxis.start) and \
+                (fromAxis.end == toAxis.end)
 
     def __init__(self, **kwargs) -> None:
         if ("from_axis" in kwargs) and ("to_axis" in kwargs):
@@ -161,14 +232,24 @@ class AxisRemapper:
             if not (isinstance(from_ta, Axis) and isinstance(to_ta, Axis)):
                 raise TypeError("provided from/to_axis must be of type TimeAxis.")
 
-            self._m = to_ta.nelem
-            self._n = from_ta.nelem
-            self._weight_matrix = self._get_coverage_csr_matrix(from_ta, to_ta)
-            self._from_ta = from_ta
-            self._to_ta = to_ta
+            self._set_weight_matrix(
+                from_ta,
+                to_ta,
+                self._get_weight_matrix(
+                    from_ta,
+                    to_ta,
+                    kwargs.get("coverage_engine", "auto"),
+                    bool(kwargs.get("use_cache", True)),
+                    kwargs.get("weight_store", AxisRemapper.weight_store)
+                )
+            )
         else:
             raise ValueError("Not enough information is provided to construct the TimeAxisRemapper.")
 
+        self.block_size = kwargs.get("block_size", None)
+        self.workers = kwargs.get("workers", None)
+        self.executor = kwargs.get("executor", None)
+
         if bool(kwargs.get("assure_no_bound_mismatch", True)) and \
                 (not AxisRemapper._assure_no_bound_missmatch(self._from_ta, self._to_ta)):
             raise ValueError("from- and to-axis cover a different period. Although from- and to-axis could have "
@@ -177,6 +258,23 @@ class AxisRemapper:
                              " on May 6th. If you want to turn this check off, pass an extra arguments, called "
                              "`assure_no_bound_mismatch` and set it to false")
 
+    def _set_weight_matrix(self, from_ta: Axis, to_ta: Axis, weight_matrix: csr_matrix) -> None:
+        self._m = to_ta.nelem
+        self._n = from_ta.nelem
+        self._weight_matrix = weight_matrix
+        self._structure = detect_structure(weight_matrix)
+        self._from_ta = from_ta
+        self._to_ta = to_ta
+
+    @classmethod
+    def _from_weight_matrix(cls, from_ta: Axis, to_ta: Axis, weight_matrix: csr_matrix) -> AxisRemapper:
+        remapper = cls.__new__(cls)
+        remapper._set_weight_matrix(from_ta, to_ta, weight_matrix)
+        remapper.block_size = None
+        remapper.workers = None
+        remapper.executor = None
+        return remapper
+
     @property
     def from_nelem(self):
         return self._n
@@ -193,6 +291,60 @@ class AxisRemapper:
     def to_nelem(self, v):
         pass
 
+    @property
+    def block_size(self) -> (int, None):
+        """
+        The number of columns, i.e. the flattened dimensions other than the source axis, that are processed at once;
+        `None` means that it is picked by `_remap_blockwise`.
+        """
+        return self._block_size
+
+    @block_size.setter
+    def block_size(self, v) -> None:
+        if isinstance(v, str) and (v == "auto"):
+            v = None
+        if v is not None:
+            v = resolve_block_size(v, self._n)
+        self._block_size = v
+
+    @property
+    def workers(self) -> (int, None):
+        """
+        The number of threads that the column blocks are remapped on; `None` or 1 means serially on the calling thread,
+        unless an `executor` is provided.
+        """
+        return self._workers
+
+    @workers.setter
+    def workers(self, v) -> None:
+        if v is not None:
+            if isinstance(v, str) or int(v) < 1:
+                raise ValueError(f"workers must be a positive integer or None; got {v}.")
+            v = int(v)
+        self._workers = v
+
+    @property
+    def executor(self) -> (Executor, None):
+        """
+        The `concurrent.futures.Executor` that the column blocks are submitted to; if `None`, a process-wide thread
+        pool with `workers` threads is used. Check `kernels.shared_executor`.
+        """
+        return self._executor
+
+    @executor.setter
+    def executor(self, v) -> None:
+        if (v is not None) and (not isinstance(v, Executor)):
+            raise TypeError("executor must be of type concurrent.futures.Executor.")
+        self._executor = v
+
+    def _get_executor(self) -> (Executor, int):
+        workers = self._workers
+        if self._executor is not None:
+            return self._executor, (os.cpu_count() or 1) if workers is None else workers
+        if (workers is None) or (workers == 1):
+            return None, 1
+        return shared_executor(workers), workers
+
     @property
     def weights(self) -> csr_matrix:
         return self._weight_matrix.copy()
@@ -218,7 +370,7 @@ class AxisRemapper:
         pass
 
     @staticmethod
-    def _prep_input_data(in_data: Iterable, time_dimension, n) -> (np.ndarray, tuple):
+    def _move_axis_first(in_data: Iterable, time_dimension, n) -> np.ndarray:
         if not isinstance(in_data, Iterable):
             raise TypeError("input data should be an Iterable that can be casted to numpy.ndarray.")
 
@@ -235,71 +387,215 @@ class AxisRemapper:
         if time_dimension != 0:
             in_data_copy = np.moveaxis(in_data_copy, time_dimension, 0)
 
-        trailing_shape = in_data_copy.shape[1:]
-        in_data_copy = in_data_copy.reshape((n, -1))
-
-        return in_data_copy, trailing_shape
+        return in_data_copy
 
     @staticmethod
-    def _prep_output_data( out_data: np.ndarray, time_dimension, trailing_shape: tuple):
-        return np.moveaxis(out_data.reshape((out_data.shape[0], *trailing_shape)), 0, time_dimension)
+    def _remap_blockwise(in_data: Iterable,
+                         weights: csr_matrix,
+                         time_dimension,
+                         block_size,
+                         block_func: Callable,
+                         executor: Executor = None,
+                         workers: int = 1,
+                         out: np.ndarray = None,
+                         compiled: bool = False):
+        """
+        Remaps the data one block of columns at a time, i.e. `block_func(block, out)` is called with each (n, k_b)
+        block of the input and the matching (m, k_b) block of the output, which it must fill. The entire input is
+        never reshaped, nor copied, at once; hence, the temporaries, both here and in `block_func`, are bounded by the
+        block size. Check `kernels.column_block_indices`.
+
+        If `block_size` is `None`, it is picked based on the cache size, unless `compiled` is set, i.e. `block_func`
+        runs a compiled kernel that makes no full size temporaries; then, all the columns are processed at once, since
+        splitting them would only add per-block call overhead.
+
+        The source axis is moved first as a view only, and the other dimensions are walked in the memory order of the
+        input; so, the blocks keep the original strides, e.g. when the source axis is the last dimension, or the input
+        is in Fortran order, and the kernels read each element once, in place.
 
-    def average(self, from_data: Iterable, dimension=0):
-        if isinstance(from_data, Iterable):
-            return self._average(from_data, self._weight_matrix, dimension)
-        elif isinstance(from_data, da.Array):
-            shape = from_data.shape
-            chunksize = from_data.chunksize
-            if shape[dimension] != chunksize[dimension]:
-                new_chunksize = list(chunksize)
-                new_chunksize[dimension] = shape[dimension]
-                from_data = from_data.rechunk(tuple(new_chunksize))
+        If `out` is provided, the blocks are written directly into it; check `_prep_output_buffer`.
 
-            return from_data.map_blocks(self._average, weights=self._weight_matrix, dimension=dimension, dtype=from_data.dtype)
+        If an `executor` is provided, the blocks are submitted to it, at most `2 * workers` at a time. Since the blocks
+        write into disjoint columns of the output, they need no synchronization.
+        """
+        m, n = weights.shape
+        in_data_copy = AxisRemapper._move_axis_first(in_data, time_dimension, n)
+        trailing_shape = in_data_copy.shape[1:]
+        k = int(np.prod(trailing_shape, dtype=np.int64))
+        order = trailing_order(in_data_copy)
+        output = AxisRemapper._prep_output_buffer(out, time_dimension, m, trailing_shape, order)
 
+        # both are walked in the memory order of the input; check `kernels.trailing_order`.
+        in_data_copy = in_data_copy.transpose(order)
+        output_view = output.transpose(order)
+
+        if compiled and (block_size is None):
+            resolved_block_size = max(k, 1)
         else:
-            raise NotImplementedError()
+            resolved_block_size = resolve_block_size(block_size, n)
+        if (executor is not None) and (block_size is None):
+            # there should be enough blocks to keep all the workers busy.
+            resolved_block_size = min(resolved_block_size, max(1, -(-k // workers)))
+
+        blocks = (
+            (block_func, in_data_copy[index].reshape((n, q1 - q0)), output_view[index])
+            for index, q0, q1 in column_block_indices(in_data_copy.shape[1:], resolved_block_size)
+        )
+        if executor is None:
+            for args in blocks:
+                AxisRemapper._fill_block(*args)
+        else:
+            pending = deque()
+            for args in blocks:
+                if len(pending) >= 2 * workers:
+                    pending.popleft().result()
+                pending.append(executor.submit(AxisRemapper._fill_block, *args))
+            for future in pending:
+                future.result()
 
+        return AxisRemapper._prep_output_data(output, time_dimension, trailing_shape) if out is None else out
 
     @staticmethod
-    def _average(from_data: Iterable, weights: csr_matrix, dimension=0) -> np.ndarray:
-        from_data_copy, trailing_shape = AxisRemapper._prep_input_data(from_data, dimension, weights.shape[1])
+    def _fill_block(block_func: Callable, block: np.ndarray, out_block: np.ndarray) -> None:
+        """
+        Calls `block_func` with the (m, k_b) matrix view of `out_block`. If `out_block` could not be viewed as such,
+        e.g. a non-contiguous slice of `out`, or it is not of type float64, the result is calculated into a temporary
+        block and copied into `out_block` afterward.
+        """
+        m = out_block.shape[0]
+        out_matrix = out_block.reshape((m, block.shape[1]))
+        if (out_matrix.dtype != np.float64) or (not np.may_share_memory(out_matrix, out_block)):
+            out_matrix = np.empty((m, block.shape[1]), dtype=np.float64)
+            block_func(block, out_matrix)
+            out_block[...] = out_matrix.reshape(out_block.shape)
+        else:
+            block_func(block, out_matrix)
 
-        nan_mask = np.isnan(from_data_copy)
-        non_nan_mask = np.ones(from_data_copy.shape, dtype=np.int8)
-        non_nan_mask[nan_mask] = 0
-        from_data_copy[nan_mask] = 0
+    @staticmethod
+    def _prep_output_buffer(out: (np.ndarray, None),
+                            time_dimension,
+                            m: int,
+                            trailing_shape: tuple,
+                            order: tuple = None) -> np.ndarray:
+        """
+        Returns the (m, t_1, t_2, ...) array that the output is written into, i.e. `out` with the destination axis
+        moved first (a view, not a copy), or a new array if `out` is `None`, whose memory order follows `order`, i.e.
+        that of the input; check `kernels.trailing_order`.
 
-        inverse_sum_effective_weights = np.reciprocal(weights * non_nan_mask)
+        `out` could be any writable array, e.g. a `numpy.memmap` or a non-contiguous view, whose shape is the same as
+        that of the output, i.e. the input with the source axis replaced by the destination axis.
+        """
+        if out is None:
+            if order is None:
+                return np.empty((m, *trailing_shape), dtype=np.float64)
+            shape = (m, *(trailing_shape[a - 1] for a in order[1:]))
+            return np.empty(shape, dtype=np.float64).transpose(np.argsort(order))
 
-        output = AxisRemapper._prep_output_data(
-            np.multiply(weights * from_data_copy, inverse_sum_effective_weights),
-            dimension,
-            trailing_shape
-        )
+        if not isinstance(out, np.ndarray):
+            raise TypeError("out must be of type numpy.ndarray, e.g. a numpy.memmap.")
+
+        if not out.flags.writeable:
+            raise ValueError("out must be writable.")
 
-        return output
+        expected_shape = list(trailing_shape)
+        expected_shape.insert(time_dimension % (len(trailing_shape) + 1), m)
+        expected_shape = tuple(expected_shape)
+        if (out.shape == (m,)) and (expected_shape == (m, 1)):
+            # one-dimensional input
+            out = out[:, None]
+        if out.shape != expected_shape:
+            raise ValueError(f"out must be of shape {expected_shape}; got {out.shape}.")
 
-    def apply_function(self, from_data: Iterable, func2apply: Callable, dimension=0):
+        return np.moveaxis(out, time_dimension, 0)
 
-        if isinstance(from_data, Iterable):
-            return self._apply_function(from_data, func2apply, self.to_nelem, self._weight_matrix, dimension)
-        elif isinstance(from_data, da.Array):
-            shape = from_data.shape
-            chunksize = from_data.chunksize
-            if shape[dimension] != chunksize[dimension]:
-                new_chunksize = list(chunksize)
-                new_chunksize[dimension] = shape[dimension]
-                from_data = from_data.rechunk(tuple(new_chunksize))
+    @staticmethod
+    def _prep_output_data( out_data: np.ndarray, time_dimension, trailing_shape: tuple):
+        return np.moveaxis(out_data.reshape((out_data.shape[0], *trailing_shape)), 0, time_dimension)
+
+    def average(self, from_data: Iterable, dimension=0, out: np.ndarray = None):
+        """
+        Calculates the coverage weighted average, skipping the missing values, i.e. `NaN`.
+
+        :param out: Optionally, a writable array, e.g. a `numpy.memmap` or a view of a larger array, that the result is
+                    written into, and returned; it must have the same shape as the result. Check `_prep_output_buffer`.
+                    The same applies to all the other operations.
+        """
+        if isinstance(from_data, da.Array):
+            return self._store_dask(self._remap_dask(from_data, dimension, reduction="mean"), out)
+        elif isinstance(from_data, Iterable):
+            return self._average(from_data, self._weight_matrix, dimension, self._structure, self._block_size,
+                                 *self._get_executor(), out)
+        else:
+            raise NotImplementedError()
 
-            return from_data.map_blocks(self._apply_function, func2apply=func2apply, to_nelem=self.to_nelem, weights=self._weight_matrix, dimension=dimension, dtype=from_data.dtype)
+    @staticmethod
+    def _average(from_data: Iterable,
+                 weights: csr_matrix,
+                 dimension=0,
+                 structure=None,
+                 block_size=None,
+                 executor: Executor = None,
+                 workers: int = 1,
+                 out: np.ndarray = None) -> np.ndarray:
+        """
+        Calculates the weighted average in a single pass over the rows of the weight matrix, skipping the missing
+        values, i.e. `NaN`, on the fly. The input data is never modified. Check `kernels.weighted_average`.
+
+        If the weight matrix has a structure that a specialized engine could take advantage of, e.g. hourly to daily
+        or a moving window, that engine is used instead; check `kernels.detect_structure`.
+
+        The data is processed in blocks of `block_size` columns, or all at once by default if numba is available,
+        concurrently if an `executor` is provided; check `_remap_blockwise`.
+        """
+        def block_func(block: np.ndarray, out: np.ndarray) -> None:
+            if (structure is None) or (not reduce_structured("mean", structure, block, out)):
+                weighted_average(weights, block, out)
 
+        return AxisRemapper._remap_blockwise(from_data, weights, dimension, block_size, block_func, executor, workers,
+                                             out, compiled=NUMBA_AVAILABLE)
+
+    def apply_function(self, from_data: Iterable, func2apply: Callable, dimension=0, processes=None,
+                       out: np.ndarray = None):
+        """
+        Applies a user-defined function on the source elements overlapping each destination element; check
+        `_apply_function`.
+
+        :param processes: Optionally, the number of worker processes, or a `concurrent.futures.ProcessPoolExecutor`,
+                          to apply the function on. Python functions hold the GIL; so, unlike the threads of `workers`,
+                          the processes scale them across the cores. The data is shared with the worker processes
+                          through shared memory, rather than being pickled, which requires Python 3.8 or later; check
+                          `processpool`. The worker processes are started with the "spawn" method, which re-imports the
+                          caller's main module; so, the calling script must guard its entry point with
+                          `if __name__ == "__main__":`, otherwise the pool raises `BrokenProcessPool`.
+        """
+        if isinstance(from_data, da.Array):
+            if not isinstance(func2apply, Callable):
+                raise TypeError("func2apply must be a callable object that performs the calculation on axis=0.")
+            return self._store_dask(self._remap_dask(from_data, dimension, func2apply=func2apply), out)
+        elif (processes is not None) and isinstance(from_data, Iterable):
+            if not isinstance(func2apply, Callable):
+                raise TypeError("func2apply must be a callable object that performs the calculation on axis=0.")
+            from axisutilities import processpool
+            in_data = AxisRemapper._move_axis_first(from_data, dimension, self._n)
+            output = AxisRemapper._prep_output_buffer(out, dimension, self._m, in_data.shape[1:])
+            processpool.apply_function(in_data, func2apply, self._weight_matrix, processes, out=output)
+            return AxisRemapper._prep_output_data(output, dimension, in_data.shape[1:]) if out is None else out
+        elif isinstance(from_data, Iterable):
+            return self._apply_function(from_data, func2apply, self.to_nelem, self._weight_matrix, dimension,
+                                        self._block_size, *self._get_executor(), out)
         else:
             raise NotImplementedError()
 
-    
     @staticmethod
-    def _apply_function(data: Iterable, func2apply: Callable, to_nelem: int, weights: csr_matrix, dimension=0):
+    def _apply_function(data: Iterable,
+                        func2apply: Callable,
+                        to_nelem: int,
+                        weights: csr_matrix,
+                        dimension=0,
+                        block_size=None,
+                        executor: Executor = None,
+                        workers: int = 1,
+                        out: np.ndarray = None):
         """
         Applies a user-defined/provided function for the conversion.
 
@@ -310,6 +606,12 @@ class AxisRemapper:
                            missing values properly.
         :param dimension: The dimension where the source axis is. By default, it is assumed that the first dimension
                           is the source axis.
+        :param block_size: The number of columns, i.e. the flattened dimensions other than the source axis, that are
+                           passed to `func2apply` at once; by default, it is picked based on the cache size. Check
+                           `_remap_blockwise`.
+        :param executor: If provided, the blocks are submitted to it, i.e. `func2apply` must be thread-safe.
+        :param workers: The number of workers of `executor`.
+        :param out: If provided, the output is written into it; check `_prep_output_buffer`.
         :return: a data with the same number of dimension of the input, where each element is the result of the user
                  defined function. All the dimensions are the same as the input data except the source axis. The source
                  axis is turned into the destination axis; which means, it's location in the dimension is the same, but
@@ -376,76 +678,302 @@ class AxisRemapper:
             >>> np.max(monthly_cv_using_lambda - monthly_cv)
             0.0
 
+            * Spreading the function over several processes: Pass `processes` to `AxisRemapper.apply_function`, i.e.
+              the number of worker processes or a `ProcessPoolExecutor`. Lambdas work as well:
+
+            >>> monthly_cv_using_processes = ac.apply_function(data, cv, processes=8)
+            >>> np.max(monthly_cv_using_processes - monthly_cv)
+            0.0
+
         """
-        data_copy, trailing_shape = AxisRemapper._prep_input_data(data, dimension, weights.shape[1])
+        if not isinstance(func2apply, Callable):
+            raise TypeError("func2apply must be a callable object that performs the calculation on axis=0.")
 
-        if isinstance(func2apply, Callable):
-            import warnings
-            warnings.filterwarnings("ignore", message="numpy.ufunc size changed")
-            output = _apply_function_core(
-                to_nelem,
-                weights,
-                data_copy,
-                func2apply
-            )
+        import warnings
+        warnings.filterwarnings("ignore", message="numpy.ufunc size changed")
+
+        def block_func(block: np.ndarray, out: np.ndarray) -> None:
+            out[...] = _apply_function_core(to_nelem, weights, block, func2apply)
+
+        return AxisRemapper._remap_blockwise(data, weights, dimension, block_size, block_func, executor, workers, out)
+
+    def min(self, data, dimension=0, out: np.ndarray = None):
+        return self._apply_reduction(data, "min", dimension, out)
+
+    def max(self, data, dimension=0, out: np.ndarray = None):
+        return self._apply_reduction(data, "max", dimension, out)
+
+    def sum(self, data, dimension=0, out: np.ndarray = None):
+        """
+        Calculates the coverage weighted sum, i.e. each source element contributes proportional to the fraction of it
+        that falls within the destination element. Missing values (`NaN`) are skipped; destination elements with no
+        valid values are set to `NaN`.
+        """
+        return self._apply_reduction(data, "sum", dimension, out)
+
+    def count(self, data, dimension=0, out: np.ndarray = None):
+        """
+        Counts the source elements that overlap each destination element and are not missing, i.e. not `NaN`.
+        """
+        return self._apply_reduction(data, "count", dimension, out)
+
+    def var(self, data, dimension=0, out: np.ndarray = None):
+        """
+        Calculates the coverage weighted (population) variance, skipping the missing values (`NaN`).
+        """
+        return self._apply_reduction(data, "var", dimension, out)
+
+    def std(self, data, dimension=0, out: np.ndarray = None):
+        """
+        Calculates the coverage weighted (population) standard deviation, skipping the missing values (`NaN`).
+        """
+        return self._apply_reduction(data, "std", dimension, out)
+
+    def _apply_reduction(self, from_data: Iterable, reduction: str, dimension=0, out: np.ndarray = None):
+        if isinstance(from_data, da.Array):
+            return self._store_dask(self._remap_dask(from_data, dimension, reduction=reduction), out)
+        elif isinstance(from_data, Iterable):
+            return self._reduce(from_data, reduction, self._weight_matrix, dimension, self._structure,
+                                self._block_size, *self._get_executor(), out)
         else:
-            raise TypeError("func2apply must be a callable object that performs the calculation on axis=0.")
+            raise NotImplementedError()
 
-        return AxisRemapper._prep_output_data(
-            output,
+    @staticmethod
+    def _store_dask(result: da.Array, out: (np.ndarray, None)) -> (da.Array, np.ndarray):
+        """
+        Returns the lazy `result` as is if `out` is `None`; otherwise, computes it chunk by chunk directly into `out`.
+        """
+        if out is None:
+            return result
+
+        if not isinstance(out, np.ndarray):
+            raise TypeError("out must be of type numpy.ndarray, e.g. a numpy.memmap.")
+        if not out.flags.writeable:
+            raise ValueError("out must be writable.")
+        target = out
+        if (out.ndim == 1) and (result.shape == (out.shape[0], 1)):
+            # one-dimensional input
+            target = out[:, None]
+        if target.shape != result.shape:
+            raise ValueError(f"out must be of shape {result.shape}; got {out.shape}.")
+
+        da.store(result, target)
+        return out
+
+    def _remap_dask(self, from_data: da.Array, dimension=0, reduction: str = None, func2apply: Callable = None):
+        """
+        Lazily remaps a dask array without rechunking the source axis; check `daskremap.remap`. The output chunks
+        along `dimension` follow the destination elements, and each of them depends only on the source chunks that it
+        overlaps. If a destination element spans many source chunks, their partial results are merged as a tree,
+        `AxisRemapper.dask_split_every` at a time.
+        """
+        return daskremap.remap(
+            from_data,
+            self._weight_matrix,
             dimension,
-            trailing_shape
+            partial(AxisRemapper._remap_block, reduction=reduction, func2apply=func2apply),
+            reduction,
+            self.dask_split_every
         )
 
-    def min(self, data, dimension=0):
-        return self.apply_function(
-            data,
-            lambda e: np.nanmin(e, axis=0),
-            dimension
-        )
+    @staticmethod
+    def _remap_block(from_data: np.ndarray,
+                     weights: csr_matrix,
+                     dimension=0,
+                     reduction: str = None,
+                     func2apply: Callable = None) -> np.ndarray:
+        if reduction is None:
+            return AxisRemapper._apply_function(from_data, func2apply, weights.shape[0], weights, dimension)
+        return AxisRemapper._reduce(from_data, reduction, weights, dimension, detect_structure(weights))
 
-    def max(self, data, dimension=0):
-        return self.apply_function(
-            data,
-            lambda e: np.nanmax(e, axis=0),
-            dimension
-        )
+    @staticmethod
+    def _reduce(from_data: Iterable,
+                reduction: str,
+                weights: csr_matrix,
+                dimension=0,
+                structure=None,
+                block_size=None,
+                executor: Executor = None,
+                workers: int = 1,
+                out: np.ndarray = None) -> np.ndarray:
+        """
+        Applies one of the built-in reductions, i.e. min, max, sum, count, mean, var, or std, compiled over the rows
+        of the weight matrix. Check `kernels.reduce_rows`.
 
+        If the weight matrix has a structure that a specialized engine could take advantage of, e.g. hourly to daily
+        or a moving window, that engine is used instead whenever possible; check `kernels.detect_structure`.
 
+        The data is processed in blocks of `block_size` columns, or all at once by default if numba is available,
+        concurrently if an `executor` is provided; check `_remap_blockwise`.
+        """
+        def block_func(block: np.ndarray, out: np.ndarray) -> None:
+            if (structure is None) or (not reduce_structured(reduction, structure, block, out)):
+                reduce_rows(reduction, weights, block, out)
+
+        return AxisRemapper._remap_blockwise(from_data, weights, dimension, block_size, block_func, executor, workers,
+                                             out, compiled=NUMBA_AVAILABLE)
 
     @staticmethod
-    def _get_coverage_csr_matrix(from_ta: Axis, to_ta: Axis) -> csr_matrix:
-        row_idx, col_idx, weights = AxisRemapper._get_coverage(
-            from_ta.lower_bound, from_ta.upper_bound,
-            to_ta.lower_bound, to_ta.upper_bound
-        )
+    def compose(first: AxisRemapper, second: AxisRemapper) -> AxisRemapper:
+        """
+        Composes two `AxisRemapper` objects, i.e. `first` remapping from axis A to axis B, and `second` remapping from
+        axis B to axis C, into one `AxisRemapper` that remaps directly from axis A to axis C using a single fused
+        weight matrix. Hence, the data is processed in one pass and the intermediate data on axis B is never
+        allocated.
+
+        The fused weight matrix is `second.weights * diag(1 / row_sum(first.weights)) * first.weights`; so, when there
+        are no missing values, `compose(first, second).average(data)` is the same as
+        `second.average(first.average(data))`, up to the floating point round-off. `min` and `max` are exactly the
+        same, since the fused weight matrix covers the same source elements as the two steps together.
+
+        Missing values (`NaN`) are still excluded and the weights are re-normalized over the remaining values;
+        however, the re-normalization happens over the source elements directly. So, if an intermediate element is only
+        partially missing, its remaining source elements are weighted by their own coverage instead of the intermediate
+        element being weighted as a whole. Intermediate elements that are entirely missing are dropped, the same as
+        the two-step remapping.
+
+        :param first: The `AxisRemapper` that is applied first.
+        :param second: The `AxisRemapper` that is applied second. Its from-axis must be the same as the to-axis of
+                       `first`.
+        :return: An `AxisRemapper` from `first.from_axis` to `second.to_axis`.
+
+        Examples:
+            * Composing hourly to daily and daily to weekly remappers:
+
+            >>> from axisutilities import AxisRemapper, FixedIntervalAxisBuilder
+            >>> hourly_axis = FixedIntervalAxisBuilder(start=0, interval=1, n_interval=14 * 24).build()
+            >>> daily_axis = FixedIntervalAxisBuilder(start=0, interval=24, n_interval=14).build()
+            >>> weekly_axis = FixedIntervalAxisBuilder(start=0, interval=7 * 24, n_interval=2).build()
+            >>> hourly_to_weekly = AxisRemapper.compose(
+            ...     AxisRemapper(from_axis=hourly_axis, to_axis=daily_axis),
+            ...     AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis)
+            ... )
+            >>> hourly_to_weekly.average(np.random.random((14 * 24, 10))).shape
+            (2, 10)
+
+        """
+        if not (isinstance(first, AxisRemapper) and isinstance(second, AxisRemapper)):
+            raise TypeError("first and second must be of type AxisRemapper.")
+
+        if (first.to_nelem != second.from_nelem) or \
+                (not np.array_equal(first.to_axis._bounds, second.from_axis._bounds)):
+            raise ValueError("The to-axis of the first AxisRemapper must be the same as the from-axis of the second "
+                             "AxisRemapper.")
+
+        first_weights = first._weight_matrix
+        second_weights = second._weight_matrix
+
+        with np.errstate(divide="ignore"):
+            inverse_row_sum = np.reciprocal(np.asarray(first_weights.sum(axis=1), dtype=np.float64).flatten())
+        inverse_row_sum[np.isinf(inverse_row_sum)] = 0.0
+
+        weight_matrix = csr_matrix(second_weights @ diags(inverse_row_sum) @ first_weights)
+        weight_matrix.eliminate_zeros()
+        weight_matrix.sort_indices()
+
+        return AxisRemapper._from_weight_matrix(first.from_axis, second.to_axis, weight_matrix)
+
+    @classmethod
+    def _get_weight_matrix(cls,
+                           from_ta: Axis,
+                           to_ta: Axis,
+                           engine: str = "auto",
+                           use_cache: bool = True,
+                           weight_store: (WeightMatrixStore, str, None) = None) -> csr_matrix:
+        resolve_engine(engine)
+        use_cache = use_cache and cls.weight_cache.enabled
+
+        if isinstance(weight_store, str):
+            weight_store = WeightMatrixStore(weight_store)
+        elif (weight_store is not None) and (not isinstance(weight_store, WeightMatrixStore)):
+            raise TypeError("weight_store must be None, a path, or a WeightMatrixStore object.")
+
+        key = WeightMatrixCache.make_key(from_ta, to_ta) if (use_cache or (weight_store is not None)) else None
+
+        weight_matrix = cls.weight_cache.get(key) if use_cache else None
+        if weight_matrix is not None:
+            return weight_matrix
+
+        store_key = None
+        if weight_store is not None:
+            store_key = WeightMatrixStore.format_key(key)
+            weight_matrix = weight_store.load(store_key)
+
+        if weight_matrix is None:
+            weight_matrix = cls._get_coverage_csr_matrix(from_ta, to_ta, engine)
+            if weight_store is not None:
+                weight_store.save(store_key, weight_matrix)
+
+        if use_cache:
+            cls.weight_cache.put(key, weight_matrix)
+
+        return weight_matrix
+
+    @staticmethod
+    def _get_coverage_csr_matrix(from_ta: Axis, to_ta: Axis, engine: str = "auto") -> csr_matrix:
+        if isinstance(from_ta, RegularAxis) and (engine in ("auto", "analytic")):
+            # the parameters are used as is; so, the source bounds are neither generated nor checked for regularity.
+            row_idx, col_idx, weights = coverage_regular(
+                from_ta.start, from_ta.stride, from_ta.width, from_ta.nelem,
+                to_ta.lower_bound[0, :], to_ta.upper_bound[0, :]
+            )
+        else:
+            row_idx, col_idx, weights = AxisRemapper._get_coverage_coo(
+                from_ta.lower_bound, from_ta.upper_bound,
+                to_ta.lower_bound, to_ta.upper_bound,
+                engine
+            )
         m = to_ta.nelem
         n = from_ta.nelem
-        weights = csr_matrix((weights, (row_idx, col_idx)), shape=(m, n)).tolil()
-        # with np.errstate(divide='ignore'):
-        #     row_sum_reciprocal = np.reciprocal(np.asarray(weights.sum(axis=1)).flatten())
-        # mask = np.isinf(row_sum_reciprocal)
-        # row_sum_reciprocal[mask] = 0.0
-        # inverse_row_sum = spdiags(row_sum_reciprocal, 0, m, m)
-        #
-        # normalized_weights = (inverse_row_sum * weights).tolil()
-        # normalized_weights[mask, 0] = np.nan
-        #
-        # return normalized_weights.tocsr()
-
-        mask = np.asarray(weights.sum(axis=1)).flatten() == 0
-        weights[mask, 0] = np.nan
-        return weights.tocsr()
+
+        # The triplets are sorted by row and then by column; hence, the CSR matrix is built directly. The rows that
+        # are not covered at all are simply left empty, and the kernels set them to NaN; check `kernels.reduce_rows`.
+        indptr = np.zeros(m + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_idx, minlength=m), out=indptr[1:])
+        return csr_matrix((weights, col_idx, indptr), shape=(m, n))
 
     @staticmethod
     def _get_coverage(
             from_lower_bound: np.ndarray,
             from_upper_bound: np.ndarray,
             to_lower_bound: np.ndarray,
-            to_upper_bound: np.ndarray):
-        m = to_lower_bound.size
-        n = from_lower_bound.size
+            to_upper_bound: np.ndarray,
+            engine: str = "auto") -> (list, list, list):
+        """
+        Returns the coverage of the destination axis by the source axis as three lists, i.e. the row indices
+        (destination elements), the column indices (source elements), and the fraction of each source element that
+        falls within the destination element. The triplets are ordered by row and then by column.
+
+        See `_get_coverage_coo` for the array based version that is used internally.
+        """
+        row_idx, col_idx, weights = AxisRemapper._get_coverage_coo(
+            from_lower_bound, from_upper_bound,
+            to_lower_bound, to_upper_bound,
+            engine
+        )
+        return row_idx.tolist(), col_idx.tolist(), weights.tolist()
 
+    @staticmethod
+    def _get_coverage_coo(
+            from_lower_bound: np.ndarray,
+            from_upper_bound: np.ndarray,
+            to_lower_bound: np.ndarray,
+            to_upper_bound: np.ndarray,
+            engine: str = "auto") -> (np.ndarray, np.ndarray, np.ndarray):
+        """
+        Calculates the coverage triplets, i.e. `(row_idx, col_idx, weights)`, using a sorted sweep over the source
+        axis. Since the source lower bounds are monotonically increasing, the source elements overlapping a destination
+        element form a contiguous range, which is found using `searchsorted`; hence, only the overlapping pairs are
+        visited and the overall cost is O((m + n) log(n) + nnz) instead of O(mn).
+
+        If the source axis is regular, i.e. `lower_bound[i] = start + i * stride` and `upper_bound[i] = lower_bound[i]
+        + width`, the overlapping ranges are calculated in closed form instead; see `kernels.coverage_regular`.
+
+        :param engine: one of "auto", "numba", "numpy", or "analytic". "auto" uses the closed form calculation if the
+                       source axis is regular, and otherwise the numba compiled kernel if numba is available, and the
+                       vectorized NumPy implementation if not. "analytic" requires the source axis to be regular. All of
+                       them return identical triplets.
+        """
         # basic sanity checks:
         if (to_lower_bound.ndim != 2) or (to_lower_bound.shape[0] != 1):
             raise ValueError(f"to_lower_bound must be of shape (1,m), it's current shape is: {to_lower_bound.shape}.")
@@ -459,56 +987,44 @@ class AxisRemapper:
         if from_lower_bound.shape != from_upper_bound.shape:
             raise ValueError("from_lower_bound/upper_bound must have the same shape.")
 
-        # if np.any(from_lower_bound[0, :-1] > from_lower_bound[0, 1:]):
-        #     raise ValueError("from_lower_bound must be monotonically increasing.")
+        from_lb = from_lower_bound[0, :]
+        from_ub = from_upper_bound[0, :]
+        to_lb = to_lower_bound[0, :]
+        to_ub = to_upper_bound[0, :]
+
+        if np.any(from_lb[:-1] > from_lb[1:]):
+            raise ValueError("from_lower_bound must be monotonically increasing.")
 
-        # TODO: turn this into cython so that is faster and/or use some sort of data structure to
-        #       reduce its time-complexity from O(mn)
         # TODO: Move this to Interval; From OOP stand point it makes more sense to have some of these functionalities
         #       as part of that class/object.
-        row_idx = []
-        col_idx = []
-        weights = []
-        for r in range(m):
-            toLB = to_lower_bound[0, r]
-            toUB = to_upper_bound[0, r]
-            for c in range(n):
-                fromLB = from_lower_bound[0, c]
-                fromUB = from_upper_bound[0, c]
-                fromLength = fromUB - fromLB
-
-                if (fromUB <= toLB) or (fromLB >= toUB):  # No coverage
-                    continue
-                elif (fromLB <= toLB) and (fromUB >= toLB) and (fromUB <= toUB):
-                    row_idx.append(r)
-                    col_idx.append(c)
-                    weights.append((fromUB - toLB) / fromLength)
-                elif (fromLB >= toLB) and (fromLB < toUB) and (fromUB >= toUB):
-                    row_idx.append(r)
-                    col_idx.append(c)
-                    weights.append((toUB - fromLB) / fromLength)
-                elif (fromLB >= toLB) and (fromUB <= toUB):
-                    row_idx.append(r)
-                    col_idx.append(c)
-                    weights.append(1.0)
-                elif (fromLB <= toLB) and (fromUB >= toUB):
-                    row_idx.append(r)
-                    col_idx.append(c)
-                    weights.append((toUB - toLB) / fromLength)
-
-        return row_idx, col_idx, weights
+        if engine in ("auto", "analytic"):
+            from_parameters = regular_parameters(from_lb, from_ub)
+            if from_parameters is not None:
+                return coverage_regular(*from_parameters, from_lb.size, to_lb, to_ub)
+            elif engine == "analytic":
+                raise ValueError("analytic engine requires a regular from-axis, i.e. one with a fixed interval.")
+
+        if resolve_engine(engine) == "numba":
+            return coverage_numba(
+                np.ascontiguousarray(from_lb), np.ascontiguousarray(from_ub),
+                np.ascontiguousarray(to_lb), np.ascontiguousarray(to_ub)
+            )
+
+        return coverage_numpy(from_lb, from_ub, to_lb, to_ub)
 
 
 # @jit(parallel=True, forceobj=True, cache=True)
 # @autojit
 def _apply_function_core(n: int, _weight_matrix: csr_matrix, data_copy: np.ndarray, func: Callable) -> np.ndarray:
+    # The rows that are not covered, i.e. the empty ones, are left as NaN.
     output = np.full((n, data_copy.shape[1]), np.nan)
+    indptr = _weight_matrix.indptr
+    indices = _weight_matrix.indices
     for r in prange(n):
-        start = _weight_matrix.indptr[r]
-        end = _weight_matrix.indptr[r + 1]
-        if not (np.isnan(_weight_matrix[r, 0]) and ((end - start) == 1)):
-            row_mask = _weight_matrix.indices[start:end]
-            output[r, :] = func(data_copy[row_mask, :])
+        start = indptr[r]
+        end = indptr[r + 1]
+        if end > start:
+            output[r, :] = func(data_copy[indices[start:end], :])
     return output
 
 
@@ -2,12 +2,13 @@ from __future__ import annotations
 import json
 
 from datetime import datetime
-from typing import Iterable, Dict
+from typing import Iterable, Dict, Sequence
 
 import numpy as np
 
 from axisutilities import AxisBinding
 from axisutilities.constants import SECONDS_TO_MICROSECONDS_FACTOR
+from axisutilities.kernels import locate_bounds, locate_runs, regular_parameters
 
 
 class Interval:
@@ -196,16 +197,59 @@ class Axis:
             - ``data_ticks``:
             - ``binding``:
         """
+        self._initialize(Axis._create_bounds(lower_bound, upper_bound), False, **kwargs)
+
+    @classmethod
+    def fromBounds(cls, bounds: np.ndarray, trusted: bool = False, **kwargs) -> Axis:
+        """
+        Creates an `Axis` from a (2, n) array holding the lower bounds in its first row and the upper bounds in its
+        second row. The bounds are copied, unless `trusted` is set and `bounds` is a C-contiguous array of type int64;
+        then, it is stored as is, and so, it must not be modified afterward. The builders use this to create large
+        axes without any intermediate copy.
+
+        :param bounds: The (2, n) lower/upper bounds; check `Axis.__init__`.
+        :param trusted: If `True`, the sanity checks, e.g. making sure the lower bounds are monotonically increasing,
+                        are skipped, and `bounds` is not copied; use it only if the bounds and the data ticks are known
+                        to be valid, and are not modified afterward, e.g. they are generated by a builder.
+        :param kwargs: One of the `fraction`, `data_ticks`, or `binding`; check `Axis.__init__`.
+        :return: An `Axis` object.
+
+        examples:
+            * Creating an hourly axis with ten million elements:
+
+            >>> import numpy as np
+            >>> from axisutilities import Axis
+            >>> bounds = np.empty((2, 10_000_000), dtype=np.int64)
+            >>> bounds[0, :] = np.arange(10_000_000) * 3600
+            >>> bounds[1, :] = bounds[0, :] + 3600
+            >>> axis = Axis.fromBounds(bounds, binding="middle", trusted=True)
+        """
+        bounds = np.asarray(bounds)
+        if (bounds.ndim != 2) or (bounds.shape[0] != 2):
+            raise ValueError("bounds must be of shape (2, n).")
+
+        if trusted:
+            bounds = np.ascontiguousarray(bounds, dtype=np.int64)
+        else:
+            bounds = np.array(bounds, dtype=np.int64, order="C")
+            Axis._bounds_sanity_check(bounds)
+
+        axis = cls.__new__(cls)
+        axis._initialize(bounds, bool(trusted), **kwargs)
+        return axis
+
+    def _initialize(self, bounds: np.ndarray, trusted: bool, **kwargs) -> None:
         # making sure at there is only one of the "fraction", "data_ticks", or "binding" are provided.
         if sum(list(map(lambda e: 1 if e in kwargs else 0, ['fraction', 'data_ticks', 'binding']))) != 1:
             raise ValueError("You must provide exactly just one of the 'fraction', 'data_ticks', or 'binding'.")
 
-        self._bounds = Axis._create_bounds(lower_bound, upper_bound)
+        self._bounds = bounds
         self._nelem = self._bounds.shape[1]
 
         if "fraction" in kwargs:
-            self._fraction = np.asarray(kwargs["fraction"], dtype="float64").reshape((1, -1))
-            Axis._fraction_sanity_check(self._fraction)
+            self._fraction = np.array(kwargs["fraction"], dtype="float64").reshape((1, -1))
+            if not trusted:
+                Axis._fraction_sanity_check(self._fraction)
             if (self._fraction.size != 1) and (self._fraction.size != self._nelem):
                 raise ValueError("Fraction must be either a single number, or as many as there "
                                  "upper/lower bound values.")
@@ -213,20 +257,26 @@ class Axis:
             self._data_ticks = Axis._calculate_data_ticks_fromFraction(
                 self._bounds[0, :],
                 self._bounds[1, :],
-                self._fraction
+                self._fraction,
+                trusted
             )
             self._binding = Axis._get_binding(self._fraction)
 
         if "data_ticks" in kwargs:
-            self._data_ticks = np.asarray(kwargs["data_ticks"], dtype="int64").reshape((1, -1))
-            Axis._data_ticks_sanity_check(self._data_ticks)
+            self._data_ticks = (
+                np.asarray(kwargs["data_ticks"], dtype="int64") if trusted
+                else np.array(kwargs["data_ticks"], dtype="int64")
+            ).reshape((1, -1))
+            if not trusted:
+                Axis._data_ticks_sanity_check(self._data_ticks)
             if self._data_ticks.size != self._nelem:
                 raise ValueError("Data Ticks must have as many elements as there are lower/upper bound values.")
 
             self._fraction = Axis._calculate_fraction_from_data_ticks(
                 self._bounds[0, :],
                 self._bounds[1, :],
-                self._data_ticks
+                self._data_ticks,
+                trusted
             )
 
             self._binding = Axis._get_binding(self._fraction)
@@ -240,12 +290,26 @@ class Axis:
             self._data_ticks = Axis._calculate_data_ticks_fromFraction(
                 self._bounds[0, :],
                 self._bounds[1, :],
-                self._fraction
+                self._fraction,
+                trusted
             )
 
         if self._binding in (AxisBinding.BEGINNING, AxisBinding.MIDDLE, AxisBinding.END):
             self._fraction = np.asarray([self._fraction[0][0]], dtype="float64").reshape((1, -1))
 
+        # The arrays are stored as read-only views; so, the accessors could hand them out without copying. The views
+        # leave the flags of the arrays that are passed in, e.g. to `fromBounds`, untouched; those arrays are copied
+        # unless trusted, so that the views never change under the user.
+        self._bounds = Axis._read_only(self._bounds)
+        self._data_ticks = Axis._read_only(self._data_ticks)
+        self._fraction = Axis._read_only(self._fraction)
+
+    @staticmethod
+    def _read_only(array: np.ndarray) -> np.ndarray:
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
     def asDict(self) -> Dict:
         """
         returns the current axis object as a python dictionary.
@@ -349,6 +413,78 @@ class Axis:
         else:
             raise TypeError("item must be an integer")
 
+    def locate(self, values, out: np.ndarray = None) -> np.ndarray:
+        """
+        Finds the index of the element containing each value, i.e. `lower_bound[i] <= value < upper_bound[i]`. The
+        values that are outside the axis, or fall in a gap between its elements, get -1. If the elements overlap,
+        e.g. a rolling window axis, the last element whose lower bound is at or before the value is picked.
+
+        The lookup is vectorized, i.e. no `Interval` is created, and runs in parallel if numba is available. A
+        `RegularAxis` or a `PiecewiseRegularAxis` calculates the index in closed form, without generating its bounds.
+
+        :param values: The values to locate, in the same unit as the bounds, i.e. microseconds for a time axis; or
+                       `numpy.datetime64` values (or `datetime` objects), which are converted to microseconds since
+                       the epoch. `NaN` and `NaT` get -1.
+        :param out: Optionally, an int64 array of the same shape as `values` to write the indices into.
+        :return: The int64 indices, of the same shape as `values`.
+
+        examples:
+            * Locating a few time stamps on a daily axis:
+
+            >>> import numpy as np
+            >>> from datetime import date
+            >>> from axisutilities import DailyTimeAxisBuilder
+            >>> axis = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=7).build()
+            >>> axis.locate(np.array(["2018-12-31T23:00", "2019-01-01T06:00", "2019-01-03"], dtype="datetime64"))
+            array([-1,  0,  2])
+        """
+        values = Axis._as_timestamps(values)
+        if out is None:
+            result = np.empty(values.shape, dtype=np.int64)
+        else:
+            if not isinstance(out, np.ndarray):
+                raise TypeError("out must be of type numpy.ndarray.")
+            if (out.dtype != np.int64) or (out.shape != values.shape) or (not out.flags.writeable):
+                raise ValueError(f"out must be a writable int64 array of shape {values.shape}.")
+            result = out if out.flags.c_contiguous else np.empty(values.shape, dtype=np.int64)
+
+        self._locate(np.ascontiguousarray(values).reshape((-1,)), result.reshape((-1,)))
+
+        if (out is not None) and (result is not out):
+            out[...] = result
+            return out
+        return result
+
+    def _locate(self, values: np.ndarray, out: np.ndarray) -> None:
+        locate_bounds(self._bounds[0, :], self._bounds[1, :], values, out)
+
+    @staticmethod
+    def _as_timestamps(values) -> np.ndarray:
+        """
+        Converts the values passed to `locate` to int64. Since the bounds are integers, flooring the floating point
+        values does not change which element they fall in.
+        """
+        values = np.asarray(values)
+        if values.dtype.kind == "O":
+            values = values.astype("datetime64[us]")
+
+        if values.dtype.kind == "M":
+            return values.astype("datetime64[us]").view(np.int64)
+
+        if values.dtype.kind == "f":
+            int64 = np.iinfo(np.int64)
+            timestamps = np.array(values, dtype=np.float64)
+            np.floor(timestamps, out=timestamps)
+            # NaN is mapped to the smallest int64, i.e. before any element, just like NaT.
+            np.nan_to_num(timestamps, copy=False, nan=int64.min)
+            np.clip(timestamps, float(int64.min), 2.0 ** 63 - 1024, out=timestamps)
+            return timestamps.astype(np.int64)
+
+        if values.dtype.kind in "iub":
+            return values.astype(np.int64, copy=False)
+
+        raise TypeError(f"values must be numbers or datetime64; got {values.dtype}.")
+
     def adjust_binding_to(self, **kwargs) -> Axis:
         if len(kwargs) == 1:
             if "fraction" in kwargs:
@@ -373,7 +509,10 @@ class Axis:
 
     @property
     def lower_bound(self) -> np.ndarray:
-        return self._bounds[0, :].copy().reshape((1, -1))
+        """
+        The (1, n) lower bounds, as a read-only view, i.e. no copy is made; use `.copy()` to get a writable array.
+        """
+        return self._bounds[0, :].reshape((1, -1))
 
     @lower_bound.setter
     def lower_bound(self, v) -> None:
@@ -381,15 +520,43 @@ class Axis:
 
     @property
     def upper_bound(self) -> np.ndarray:
-        return self._bounds[1, :].copy().reshape((1, -1))
+        """
+        The (1, n) upper bounds, as a read-only view; check `lower_bound`.
+        """
+        return self._bounds[1, :].reshape((1, -1))
 
     @upper_bound.setter
     def upper_bound(self, v) -> None:
         pass
 
+    @property
+    def start(self) -> int:
+        """
+        The lower bound of the first element.
+        """
+        return int(self._bounds[0, 0])
+
+    @start.setter
+    def start(self, v) -> None:
+        pass
+
+    @property
+    def end(self) -> int:
+        """
+        The upper bound of the last element.
+        """
+        return int(self._bounds[1, -1])
+
+    @end.setter
+    def end(self, v) -> None:
+        pass
+
     @property
     def fraction(self) -> np.ndarray:
-        return self._fraction.copy()
+        """
+        The fraction(s), as a read-only view; check `lower_bound`.
+        """
+        return self._fraction.view()
 
     @fraction.setter
     def fraction(self, v) -> None:
@@ -397,7 +564,10 @@ class Axis:
 
     @property
     def data_ticks(self) -> np.ndarray:
-        return self._data_ticks.copy()
+        """
+        The (1, n) data ticks, as a read-only view; check `lower_bound`.
+        """
+        return self._data_ticks.view()
 
     @data_ticks.setter
     def data_ticks(self, v) -> None:
@@ -419,7 +589,24 @@ class Axis:
 
     @staticmethod
     def _create_bounds(lower_bound: Iterable[float], upper_bound: Iterable[float]) -> np.ndarray:
-        _bounds = np.asarray([list(lower_bound), list(upper_bound)], dtype="int64")
+        # NumPy arrays, lists, ... are converted as a whole; only the other iterables, e.g. generators, are turned into
+        # lists first.
+        lower_bound = np.asarray(
+            lower_bound if isinstance(lower_bound, (np.ndarray, Sequence)) else list(lower_bound),
+            dtype="int64"
+        ).reshape((-1,))
+        upper_bound = np.asarray(
+            upper_bound if isinstance(upper_bound, (np.ndarray, Sequence)) else list(upper_bound),
+            dtype="int64"
+        ).reshape((-1,))
+        if lower_bound.size != upper_bound.size:
+            raise ValueError("lower_bound and upper_bound must have the same number of elements.")
+
+        # the bounds are always copied; so, modifying the arrays that are passed in does not change the axis.
+        _bounds = np.empty((2, lower_bound.size), dtype="int64")
+        _bounds[0, :] = lower_bound
+        _bounds[1, :] = upper_bound
+
         Axis._bounds_sanity_check(_bounds)
         return _bounds
 
@@ -435,12 +622,14 @@ class Axis:
     def _calculate_data_ticks_fromFraction(
             lower_bound: np.ndarray,
             upper_bound: np.ndarray,
-            f: np.ndarray) -> np.ndarray:
+            f: np.ndarray,
+            trusted: bool = False) -> np.ndarray:
 
-        if np.any(f < 0) or np.any(f > 1):
+        if (not trusted) and (np.any(f < 0) or np.any(f > 1)):
             raise ValueError("all values of fraction must be between 0 and 1")
         data_tick = ((1.0 - f) * lower_bound + f * upper_bound).astype(np.int64)
-        Axis._data_ticks_sanity_check(data_tick)
+        if not trusted:
+            Axis._data_ticks_sanity_check(data_tick)
         return data_tick
 
     @ staticmethod
@@ -454,12 +643,14 @@ class Axis:
     def _calculate_fraction_from_data_ticks(
             lower_bound: np.ndarray,
             upper_bound: np.ndarray,
-            data_ticks: np.ndarray) -> np.ndarray:
+            data_ticks: np.ndarray,
+            trusted: bool = False) -> np.ndarray:
 
         fraction = ((data_ticks - lower_bound) /
                     (upper_bound - lower_bound)).astype(np.float64)
 
-        Axis._fraction_sanity_check(fraction)
+        if not trusted:
+            Axis._fraction_sanity_check(fraction)
 
         return fraction
 
@@ -477,7 +668,512 @@ class Axis:
             raise ValueError("fraction must be a number between 0.0 and 1.0")
 
 
+class RegularAxis(Axis):
+    """
+    An `Axis` whose elements are evenly spaced, i.e. `lower_bound[i] = start + i * stride`,
+    `upper_bound[i] = lower_bound[i] + width`, and `data_ticks[i] = lower_bound[i] + data_tick_offset`.
+
+    Only these parameters are stored. The bounds and the data ticks are generated the first time they are requested,
+    whereas the single elements, slices, `start`, and `end` are calculated directly from the parameters. Hence, a
+    100 year axis with one minute intervals, i.e. about 52 million elements, costs a few bytes unless its arrays are
+    requested. `AxisRemapper` uses the parameters directly as well, i.e. to calculate the weight matrix in closed form
+    and to key its cache.
+
+    `FixedIntervalAxisBuilder`, hence `DailyTimeAxisBuilder` and `WeeklyTimeAxisBuilder`, and
+    `RollingWindowAxisBuilder` return a `RegularAxis` whenever their data ticks are evenly spaced as well.
+
+    Examples:
+        * Creating a regular axis: Similar to `Axis`, exactly one of the `fraction`, `binding`, or `data_tick_offset`
+          must be provided:
+
+        >>> from axisutilities import RegularAxis
+        >>> axis = RegularAxis(start=0, stride=24, nelem=7, binding="middle")
+        >>> axis.end
+        168
+        >>> axis[1].asDict()["data_tick"]
+        '1970-01-01 00:00:00.000036'
+
+        * Rolling windows, i.e. overlapping elements, could be created by passing a `width` larger than the `stride`:
+
+        >>> rolling = RegularAxis(start=0, stride=24, nelem=5, width=3 * 24, binding="middle")
+
+        * Slicing: Slices of a regular axis are regular as well, and are created without generating any array:
+
+        >>> every_other_day = axis[::2]
+        >>> every_other_day.nelem, every_other_day.stride
+        (4, 48)
+    """
+    def __init__(self, start: int, stride: int, nelem: int, width: int = None, **kwargs):
+        """
+        :param start: The lower bound of the first element.
+        :param stride: The distance between the lower bounds of two consecutive elements; it must be positive.
+        :param nelem: The number of elements; it must be positive.
+        :param width: The distance between the lower and upper bound of each element; it defaults to `stride`.
+        :param kwargs: One of the following keys (just one, not more) must be provided:
+            - ``fraction``: a single number between 0 and 1; the data ticks are at `int(fraction * width)` from the
+              lower bounds.
+            - ``binding``: "beginning", "middle", or "end".
+            - ``data_tick_offset``: the distance between the lower bounds and the data ticks.
+        """
+        if sum(list(map(lambda e: 1 if e in kwargs else 0, ['fraction', 'data_tick_offset', 'binding']))) != 1:
+            raise ValueError("You must provide exactly just one of the 'fraction', 'data_tick_offset', or 'binding'.")
+
+        self._start = RegularAxis._as_int(start, "start")
+        self._stride = RegularAxis._as_int(stride, "stride")
+        self._nelem = RegularAxis._as_int(nelem, "nelem")
+        self._width = self._stride if width is None else RegularAxis._as_int(width, "width")
+        if (self._stride <= 0) or (self._width <= 0) or (self._nelem <= 0):
+            raise ValueError("stride, width, and nelem must be positive.")
+
+        if "data_tick_offset" in kwargs:
+            self._offset = RegularAxis._as_int(kwargs["data_tick_offset"], "data_tick_offset")
+            if (self._offset < 0) or (self._offset > self._width):
+                raise ValueError("data_tick_offset must be between 0 and width.")
+            fraction = self._offset / self._width
+        else:
+            if "binding" in kwargs:
+                binding = AxisBinding.valueOf(kwargs["binding"])
+                if binding == AxisBinding.CUSTOM_FRACTION:
+                    raise ValueError("Can't guess the fraction for the Custom Fraction. Use the fraction option "
+                                     "instead.")
+                fraction = binding.fraction()
+            else:
+                fraction = np.asarray(kwargs["fraction"], dtype="float64")
+                if fraction.size != 1:
+                    raise ValueError("fraction of a RegularAxis must be a single number.")
+                fraction = float(fraction.reshape(-1)[0])
+            if (fraction < 0) or (fraction > 1):
+                raise ValueError("all values of fraction must be between 0 and 1")
+            self._offset = int(fraction * self._width)
+
+        self._fraction = Axis._read_only(np.asarray([[fraction]], dtype="float64"))
+        self._binding = Axis._get_binding(self._fraction)
+        self._arrays = {}
+
+    @classmethod
+    def fromBounds(cls, bounds: np.ndarray, trusted: bool = False, **kwargs) -> Axis:
+        """
+        Same as `Axis.fromBounds`; however, if the bounds and the data ticks are evenly spaced, a `RegularAxis` with
+        the same elements is returned; otherwise, the `Axis` itself is returned.
+        """
+        axis = Axis.fromBounds(bounds, trusted, **kwargs)
+        parameters = regular_parameters(axis._bounds[0, :], axis._bounds[1, :])
+        if parameters is None:
+            return axis
+
+        start, stride, width = parameters
+        offset = int(axis._data_ticks[0, 0]) - start
+        if np.any(axis._data_ticks[0, :] - axis._bounds[0, :] != offset):
+            return axis
+
+        if axis._binding in (AxisBinding.BEGINNING, AxisBinding.MIDDLE, AxisBinding.END):
+            regular = cls(start, stride, axis.nelem, width, binding=axis._binding)
+            if regular.data_tick_offset == offset:
+                return regular
+
+        return cls(start, stride, axis.nelem, width, data_tick_offset=offset)
+
+    @staticmethod
+    def _as_int(v, name: str) -> int:
+        try:
+            i = int(v)
+        except (TypeError, ValueError):
+            raise TypeError(f"{name} must be an integer.")
+        if i != v:
+            raise ValueError(f"{name} must be an integer; got {v}.")
+        return i
 
+    @property
+    def _bounds(self) -> np.ndarray:
+        bounds = self._arrays.get("bounds")
+        if bounds is None:
+            bounds = np.empty((2, self._nelem), dtype="int64")
+            np.multiply(np.arange(self._nelem, dtype="int64"), self._stride, out=bounds[0, :])
+            bounds[0, :] += self._start
+            np.add(bounds[0, :], self._width, out=bounds[1, :])
+            bounds = self._arrays.setdefault("bounds", Axis._read_only(bounds))
+        return bounds
 
+    @property
+    def _data_ticks(self) -> np.ndarray:
+        data_ticks = self._arrays.get("data_ticks")
+        if data_ticks is None:
+            data_ticks = (self._bounds[0, :] + self._offset).reshape((1, -1))
+            data_ticks = self._arrays.setdefault("data_ticks", Axis._read_only(data_ticks))
+        return data_ticks
+
+    def __getitem__(self, item: (int, slice)) -> (Interval, RegularAxis):
+        if isinstance(item, int):
+            if (item >= self.nelem) or (item < -self.nelem):
+                raise IndexError("Index Out of range")
+            lower_bound = self._start + (item % self._nelem) * self._stride
+            return Interval(lower_bound, lower_bound + self._width, lower_bound + self._offset)
+        elif isinstance(item, slice):
+            indices = range(self._nelem)[item]
+            if (len(indices) == 0) or (indices.step < 0):
+                raise IndexError("slices of a RegularAxis must be non-empty and increasing.")
+            return RegularAxis(
+                start=self._start + indices.start * self._stride,
+                stride=self._stride * indices.step,
+                nelem=len(indices),
+                width=self._width,
+                data_tick_offset=self._offset
+            )
+        else:
+            raise TypeError("item must be an integer or a slice")
+
+    def __repr__(self):
+        summary = ["<timeaxis.RegularAxis>\n"]
+        for key in ("nelem", "start", "stride", "width", "data_tick_offset"):
+            summary.append(f"  > {key}:\n\t{getattr(self, key)}")
+        summary.append(f"  > binding:\n\t{self._binding}")
+        return "\n".join(summary)
 
+    def _locate(self, values: np.ndarray, out: np.ndarray) -> None:
+        runs = np.asarray([[self._start], [self._stride], [self._nelem], [self._width], [self._offset]], dtype="int64")
+        locate_runs(runs, np.asarray([0, self._nelem], dtype="int64"), values, out)
 
+    def adjust_binding_to(self, **kwargs) -> RegularAxis:
+        if len(kwargs) == 1 and (("fraction" in kwargs) or ("binding" in kwargs)):
+            return RegularAxis(self._start, self._stride, self._nelem, self._width, **kwargs)
+        else:
+            raise ValueError("you could provide either `fraction` or `binding` but not both and nothig else")
+
+    @property
+    def start(self) -> int:
+        return self._start
+
+    @start.setter
+    def start(self, v) -> None:
+        pass
+
+    @property
+    def end(self) -> int:
+        return self._start + (self._nelem - 1) * self._stride + self._width
+
+    @end.setter
+    def end(self, v) -> None:
+        pass
+
+    @property
+    def stride(self) -> int:
+        return self._stride
+
+    @stride.setter
+    def stride(self, v) -> None:
+        pass
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @width.setter
+    def width(self, v) -> None:
+        pass
+
+    @property
+    def data_tick_offset(self) -> int:
+        return self._offset
+
+    @data_tick_offset.setter
+    def data_tick_offset(self, v) -> None:
+        pass
+
+
+class PiecewiseRegularAxis(Axis):
+    """
+    An `Axis` stored as a sequence of runs, where each run is a `RegularAxis`, i.e. a number of evenly spaced elements.
+    Run `r` holds `length[r]` elements; the `k`-th of them has `lower_bound = start[r] + k * stride[r]`,
+    `upper_bound = lower_bound + width[r]`, and `data_tick = lower_bound + data_tick_offset[r]`. Any irregular element
+    is simply stored as a run of length one.
+
+    Only the runs are stored; so, the memory scales with the number of gaps and resolution changes, not with the
+    number of elements. Accessing a single element costs `O(log(nruns))`, and the bounds and the data ticks are
+    generated the first time they are requested.
+
+    Examples:
+        * Creating an hourly axis with a missing day, i.e. two runs:
+
+        >>> from axisutilities import PiecewiseRegularAxis
+        >>> hour = 3600 * 1_000_000
+        >>> axis = PiecewiseRegularAxis(start=[0, 48 * hour], stride=hour, length=[24, 24], binding="middle")
+        >>> axis.nelem, axis.nruns
+        (48, 2)
+
+        * Compressing an existing axis, e.g. one created by `TimeAxisBuilderFromDataTicks`:
+
+        >>> compressed = PiecewiseRegularAxis.fromAxis(axis)
+    """
+    def __init__(self, start: Iterable[int], stride: Iterable[int], length: Iterable[int], width: Iterable[int] = None,
+                 **kwargs):
+        """
+        :param start: The lower bound of the first element of each run.
+        :param stride: The distance between the lower bounds of two consecutive elements of each run; either one
+                       number for all the runs, or one per run. It must be positive.
+        :param length: The number of elements of each run; it must be positive.
+        :param width: The distance between the lower and upper bound of the elements of each run; either one number
+                      for all the runs, or one per run. It defaults to `stride`.
+        :param kwargs: One of the following keys (just one, not more) must be provided:
+            - ``fraction``: either one number or one per run; the data ticks are at `int(fraction * width)` from the
+              lower bounds.
+            - ``binding``: "beginning", "middle", or "end".
+            - ``data_tick_offset``: the distance between the lower bounds and the data ticks; either one number or one
+              per run.
+        """
+        if sum(list(map(lambda e: 1 if e in kwargs else 0, ['fraction', 'data_tick_offset', 'binding']))) != 1:
+            raise ValueError("You must provide exactly just one of the 'fraction', 'data_tick_offset', or 'binding'.")
+
+        start = PiecewiseRegularAxis._as_runs(start, "start")
+        nruns = start.size
+        if nruns == 0:
+            raise ValueError("at least one run must be provided.")
+
+        runs = np.empty((5, nruns), dtype="int64")
+        runs[0, :] = start
+        runs[1, :] = PiecewiseRegularAxis._as_runs(stride, "stride", nruns)
+        runs[2, :] = PiecewiseRegularAxis._as_runs(length, "length", nruns)
+        runs[3, :] = runs[1, :] if width is None else PiecewiseRegularAxis._as_runs(width, "width", nruns)
+        if np.any(runs[1:4, :] <= 0):
+            raise ValueError("stride, length, and width must be positive.")
+
+        if "data_tick_offset" in kwargs:
+            runs[4, :] = PiecewiseRegularAxis._as_runs(kwargs["data_tick_offset"], "data_tick_offset", nruns)
+            if np.any(runs[4, :] < 0) or np.any(runs[4, :] > runs[3, :]):
+                raise ValueError("data_tick_offset must be between 0 and width.")
+        else:
+            if "binding" in kwargs:
+                binding = AxisBinding.valueOf(kwargs["binding"])
+                if binding == AxisBinding.CUSTOM_FRACTION:
+                    raise ValueError("Can't guess the fraction for the Custom Fraction. Use the fraction option "
+                                     "instead.")
+                fraction = np.asarray(binding.fraction(), dtype="float64").reshape((-1,))
+            else:
+                fraction = np.asarray(kwargs["fraction"], dtype="float64").reshape((-1,))
+                if (fraction.size != 1) and (fraction.size != nruns):
+                    raise ValueError("fraction must be either a single number, or as many as there are runs.")
+            if np.any(fraction < 0) or np.any(fraction > 1):
+                raise ValueError("all values of fraction must be between 0 and 1")
+            runs[4, :] = (fraction * runs[3, :]).astype("int64")
+
+        # the last lower bound of each run must be before the first lower bound of the next run.
+        last_lower_bound = runs[0, :] + (runs[2, :] - 1) * runs[1, :]
+        if np.any(last_lower_bound[:-1] >= runs[0, 1:]):
+            raise ValueError('lower bound values must be monotonically increasing.')
+
+        self._initialize_runs(runs)
+
+    def _initialize_runs(self, runs: np.ndarray) -> None:
+        self._runs = Axis._read_only(runs)
+        self._run_index = np.zeros(runs.shape[1] + 1, dtype="int64")
+        np.cumsum(runs[2, :], out=self._run_index[1:])
+        self._nelem = int(self._run_index[-1])
+        self._binding = Axis._get_binding(runs[4, :] / runs[3, :])
+        self._arrays = {}
+
+    @classmethod
+    def fromRuns(cls, runs: np.ndarray) -> PiecewiseRegularAxis:
+        """
+        Creates a `PiecewiseRegularAxis` from a (5, nruns) array holding the `start`, `stride`, `length`, `width`, and
+        `data_tick_offset` of the runs in its rows, i.e. the same layout as `runs`.
+        """
+        runs = np.asarray(runs)
+        if (runs.ndim != 2) or (runs.shape[0] != 5):
+            raise ValueError("runs must be of shape (5, nruns).")
+        return cls(start=runs[0, :], stride=runs[1, :], length=runs[2, :], width=runs[3, :],
+                   data_tick_offset=runs[4, :])
+
+    @classmethod
+    def fromAxis(cls, axis: Axis) -> PiecewiseRegularAxis:
+        """
+        Compresses the provided axis, i.e. splits it into the longest runs of evenly spaced elements, scanning from the
+        first element. The bounds and the data ticks of the returned axis are identical to those of `axis`.
+        """
+        if isinstance(axis, PiecewiseRegularAxis):
+            return axis
+        if isinstance(axis, RegularAxis):
+            return cls(start=[axis.start], stride=axis.stride, length=axis.nelem, width=axis.width,
+                       data_tick_offset=axis.data_tick_offset)
+
+        out = cls.__new__(cls)
+        out._initialize_runs(PiecewiseRegularAxis._compress(axis._bounds, axis._data_ticks[0, :]))
+        return out
+
+    @classmethod
+    def fromBounds(cls, bounds: np.ndarray, trusted: bool = False, **kwargs) -> PiecewiseRegularAxis:
+        """
+        Same as `Axis.fromBounds`, except that the bounds and the data ticks are compressed into runs; check
+        `fromAxis`.
+        """
+        return cls.fromAxis(Axis.fromBounds(bounds, trusted, **kwargs))
+
+    @staticmethod
+    def _compress(bounds: np.ndarray, data_ticks: np.ndarray) -> np.ndarray:
+        lower_bound = bounds[0, :]
+        width = bounds[1, :] - lower_bound
+        offset = data_ticks - lower_bound
+        if np.any(width <= 0):
+            raise ValueError("all the elements of a PiecewiseRegularAxis must have a positive width.")
+
+        n = lower_bound.size
+        diff = np.diff(lower_bound)
+        # the elements where the width or the data tick offset changes, and the links, i.e. pairs of consecutive
+        # elements, where the distance between the lower bounds changes.
+        shape_breaks = np.flatnonzero((width[1:] != width[:-1]) | (offset[1:] != offset[:-1])) + 1
+        diff_breaks = np.flatnonzero(diff[1:] != diff[:-1]) + 1
+
+        # the loop is over the runs, not the elements; each step finds the end of the current run by a binary search.
+        runs = []
+        s = 0
+        while s < n:
+            # a run could not go beyond the next shape break, nor beyond the next change in the distance.
+            end = int(shape_breaks[np.searchsorted(shape_breaks, s, side="right")]) \
+                if (shape_breaks.size > 0) and (shape_breaks[-1] > s) else n
+            if end > s + 1:
+                last_link = int(diff_breaks[np.searchsorted(diff_breaks, s, side="right")]) \
+                    if (diff_breaks.size > 0) and (diff_breaks[-1] > s) else n - 1
+                end = min(end, last_link + 1)
+            stride = int(diff[s]) if end > s + 1 else int(width[s])
+            runs.append((int(lower_bound[s]), stride, end - s, int(width[s]), int(offset[s])))
+            s = end
+
+        return np.ascontiguousarray(np.asarray(runs, dtype="int64").T)
+
+    @staticmethod
+    def _as_runs(v, name: str, nruns: int = None) -> np.ndarray:
+        values = np.asarray(v)
+        if (values.size > 0) and (not np.all(np.mod(values, 1) == 0)):
+            raise ValueError(f"{name} must be integers.")
+        values = values.astype("int64").reshape((-1,))
+        if nruns is not None:
+            if values.size == 1:
+                values = np.full(nruns, values[0], dtype="int64")
+            elif values.size != nruns:
+                raise ValueError(f"{name} must be either a single number, or as many as there are runs.")
+        return values
+
+    def _locate_run(self, item: int) -> int:
+        return int(np.searchsorted(self._run_index, item, side="right")) - 1
+
+    @property
+    def _bounds(self) -> np.ndarray:
+        bounds = self._arrays.get("bounds")
+        if bounds is None:
+            length = self._runs[2, :]
+            bounds = np.empty((2, self._nelem), dtype="int64")
+            # k, i.e. the position of each element within its run, times the stride of its run.
+            np.subtract(np.arange(self._nelem, dtype="int64"), np.repeat(self._run_index[:-1], length),
+                        out=bounds[0, :])
+            bounds[0, :] *= np.repeat(self._runs[1, :], length)
+            bounds[0, :] += np.repeat(self._runs[0, :], length)
+            np.add(bounds[0, :], np.repeat(self._runs[3, :], length), out=bounds[1, :])
+            bounds = self._arrays.setdefault("bounds", Axis._read_only(bounds))
+        return bounds
+
+    @property
+    def _data_ticks(self) -> np.ndarray:
+        data_ticks = self._arrays.get("data_ticks")
+        if data_ticks is None:
+            data_ticks = (self._bounds[0, :] + np.repeat(self._runs[4, :], self._runs[2, :])).reshape((1, -1))
+            data_ticks = self._arrays.setdefault("data_ticks", Axis._read_only(data_ticks))
+        return data_ticks
+
+    @property
+    def _fraction(self) -> np.ndarray:
+        fraction = self._arrays.get("fraction")
+        if fraction is None:
+            run_fraction = self._runs[4, :] / self._runs[3, :]
+            if np.all(run_fraction == run_fraction[0]):
+                fraction = run_fraction[:1].reshape((1, -1))
+            else:
+                fraction = np.repeat(run_fraction, self._runs[2, :]).reshape((1, -1))
+            fraction = self._arrays.setdefault("fraction", Axis._read_only(fraction))
+        return fraction
+
+    def __getitem__(self, item: (int, slice)) -> (Interval, PiecewiseRegularAxis):
+        if isinstance(item, int):
+            if (item >= self.nelem) or (item < -self.nelem):
+                raise IndexError("Index Out of range")
+            item %= self._nelem
+            r = self._locate_run(item)
+            start, stride, _, width, offset = self._runs[:, r].tolist()
+            lower_bound = start + (item - int(self._run_index[r])) * stride
+            return Interval(lower_bound, lower_bound + width, lower_bound + offset)
+        elif isinstance(item, slice):
+            indices = range(self._nelem)[item]
+            if (len(indices) == 0) or (indices.step < 0):
+                raise IndexError("slices of a PiecewiseRegularAxis must be non-empty and increasing.")
+
+            # only the runs overlapping the slice are visited; in each of them the first selected element is the
+            # first one at or after the beginning of the run that is `step` apart from `indices.start`.
+            first_run = self._locate_run(indices.start)
+            last_run = self._locate_run(indices[-1])
+            run_begin = np.maximum(self._run_index[first_run:last_run + 1], indices.start)
+            run_end = np.minimum(self._run_index[first_run + 1:last_run + 2], indices[-1] + 1)
+            first = run_begin + (-(run_begin - indices.start)) % indices.step
+            length = (run_end - first + indices.step - 1) // indices.step
+            keep = length > 0
+
+            runs = self._runs[:, first_run:last_run + 1][:, keep].copy()
+            runs[0, :] += (first[keep] - self._run_index[first_run:last_run + 1][keep]) * runs[1, :]
+            runs[1, :] *= indices.step
+            runs[2, :] = length[keep]
+            out = PiecewiseRegularAxis.__new__(PiecewiseRegularAxis)
+            out._initialize_runs(runs)
+            return out
+        else:
+            raise TypeError("item must be an integer or a slice")
+
+    def __repr__(self):
+        summary = ["<timeaxis.PiecewiseRegularAxis>\n"]
+        summary.append(f"  > nelem:\n\t{self._nelem}")
+        summary.append(f"  > nruns:\n\t{self.nruns}")
+        summary.append(f"  > start:\n\t{self.start}")
+        summary.append(f"  > end:\n\t{self.end}")
+        summary.append(f"  > binding:\n\t{self._binding}")
+        return "\n".join(summary)
+
+    def _locate(self, values: np.ndarray, out: np.ndarray) -> None:
+        locate_runs(self._runs, self._run_index, values, out)
+
+    def adjust_binding_to(self, **kwargs) -> PiecewiseRegularAxis:
+        if len(kwargs) == 1 and (("fraction" in kwargs) or ("binding" in kwargs)):
+            return PiecewiseRegularAxis(self._runs[0, :], self._runs[1, :], self._runs[2, :], self._runs[3, :],
+                                        **kwargs)
+        else:
+            raise ValueError("you could provide either `fraction` or `binding` but not both and nothig else")
+
+    @property
+    def nruns(self) -> int:
+        return self._runs.shape[1]
+
+    @nruns.setter
+    def nruns(self, v) -> None:
+        pass
+
+    @property
+    def runs(self) -> np.ndarray:
+        """
+        The (5, nruns) runs, as a read-only view. The rows are the `start`, `stride`, `length`, `width`, and
+        `data_tick_offset` of each run.
+        """
+        return self._runs.view()
+
+    @runs.setter
+    def runs(self, v) -> None:
+        pass
+
+    @property
+    def start(self) -> int:
+        return int(self._runs[0, 0])
+
+    @start.setter
+    def start(self, v) -> None:
+        pass
+
+    @property
+    def end(self) -> int:
+        return int(self._runs[0, -1] + (self._runs[2, -1] - 1) * self._runs[1, -1] + self._runs[3, -1])
+
+    @end.setter
+    def end(self, v) -> None:
+        pass
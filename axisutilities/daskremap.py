@@ -0,0 +1,230 @@
+"""
+Lazy remapping of `dask.array.Array` objects; used by `AxisRemapper`.
+
+The source axis is never rechunked. Instead, the destination elements are grouped into output chunks, each of which
+holds the destination elements whose first source element falls within one source chunk; hence, the output chunks
+follow the destination intervals and roughly the source chunks. Each output chunk depends only on the source chunks
+that it overlaps. If it overlaps more than one, the built-in reductions are calculated per source chunk, i.e. partial
+sums, effective weights, ..., using the matching column slice of the weight matrix, and the partial states are merged
+afterward; so, no task ever needs more than one source chunk. User-defined functions, on the other hand, are not
+decomposable, and are applied on the concatenation of only the overlapping source chunks.
+
+The partial states are merged with a tree reduction, i.e. at most `split_every` of them at a time; hence, the memory
+of each task is bounded by the size of the source chunks, regardless of how many of them a destination element spans.
+
+The slices of the weight matrix are stored in the graph once, each under its own key, and the tasks refer to those
+keys; so, the size of the graph does not grow with the number of chunks along the other dimensions.
+"""
+from __future__ import annotations
+
+import itertools
+from functools import reduce
+from typing import Callable, NamedTuple
+
+import numpy as np
+import dask.array as da
+from dask.base import tokenize
+from dask.highlevelgraph import HighLevelGraph
+from scipy.sparse import csr_matrix
+
+from axisutilities.kernels import partial_reduce, combine_partials, finalize_partial
+
+
+# The default number of partial states that are merged by one task.
+SPLIT_EVERY = 8
+
+
+class ChunkPlan(NamedTuple):
+    """
+    Describes one output chunk: the destination elements `rows[0]` up to `rows[1]`, which overlap the source
+    elements `columns[0]` up to `columns[1]`, which are stored in the source chunks `source_chunks[0]` up to
+    `source_chunks[1]`.
+    """
+    rows: tuple
+    columns: tuple
+    source_chunks: tuple
+
+
+def plan_output_chunks(weights: csr_matrix, offsets: np.ndarray) -> list:
+    """
+    Groups the destination elements, i.e. the rows of the weight matrix, into output chunks; check the module
+    documentation.
+
+    :param weights: The (m, n) weight matrix.
+    :param offsets: The offsets of the source chunks, i.e. `[0, size_0, size_0 + size_1, ..., n]`.
+    :return: a list of `ChunkPlan`, one per output chunk, in order.
+    """
+    m = weights.shape[0]
+    n_chunks = offsets.size - 1
+    indptr = weights.indptr
+
+    non_empty = np.diff(indptr) > 0
+    first_column = np.zeros(m, dtype=np.int64)
+    last_column = np.zeros(m, dtype=np.int64)
+    if np.any(non_empty):
+        first_column[non_empty] = np.minimum.reduceat(weights.indices, indptr[:-1][non_empty])
+        last_column[non_empty] = np.maximum.reduceat(weights.indices, indptr[:-1][non_empty])
+
+    # The rows that are not covered follow the preceding row; the running maximum keeps the rows of each output chunk
+    # contiguous, even if the destination axis is not monotonic.
+    owner = np.where(non_empty, np.searchsorted(offsets, first_column, side="right") - 1, -1)
+    owner = np.clip(np.maximum.accumulate(owner), 0, n_chunks - 1)
+
+    plans = []
+    for chunk in np.unique(owner):
+        row_lo = int(np.searchsorted(owner, chunk, side="left"))
+        row_hi = int(np.searchsorted(owner, chunk, side="right"))
+        covered = non_empty[row_lo:row_hi]
+        if np.any(covered):
+            column_lo = int(np.min(first_column[row_lo:row_hi][covered]))
+            column_hi = int(np.max(last_column[row_lo:row_hi][covered])) + 1
+            chunk_lo = int(np.searchsorted(offsets, column_lo, side="right")) - 1
+            chunk_hi = int(np.searchsorted(offsets, column_hi - 1, side="right"))
+        else:
+            column_lo = column_hi = int(offsets[chunk])
+            chunk_lo, chunk_hi = int(chunk), int(chunk) + 1
+
+        plans.append(ChunkPlan((row_lo, row_hi), (column_lo, column_hi), (chunk_lo, chunk_hi)))
+
+    return plans
+
+
+def remap(data: da.Array,
+          weights: csr_matrix,
+          dimension: int,
+          block_func: Callable,
+          reduction: (str, None) = None,
+          split_every: int = None) -> da.Array:
+    """
+    Lazily remaps `data` along `dimension`.
+
+    :param data: The dask array; if it is one-dimensional, it is treated as a single column, i.e. (n, 1).
+    :param weights: The (m, n) weight matrix.
+    :param dimension: The dimension of `data` that is remapped.
+    :param block_func: `block_func(block, weights, dimension)` remaps a NumPy array using the provided (slice of the)
+                       weight matrix. It is used whenever an output chunk overlaps one source chunk only, or always if
+                       `reduction` is `None`.
+    :param reduction: The name of the built-in reduction, e.g. "mean"; check `kernels.partial_reduce`. If provided,
+                      the output chunks that overlap more than one source chunk are calculated from the partial states
+                      of the overlapping source chunks.
+    :param split_every: The maximum number of partial states that are merged by one task; defaults to `SPLIT_EVERY`.
+    :return: The remapped dask array of type `float64`.
+    """
+    split_every = SPLIT_EVERY if split_every is None else int(split_every)
+    if split_every < 2:
+        raise ValueError("split_every must be an integer greater than one.")
+
+    # the dimension is used to build the chunk keys; so, it must be non-negative. It is normalized before a
+    # one-dimensional input is turned into a column, so that -1 still refers to its only dimension.
+    dimension = dimension % data.ndim
+    if data.ndim == 1:
+        data = data[:, None]
+
+    if data.shape[dimension] != weights.shape[1]:
+        raise ValueError("The time dimension does not matches to that of the provided time converter.")
+
+    offsets = np.zeros(len(data.chunks[dimension]) + 1, dtype=np.int64)
+    np.cumsum(data.chunks[dimension], out=offsets[1:])
+    plans = plan_output_chunks(weights, offsets)
+
+    token = tokenize(data, weights, dimension, block_func, reduction, split_every)
+    name = f"axisremapper-{reduction or 'apply'}-{token}"
+    partial_name = f"axisremapper-partial-{token}"
+    merge_name = f"axisremapper-merge-{token}"
+    weights_name = f"axisremapper-weights-{token}"
+
+    other_blocks = [range(len(c)) for d, c in enumerate(data.chunks) if d != dimension]
+
+    dsk = {}
+    for i, plan in enumerate(plans):
+        row_lo, row_hi = plan.rows
+        column_lo, column_hi = plan.columns
+
+        slices = []
+        for j in range(*plan.source_chunks):
+            lo = max(column_lo, offsets[j])
+            hi = min(column_hi, offsets[j + 1])
+            if (hi > lo) or (column_hi == column_lo):
+                slices.append((j, slice(int(lo - offsets[j]), int(hi - offsets[j])), int(lo), int(hi)))
+
+        if (reduction is None) or (len(slices) == 1):
+            plan_weights = (weights_name, i)
+            dsk[plan_weights] = weights[row_lo:row_hi, column_lo:column_hi]
+            for other in itertools.product(*other_blocks):
+                dsk[(name, *_insert(other, dimension, i))] = (
+                    _apply_block,
+                    block_func,
+                    [(data.name, *_insert(other, dimension, j)) for j, _, _, _ in slices],
+                    [s for _, s, _, _ in slices],
+                    plan_weights,
+                    dimension
+                )
+        else:
+            chunk_weights = []
+            for j, _, lo, hi in slices:
+                chunk_weights.append((weights_name, i, j))
+                dsk[chunk_weights[-1]] = weights[row_lo:row_hi, lo:hi]
+            for other in itertools.product(*other_blocks):
+                partial_keys = []
+                for (j, s, _, _), w in zip(slices, chunk_weights):
+                    partial_key = (partial_name, i, j, *other)
+                    dsk[partial_key] = (
+                        _partial_block,
+                        reduction,
+                        (data.name, *_insert(other, dimension, j)),
+                        s,
+                        w,
+                        dimension
+                    )
+                    partial_keys.append(partial_key)
+
+                level = 0
+                while len(partial_keys) > split_every:
+                    merged_keys = []
+                    for g in range(0, len(partial_keys), split_every):
+                        merged_key = (merge_name, level, i, g // split_every, *other)
+                        dsk[merged_key] = (_merge_partials, reduction, partial_keys[g:(g + split_every)])
+                        merged_keys.append(merged_key)
+                    partial_keys = merged_keys
+                    level += 1
+
+                dsk[(name, *_insert(other, dimension, i))] = (_combine_blocks, reduction, partial_keys, dimension)
+
+    chunks = list(data.chunks)
+    chunks[dimension] = tuple(plan.rows[1] - plan.rows[0] for plan in plans)
+
+    graph = HighLevelGraph.from_collections(name, dsk, dependencies=[data])
+    return da.Array(graph, name, chunks=tuple(chunks), meta=np.empty((0,) * data.ndim, dtype=np.float64))
+
+
+def _insert(other: tuple, dimension: int, index: int) -> tuple:
+    return other[:dimension] + (index,) + other[dimension:]
+
+
+def _take(block: np.ndarray, dimension: int, s: slice) -> np.ndarray:
+    index = [slice(None)] * block.ndim
+    index[dimension] = s
+    return block[tuple(index)]
+
+
+def _apply_block(block_func: Callable, blocks: list, slices: list, weights: csr_matrix, dimension: int) -> np.ndarray:
+    parts = [_take(block, dimension, s) for block, s in zip(blocks, slices)]
+    data = parts[0] if len(parts) == 1 else np.concatenate(parts, axis=dimension)
+    return block_func(data, weights, dimension)
+
+
+def _partial_block(reduction: str, block: np.ndarray, s: slice, weights: csr_matrix, dimension: int) -> tuple:
+    data = np.moveaxis(_take(block, dimension, s), dimension, 0)
+    trailing_shape = data.shape[1:]
+    return partial_reduce(reduction, weights, data.reshape((data.shape[0], -1))), trailing_shape
+
+
+def _merge_partials(reduction: str, partials: list) -> tuple:
+    trailing_shape = partials[0][1]
+    return reduce(lambda a, b: combine_partials(reduction, a, b), (p for p, _ in partials)), trailing_shape
+
+
+def _combine_blocks(reduction: str, partials: list, dimension: int) -> np.ndarray:
+    state, trailing_shape = _merge_partials(reduction, partials)
+    output = finalize_partial(reduction, state, np.empty(state[0].shape, dtype=np.float64))
+    return np.moveaxis(output.reshape((output.shape[0], *trailing_shape)), 0, dimension)
@@ -0,0 +1,1238 @@
+"""
+Compute kernels used by `AxisRemapper` and `Axis.locate`.
+
+Most of the kernels come in two flavors: a numba compiled one, which is used whenever numba is available, and a
+vectorized NumPy one, which is used as a fallback. Both flavors must return identical results so that the engine
+could be picked at runtime.
+
+The compiled kernels that run in parallel over the destination rows are compiled twice; check `parallel_kernel`.
+"""
+import os
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if (len(args) == 1) and callable(args[0]) and (len(kwargs) == 0):
+            return args[0]
+        return lambda func: func
+
+
+class parallel_kernel:
+    """
+    Compiles a kernel twice: once in parallel, i.e. its `prange` loops are spread over the numba threads, and once
+    serially with the GIL released. The parallel version is used when called from the main thread; the serial one
+    when called from any other thread, e.g. by dask workers. Such callers are already parallel; hence, nesting the
+    numba threads in them would only oversubscribe the cores, and some numba threading layers do not support being
+    launched from several threads concurrently.
+    """
+    def __init__(self, func):
+        self.py_func = func
+        self.parallel = njit(parallel=True, cache=True)(func)
+
+        # a renamed copy, so that the cached serial version does not overwrite the parallel one.
+        serial_func = types.FunctionType(func.__code__, func.__globals__, f"{func.__name__}_serial", func.__defaults__)
+        serial_func.__qualname__ = f"{func.__qualname__}_serial"
+        self.serial = njit(nogil=True, cache=True)(serial_func)
+
+    def __call__(self, *args):
+        if threading.current_thread() is threading.main_thread():
+            return self.parallel(*args)
+        return self.serial(*args)
+
+
+COVERAGE_ENGINES = ("auto", "numba", "numpy", "analytic")
+
+
+def resolve_engine(engine: str) -> str:
+    """
+    Translates the requested engine, i.e. one of the `COVERAGE_ENGINES`, to the search engine that is used when the
+    analytic engine is not applicable.
+    """
+    if engine not in COVERAGE_ENGINES:
+        raise ValueError(f"engine must be one of {COVERAGE_ENGINES}; got {engine}.")
+
+    if engine in ("auto", "analytic"):
+        return "numba" if NUMBA_AVAILABLE else "numpy"
+
+    if (engine == "numba") and (not NUMBA_AVAILABLE):
+        raise ValueError("numba engine is requested; but numba is not available.")
+
+    return engine
+
+
+def regular_parameters(lb: np.ndarray, ub: np.ndarray) -> (tuple, None):
+    """
+    Checks whether the provided bounds describe a regular axis, i.e. `lb[i] = start + i * stride` and
+    `ub[i] = lb[i] + width`, and if so, returns `(start, stride, width)`; otherwise, returns `None`.
+    """
+    n = lb.size
+    if n == 0:
+        return None
+
+    start = int(lb[0])
+    width = int(ub[0] - lb[0])
+    stride = int(lb[1] - lb[0]) if n > 1 else max(width, 1)
+
+    if (width <= 0) or (stride <= 0):
+        return None
+
+    if n > 1 and not (np.all(np.diff(lb) == stride) and np.all((ub - lb) == width)):
+        return None
+
+    return start, stride, width
+
+
+def coverage_regular(
+        from_start: int,
+        from_stride: int,
+        from_width: int,
+        n: int,
+        to_lb: np.ndarray,
+        to_ub: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    Coverage calculation for a regular source axis, i.e. one that is fully described by its `start`, `stride`,
+    `width`, and number of elements `n`, such as those created by `FixedIntervalAxisBuilder`,
+    `DailyTimeAxisBuilder`, or `WeeklyTimeAxisBuilder`. The range of source elements overlapping each destination
+    element is calculated in closed form instead of being searched; hence, apart from the `O(m)` range calculation,
+    all the work is `O(nnz)` vectorized operations.
+    """
+    m = to_lb.size
+
+    # source element c overlaps [to_lb, to_ub) iff from_start + c * from_stride + from_width > to_lb and
+    # from_start + c * from_stride < to_ub.
+    first = np.clip((to_lb - from_start - from_width) // from_stride + 1, 0, n)
+    last = np.clip(-((from_start - to_ub) // from_stride), 0, n)
+    counts = np.maximum(last - first, 0)
+
+    row_idx = np.repeat(np.arange(m, dtype=np.int64), counts)
+    offsets = np.cumsum(counts) - counts
+    col_idx = np.arange(row_idx.size, dtype=np.int64) - np.repeat(offsets - first, counts)
+
+    c_lb = from_start + col_idx * from_stride
+    c_ub = c_lb + from_width
+    r_lb = to_lb[row_idx]
+    r_ub = to_ub[row_idx]
+
+    weights = (np.minimum(c_ub, r_ub) - np.maximum(c_lb, r_lb)) / (c_ub - c_lb)
+
+    return row_idx, col_idx, weights
+
+
+def coverage_numpy(
+        from_lb: np.ndarray,
+        from_ub: np.ndarray,
+        to_lb: np.ndarray,
+        to_ub: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    Vectorized coverage calculation. For each destination element, the candidate source elements are those in
+    `[first, last)`, i.e. the ones that start before the destination upper bound and are not entirely before the
+    destination lower bound. Since the source upper bounds do not need to be monotonically increasing, `first` is
+    searched on their running maximum and the few candidates that do not overlap are filtered afterward.
+    """
+    m = to_lb.size
+
+    first = np.searchsorted(np.maximum.accumulate(from_ub), to_lb, side="right")
+    last = np.searchsorted(from_lb, to_ub, side="left")
+    counts = np.maximum(last - first, 0)
+
+    row_idx = np.repeat(np.arange(m, dtype=np.int64), counts)
+    offsets = np.cumsum(counts) - counts
+    col_idx = np.arange(row_idx.size, dtype=np.int64) - np.repeat(offsets - first, counts)
+
+    c_lb = from_lb[col_idx]
+    c_ub = from_ub[col_idx]
+    r_lb = to_lb[row_idx]
+    r_ub = to_ub[row_idx]
+
+    overlapping = (c_ub > r_lb) & (c_lb < r_ub)
+    if not np.all(overlapping):
+        row_idx, col_idx = row_idx[overlapping], col_idx[overlapping]
+        c_lb, c_ub, r_lb, r_ub = c_lb[overlapping], c_ub[overlapping], r_lb[overlapping], r_ub[overlapping]
+
+    # The covered fraction of the source element; this is the same for all the possible overlapping cases, i.e.
+    # partially covering the beginning or the end, being covered entirely, or covering the entire destination.
+    weights = (np.minimum(c_ub, r_ub) - np.maximum(c_lb, r_lb)) / (c_ub - c_lb)
+
+    return row_idx, col_idx, weights
+
+
+@njit(cache=True, error_model="numpy")
+def coverage_numba(
+        from_lb: np.ndarray,
+        from_ub: np.ndarray,
+        to_lb: np.ndarray,
+        to_ub: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    Compiled version of `coverage_numpy`. The candidates are searched the same way; then, the overlapping pairs are
+    counted so that the COO arrays could be preallocated, and finally they are filled in a second pass.
+    """
+    m = to_lb.size
+    n = from_lb.size
+
+    from_ub_max = np.empty(n, dtype=from_ub.dtype)
+    running_max = from_ub[0] if n > 0 else 0
+    for c in range(n):
+        if from_ub[c] > running_max:
+            running_max = from_ub[c]
+        from_ub_max[c] = running_max
+
+    first = np.searchsorted(from_ub_max, to_lb, side="right")
+    last = np.searchsorted(from_lb, to_ub, side="left")
+
+    nnz = 0
+    for r in range(m):
+        for c in range(first[r], last[r]):
+            if (from_ub[c] > to_lb[r]) and (from_lb[c] < to_ub[r]):
+                nnz += 1
+
+    row_idx = np.empty(nnz, dtype=np.int64)
+    col_idx = np.empty(nnz, dtype=np.int64)
+    weights = np.empty(nnz, dtype=np.float64)
+
+    k = 0
+    for r in range(m):
+        for c in range(first[r], last[r]):
+            if (from_ub[c] > to_lb[r]) and (from_lb[c] < to_ub[r]):
+                row_idx[k] = r
+                col_idx[k] = c
+                weights[k] = (min(from_ub[c], to_ub[r]) - max(from_lb[c], to_lb[r])) / (from_ub[c] - from_lb[c])
+                k += 1
+
+    return row_idx, col_idx, weights
+
+
+# The fallback size of the last level cache, if it could not be queried.
+DEFAULT_CACHE_SIZE = 8 * 1024 ** 2
+
+# The minimum number of columns per block, so that the per-block overhead remains negligible and each row of a block
+# still spans a few cache lines.
+MIN_BLOCK_COLUMNS = 64
+
+
+def cache_size() -> int:
+    """
+    Returns the size of the last level cache, i.e. L3 or L2, in bytes, or `DEFAULT_CACHE_SIZE` if it is not known.
+    """
+    for name in ("SC_LEVEL3_CACHE_SIZE", "SC_LEVEL2_CACHE_SIZE"):
+        try:
+            size = os.sysconf(name)
+        except (AttributeError, ValueError, OSError):
+            continue
+        if size > 0:
+            return int(size)
+    return DEFAULT_CACHE_SIZE
+
+
+def resolve_block_size(block_size, n: int) -> int:
+    """
+    Translates the requested block size, i.e. the number of columns that are processed at once, into a positive
+    integer. If it is `None` or "auto", the block size is picked so that one block of the (n, k) input data, i.e.
+    `n * block_size` values, fits in the last level cache, but not less than `MIN_BLOCK_COLUMNS`.
+    """
+    if (block_size is None) or (isinstance(block_size, str) and block_size == "auto"):
+        return max(MIN_BLOCK_COLUMNS, cache_size() // (8 * max(n, 1)))
+
+    if isinstance(block_size, str) or int(block_size) < 1:
+        raise ValueError(f"block_size must be a positive integer, None, or 'auto'; got {block_size}.")
+
+    return int(block_size)
+
+
+def trailing_order(x: np.ndarray) -> tuple:
+    """
+    Returns the order of the axes of the (n, t_1, t_2, ...) array `x`, i.e. `(0, ...)`, with its trailing dimensions
+    sorted from the largest stride to the smallest. Transposing the trailing dimensions into this order makes `x` as
+    close to C order as possible, e.g. a Fortran-ordered array or one whose source axis was moved first from the end;
+    hence, its column blocks could be viewed as (n, k_b) matrices, with the original strides, instead of being
+    copied. The order of the columns does not matter as long as the output is split alike.
+    """
+    strides = np.abs(np.asarray(x.strides[1:], dtype=np.int64))
+    return (0, *(int(a) + 1 for a in np.argsort(-strides, kind="stable")))
+
+
+def column_block_indices(trailing_shape: tuple, block_size: int):
+    """
+    Splits the columns of an (n, t_1, t_2, ...) array, i.e. the trailing dimensions flattened in C order, into blocks
+    of about `block_size` columns. Each block is split along one trailing dimension only; so, it could be viewed as an
+    (n, k_b) matrix without copying whenever the array is contiguous. Instead of the blocks, yields the indices that
+    select them, so that several arrays with the same trailing dimensions, e.g. the input and the output, could be
+    split alike.
+
+    :return: yields `(index, q0, q1)`, where `x[index]` is the block holding the columns `q0` up to `q1`.
+    """
+    trailing_shape = tuple(trailing_shape)
+    k = int(np.prod(trailing_shape, dtype=np.int64))
+    if (len(trailing_shape) == 0) or (k == 0):
+        yield (slice(None),), 0, k
+        return
+
+    # the dimensions after `s` are never split; the dimension `s` is split into steps of `step`.
+    s = len(trailing_shape) - 1
+    inner = 1
+    while (s > 0) and (inner * trailing_shape[s] <= block_size):
+        inner *= trailing_shape[s]
+        s -= 1
+    step = max(1, block_size // inner)
+
+    q = 0
+    for index in np.ndindex(*trailing_shape[:s]):
+        for lo in range(0, trailing_shape[s], step):
+            hi = min(lo + step, trailing_shape[s])
+            yield (slice(None), *index, slice(lo, hi)), q, q + (hi - lo) * inner
+            q += (hi - lo) * inner
+
+
+_SHARED_EXECUTORS = {}
+_SHARED_EXECUTORS_LOCK = threading.Lock()
+
+
+def shared_executor(workers: int) -> ThreadPoolExecutor:
+    """
+    Returns the process-wide thread pool with `workers` threads, creating it on first use; so, all the remappers using
+    the same number of workers share one pool instead of starting their own threads on every call.
+    """
+    workers = int(workers)
+    with _SHARED_EXECUTORS_LOCK:
+        executor = _SHARED_EXECUTORS.get(workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="axisutilities")
+            _SHARED_EXECUTORS[workers] = executor
+        return executor
+
+
+def has_nan(x: np.ndarray) -> bool:
+    """
+    Checks whether `x` contains any `NaN` without allocating a full size boolean mask.
+    """
+    if x.dtype.kind not in "fc":
+        return False
+
+    if NUMBA_AVAILABLE:
+        return _has_nan_numba(x)
+
+    return bool(np.isnan(np.sum(x)))
+
+
+@njit(cache=True, nogil=True)
+def _has_nan_numba(x: np.ndarray) -> bool:
+    for i in range(x.shape[0]):
+        for j in range(x.shape[1]):
+            if np.isnan(x[i, j]):
+                return True
+    return False
+
+
+def weighted_average(weights, x: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    Calculates the weighted average of the rows of `x`, i.e. `out[r, :] = sum_c(w[r, c] * x[c, :]) / sum_c(w[r, c])`,
+    where the sums skip the `NaN` values of `x`. The destination rows that are not covered at all, or have no valid
+    values, are set to `NaN`.
+
+    :param weights: The (m, n) weight matrix as a `scipy.sparse.csr_matrix`.
+    :param x: The (n, k) input data. It is never modified.
+    :param out: The (m, k) output, which is overwritten.
+    """
+    nan_present = has_nan(x)
+    if NUMBA_AVAILABLE:
+        if nan_present:
+            _weighted_average_nan_numba(weights.indptr, weights.indices, weights.data, x, out)
+        else:
+            _weighted_average_numba(weights.indptr, weights.indices, weights.data, x, out)
+    else:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if nan_present:
+                valid = ~np.isnan(x)
+                out[...] = (weights @ np.where(valid, x, 0.0)) / (weights @ valid.astype(np.float64))
+            else:
+                row_sum = np.asarray(weights.sum(axis=1), dtype=np.float64).reshape((-1, 1))
+                out[...] = (weights @ x) / row_sum
+        out[np.diff(weights.indptr) == 0, :] = np.nan
+
+    return out
+
+
+@parallel_kernel
+def _weighted_average_numba(indptr, indices, data, x, out):
+    m = indptr.size - 1
+    k = x.shape[1]
+    for r in prange(m):
+        start = indptr[r]
+        end = indptr[r + 1]
+        if start == end:
+            out[r, :] = np.nan
+            continue
+
+        out[r, :] = 0.0
+        sum_weights = 0.0
+        for j in range(start, end):
+            c = indices[j]
+            w = data[j]
+            sum_weights += w
+            for q in range(k):
+                out[r, q] += w * x[c, q]
+
+        for q in range(k):
+            out[r, q] /= sum_weights
+
+
+@parallel_kernel
+def _weighted_average_nan_numba(indptr, indices, data, x, out):
+    m = indptr.size - 1
+    k = x.shape[1]
+    for r in prange(m):
+        start = indptr[r]
+        end = indptr[r + 1]
+        if start == end:
+            out[r, :] = np.nan
+            continue
+
+        out[r, :] = 0.0
+        sum_weights = np.zeros(k, dtype=np.float64)
+        for j in range(start, end):
+            c = indices[j]
+            w = data[j]
+            for q in range(k):
+                v = x[c, q]
+                if not np.isnan(v):
+                    out[r, q] += w * v
+                    sum_weights[q] += w
+
+        for q in range(k):
+            if sum_weights[q] > 0.0:
+                out[r, q] /= sum_weights[q]
+            else:
+                out[r, q] = np.nan
+
+
+REDUCTIONS = ("min", "max", "sum", "count", "mean", "var", "std")
+
+
+def reduce_rows(reduction: str, weights, x: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    Applies one of the built-in `REDUCTIONS` over the source elements that each destination element covers, skipping
+    the `NaN` values:
+
+    - "min"/"max": minimum/maximum of the overlapping source elements; the weights are ignored.
+    - "sum": coverage weighted sum, i.e. `sum_c(w[r, c] * x[c, :])`.
+    - "count": number of the overlapping source elements that are not `NaN`; the weights are ignored.
+    - "mean": coverage weighted average; the same as `weighted_average`.
+    - "var"/"std": coverage weighted (population) variance/standard deviation.
+
+    The destination elements that are not covered at all, or are covered only by `NaN` values, are set to `NaN`,
+    except for "count" which is set to zero.
+
+    If numba is available, the reductions are compiled and run in parallel over the destination rows; otherwise,
+    NumPy implementations are used.
+
+    :param reduction: one of `REDUCTIONS`.
+    :param weights: The (m, n) weight matrix as a `scipy.sparse.csr_matrix`.
+    :param x: The (n, k) input data. It is never modified.
+    :param out: The (m, k) output, which is overwritten.
+    """
+    if reduction not in REDUCTIONS:
+        raise ValueError(f"reduction must be one of {REDUCTIONS}; got {reduction}.")
+
+    if reduction == "mean":
+        return weighted_average(weights, x, out)
+
+    if x.dtype.kind not in "fc":
+        x = x.astype(np.float64)
+
+    if NUMBA_AVAILABLE:
+        kernel = {
+            "min": _min_numba,
+            "max": _max_numba,
+            "sum": _sum_numba,
+            "count": _count_numba,
+            "var": _var_numba,
+            "std": _var_numba
+        }[reduction]
+        kernel(weights.indptr, weights.indices, weights.data, x, out)
+    else:
+        _reduce_rows_numpy(reduction, weights, x, out)
+
+    if reduction == "std":
+        np.sqrt(out, out=out)
+
+    return out
+
+
+def _reduce_rows_numpy(reduction: str, weights, x: np.ndarray, out: np.ndarray) -> None:
+    empty_rows = np.diff(weights.indptr) == 0
+
+    if reduction in ("sum", "count"):
+        valid = ~np.isnan(x)
+        if reduction == "sum":
+            out[...] = weights @ np.where(valid, x, 0.0)
+            out[(weights @ valid.astype(np.float64)) == 0] = np.nan
+        else:
+            coverage = weights.copy()
+            coverage.data[:] = 1.0
+            out[...] = coverage @ valid.astype(np.float64)
+        return
+
+    out[...] = np.nan
+    for r in np.flatnonzero(~empty_rows):
+        start = weights.indptr[r]
+        end = weights.indptr[r + 1]
+        values = x[weights.indices[start:end], :]
+        if reduction == "min":
+            out[r, :] = np.fmin.reduce(values, axis=0)
+        elif reduction == "max":
+            out[r, :] = np.fmax.reduce(values, axis=0)
+        else:
+            valid = ~np.isnan(values)
+            w = np.where(valid, weights.data[start:end].reshape((-1, 1)), 0.0)
+            values = np.where(valid, values, 0.0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                sum_weights = w.sum(axis=0)
+                mean = (w * values).sum(axis=0) / sum_weights
+                out[r, :] = (w * (values - mean) ** 2).sum(axis=0) / sum_weights
+
+
+@parallel_kernel
+def _min_numba(indptr, indices, data, x, out):
+    m = indptr.size - 1
+    k = x.shape[1]
+    for r in prange(m):
+        out[r, :] = np.nan
+        for j in range(indptr[r], indptr[r + 1]):
+            c = indices[j]
+            for q in range(k):
+                v = x[c, q]
+                if (v < out[r, q]) or np.isnan(out[r, q]):
+                    out[r, q] = v
+
+
+@parallel_kernel
+def _max_numba(indptr, indices, data, x, out):
+    m = indptr.size - 1
+    k = x.shape[1]
+    for r in prange(m):
+        out[r, :] = np.nan
+        for j in range(indptr[r], indptr[r + 1]):
+            c = indices[j]
+            for q in range(k):
+                v = x[c, q]
+                if (v > out[r, q]) or np.isnan(out[r, q]):
+                    out[r, q] = v
+
+
+@parallel_kernel
+def _sum_numba(indptr, indices, data, x, out):
+    m = indptr.size - 1
+    k = x.shape[1]
+    for r in prange(m):
+        out[r, :] = 0.0
+        n_valid = np.zeros(k, dtype=np.int64)
+        for j in range(indptr[r], indptr[r + 1]):
+            c = indices[j]
+            w = data[j]
+            for q in range(k):
+                v = x[c, q]
+                if not np.isnan(v):
+                    out[r, q] += w * v
+                    n_valid[q] += 1
+
+        for q in range(k):
+            if n_valid[q] == 0:
+                out[r, q] = np.nan
+
+
+@parallel_kernel
+def _count_numba(indptr, indices, data, x, out):
+    m = indptr.size - 1
+    k = x.shape[1]
+    for r in prange(m):
+        out[r, :] = 0.0
+        for j in range(indptr[r], indptr[r + 1]):
+            c = indices[j]
+            for q in range(k):
+                if not np.isnan(x[c, q]):
+                    out[r, q] += 1.0
+
+
+@parallel_kernel
+def _var_numba(indptr, indices, data, x, out):
+    m = indptr.size - 1
+    k = x.shape[1]
+    for r in prange(m):
+        start = indptr[r]
+        end = indptr[r + 1]
+
+        # first pass: the weighted mean.
+        mean = np.zeros(k, dtype=np.float64)
+        sum_weights = np.zeros(k, dtype=np.float64)
+        for j in range(start, end):
+            c = indices[j]
+            w = data[j]
+            for q in range(k):
+                v = x[c, q]
+                if not np.isnan(v):
+                    mean[q] += w * v
+                    sum_weights[q] += w
+
+        for q in range(k):
+            if sum_weights[q] > 0.0:
+                mean[q] /= sum_weights[q]
+
+        # second pass: the weighted sum of the squared deviations.
+        out[r, :] = 0.0
+        for j in range(start, end):
+            c = indices[j]
+            w = data[j]
+            for q in range(k):
+                v = x[c, q]
+                if not np.isnan(v):
+                    out[r, q] += w * (v - mean[q]) ** 2
+
+        for q in range(k):
+            if sum_weights[q] > 0.0:
+                out[r, q] /= sum_weights[q]
+            else:
+                out[r, q] = np.nan
+
+
+def partial_reduce(reduction: str, weights, x: np.ndarray) -> tuple:
+    """
+    Calculates the partial state of the reduction over a subset of the source elements, i.e. a chunk of the columns of
+    the weight matrix, so that the states of the other subsets could be merged using `combine_partials` and the final
+    result is calculated using `finalize_partial`. The state is a tuple of (m, k) arrays:
+
+    - "min"/"max": the minimum/maximum (`NaN` if none).
+    - "count": the number of the valid values.
+    - "sum"/"mean": the sum of the weights of the valid values and the weighted sum.
+    - "var"/"std": the sum of the weights of the valid values, the weighted mean, and the weighted sum of the squared
+      deviations from the mean.
+
+    :param weights: The (m, n) weight matrix, or a column slice of it, as a `scipy.sparse.csr_matrix`.
+    :param x: The (n, k) input data corresponding to the columns of `weights`.
+    """
+    if reduction not in REDUCTIONS:
+        raise ValueError(f"reduction must be one of {REDUCTIONS}; got {reduction}.")
+
+    if reduction in ("min", "max", "count"):
+        out = np.empty((weights.shape[0], x.shape[1]), dtype=np.float64)
+        return reduce_rows(reduction, weights, x, out),
+
+    if x.dtype.kind not in "fc":
+        x = x.astype(np.float64)
+
+    order = 2 if reduction in ("var", "std") else 1
+    shape = (weights.shape[0], x.shape[1])
+    sum_weights = np.empty(shape, dtype=np.float64)
+    first_moment = np.empty(shape, dtype=np.float64)
+    m2 = np.empty(shape if order == 2 else (0, 0), dtype=np.float64)
+
+    if NUMBA_AVAILABLE:
+        _moments_numba(weights.indptr, weights.indices, weights.data, x, sum_weights, first_moment, m2, order)
+    else:
+        _moments_numpy(weights, x, sum_weights, first_moment, m2, order)
+
+    if order == 1:
+        return sum_weights, first_moment
+    return sum_weights, first_moment, m2
+
+
+def empty_partial(reduction: str, shape: tuple) -> tuple:
+    """
+    Returns the partial state of the reduction over no source elements, i.e. the identity of `combine_partials`.
+    """
+    if reduction not in REDUCTIONS:
+        raise ValueError(f"reduction must be one of {REDUCTIONS}; got {reduction}.")
+
+    if reduction in ("min", "max"):
+        return np.full(shape, np.nan),
+    if reduction == "count":
+        return np.zeros(shape),
+    if reduction in ("sum", "mean"):
+        return np.zeros(shape), np.zeros(shape)
+    return np.zeros(shape), np.zeros(shape), np.zeros(shape)
+
+
+def combine_partials(reduction: str, a: tuple, b: tuple) -> tuple:
+    """
+    Merges two partial states of the reduction, i.e. those returned by `partial_reduce` over disjoint subsets of the
+    source elements. The merge is associative; so, the states could be merged in any grouping, e.g. as a tree.
+    """
+    if reduction == "min":
+        return np.fmin(a[0], b[0]),
+    if reduction == "max":
+        return np.fmax(a[0], b[0]),
+    if reduction == "count":
+        return a[0] + b[0],
+    if reduction in ("sum", "mean"):
+        return a[0] + b[0], a[1] + b[1]
+
+    # var/std: the parallel algorithm by Chan et al., weighted.
+    sum_weights_a, mean_a, m2_a = a
+    sum_weights_b, mean_b, m2_b = b
+    sum_weights = sum_weights_a + sum_weights_b
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = np.where(sum_weights_b > 0.0, mean_b, 0.0) - np.where(sum_weights_a > 0.0, mean_a, 0.0)
+        mean = np.where(sum_weights_a > 0.0, mean_a, 0.0) + delta * (sum_weights_b / sum_weights)
+        m2 = (np.where(sum_weights_a > 0.0, m2_a, 0.0) + np.where(sum_weights_b > 0.0, m2_b, 0.0) +
+              delta ** 2 * (sum_weights_a * sum_weights_b / sum_weights))
+    return sum_weights, mean, m2
+
+
+def finalize_partial(reduction: str, partial: tuple, out: np.ndarray) -> np.ndarray:
+    """
+    Calculates the result of the reduction from its (merged) partial state; check `partial_reduce`. The results are
+    the same as `reduce_rows` (up to the floating point round-off of the summation order).
+    """
+    if reduction in ("min", "max", "count"):
+        out[...] = partial[0]
+        return out
+
+    sum_weights = partial[0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if reduction == "sum":
+            out[...] = partial[1]
+        elif reduction == "mean":
+            np.divide(partial[1], sum_weights, out=out)
+        else:
+            np.divide(partial[2], sum_weights, out=out)
+            if reduction == "std":
+                np.sqrt(out, out=out)
+    out[sum_weights == 0.0] = np.nan
+
+    return out
+
+
+def _moments_numpy(weights, x: np.ndarray, sum_weights, first_moment, m2, order: int) -> None:
+    valid = ~np.isnan(x)
+    x = np.where(valid, x, 0.0)
+    sum_weights[...] = weights @ valid.astype(np.float64)
+    first_moment[...] = weights @ x
+    if order == 1:
+        return
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        first_moment /= sum_weights
+    for r in range(weights.shape[0]):
+        start = weights.indptr[r]
+        end = weights.indptr[r + 1]
+        w = np.where(valid[weights.indices[start:end], :], weights.data[start:end].reshape((-1, 1)), 0.0)
+        m2[r, :] = (w * (x[weights.indices[start:end], :] - first_moment[r, :]) ** 2).sum(axis=0)
+
+
+@parallel_kernel
+def _moments_numba(indptr, indices, data, x, sum_weights, first_moment, m2, order):
+    # order == 1: first_moment is the weighted sum; order == 2: first_moment is the weighted mean and m2 is the
+    # weighted sum of the squared deviations from it.
+    m = indptr.size - 1
+    k = x.shape[1]
+    for r in prange(m):
+        start = indptr[r]
+        end = indptr[r + 1]
+        sum_weights[r, :] = 0.0
+        first_moment[r, :] = 0.0
+        for j in range(start, end):
+            c = indices[j]
+            w = data[j]
+            for q in range(k):
+                v = x[c, q]
+                if not np.isnan(v):
+                    first_moment[r, q] += w * v
+                    sum_weights[r, q] += w
+
+        if order == 1:
+            continue
+
+        for q in range(k):
+            if sum_weights[r, q] > 0.0:
+                first_moment[r, q] /= sum_weights[r, q]
+            else:
+                first_moment[r, q] = np.nan
+
+        m2[r, :] = 0.0
+        for j in range(start, end):
+            c = indices[j]
+            w = data[j]
+            for q in range(k):
+                v = x[c, q]
+                if not np.isnan(v):
+                    m2[r, q] += w * (v - first_moment[r, q]) ** 2
+
+
+class Partition(NamedTuple):
+    """
+    Describes a weight matrix where each source element falls wholly within, at most, one destination element and
+    the source elements of each destination element are contiguous, e.g. hourly to daily or daily to monthly.
+
+    - first: the first source element that is covered.
+    - indptr: the CSR `indptr`; the source elements of destination element `r` are `first + indptr[r]` up to
+      `first + indptr[r + 1]`.
+    - group_size: the number of source elements per destination element if it is the same for all of them, i.e. a
+      zero-copy reshape could be used; otherwise zero.
+    """
+    first: int
+    indptr: np.ndarray
+    group_size: int
+
+
+PARTITION_REDUCTIONS = ("min", "max", "sum", "mean")
+
+
+def partition_parameters(weights) -> (Partition, None):
+    """
+    Checks whether the provided weight matrix is a partition (check `Partition`), and if so, returns its parameters;
+    otherwise, returns `None`.
+    """
+    nnz = weights.nnz
+    if (nnz == 0) or (not np.all(weights.data == 1.0)):
+        return None
+
+    first = int(weights.indices[0])
+    if not np.array_equal(weights.indices, np.arange(first, first + nnz)):
+        return None
+
+    sizes = np.diff(weights.indptr)
+    group_size = int(sizes[0]) if np.all(sizes == sizes[0]) else 0
+
+    return Partition(first, weights.indptr, group_size)
+
+
+def reduce_partition(reduction: str, partition: Partition, x: np.ndarray, out: np.ndarray) -> bool:
+    """
+    Applies the reduction using a zero-copy reshape when all the groups have the same size, instead of the sparse
+    weight matrix. The results are the same as `reduce_rows`.
+
+    Only `PARTITION_REDUCTIONS` are supported; "sum" and "mean" are supported only if `x` has no `NaN`, as the
+    compiled kernels already handle that case in a single pass. Groups of different sizes, e.g. hourly to monthly,
+    are reduced by `np.add.reduceat` only for "sum" and "mean" when numba is not available; otherwise, the CSR
+    kernels of `reduce_rows` are faster.
+
+    :return: `True` if the reduction was applied; `False` if it is not supported and `out` is untouched.
+    """
+    if reduction not in PARTITION_REDUCTIONS:
+        return False
+
+    if (partition.group_size == 0) and (NUMBA_AVAILABLE or (reduction not in ("sum", "mean"))):
+        return False
+
+    if (reduction in ("sum", "mean")) and has_nan(x):
+        return False
+
+    m = partition.indptr.size - 1
+    k = x.shape[1]
+    nnz = int(partition.indptr[-1])
+    grouped = x[partition.first:(partition.first + nnz), :]
+
+    if partition.group_size > 0:
+        grouped = grouped.reshape((m, partition.group_size, k))
+        if reduction == "mean":
+            np.mean(grouped, axis=1, out=out)
+        elif reduction == "sum":
+            np.add.reduce(grouped, axis=1, out=out)
+        elif reduction == "min":
+            np.fmin.reduce(grouped, axis=1, out=out)
+        else:
+            np.fmax.reduce(grouped, axis=1, out=out)
+    else:
+        sizes = np.diff(partition.indptr)
+        non_empty = sizes > 0
+
+        reduced = np.add.reduceat(grouped, partition.indptr[:-1][non_empty], axis=0)
+        if reduction == "mean":
+            reduced = reduced / sizes[non_empty].reshape((-1, 1))
+
+        out[non_empty, :] = reduced
+        out[~non_empty, :] = np.nan
+
+    return True
+
+
+class SlidingWindow(NamedTuple):
+    """
+    Describes a weight matrix where each destination element fully covers `size` consecutive source elements and
+    consecutive destination elements are shifted `stride` source elements forward, e.g. a moving window built by
+    `RollingWindowAxisBuilder` over the source axis. The source elements of destination element `r` are
+    `first + r * stride` up to `first + r * stride + size`.
+    """
+    first: int
+    stride: int
+    size: int
+
+
+SLIDING_WINDOW_REDUCTIONS = ("min", "max", "sum", "count", "mean")
+
+
+def sliding_window_parameters(weights) -> (SlidingWindow, None):
+    """
+    Checks whether the provided weight matrix is a sliding window (check `SlidingWindow`), and if so, returns its
+    parameters; otherwise, returns `None`.
+    """
+    m = weights.shape[0]
+    nnz = weights.nnz
+    if (m == 0) or (nnz == 0) or (nnz % m != 0) or (not np.all(weights.data == 1.0)):
+        return None
+
+    size = nnz // m
+    if not np.all(np.diff(weights.indptr) == size):
+        return None
+
+    columns = weights.indices.reshape((m, size))
+    first = int(columns[0, 0])
+    stride = int(columns[1, 0] - columns[0, 0]) if m > 1 else 1
+    if stride < 1:
+        return None
+
+    expected = first + stride * np.arange(m).reshape((-1, 1)) + np.arange(size).reshape((1, -1))
+    if not np.array_equal(columns, expected):
+        return None
+
+    return SlidingWindow(first, stride, size)
+
+
+def reduce_sliding_window(reduction: str, window: SlidingWindow, x: np.ndarray, out: np.ndarray) -> bool:
+    """
+    Applies the reduction over a sliding window without visiting each source element once per window that covers it;
+    instead, each window is assembled from a block suffix and a block prefix, i.e. the van Herk/Gil-Werman scheme.
+    Hence, the cost does not depend on the window size. The results are the same as `reduce_rows` (up to the floating
+    point round-off of the summation order).
+
+    If numba is not available, the sums are calculated from NaN-aware cumulative sums and the minimums/maximums are
+    reduced over a strided view of the windows.
+
+    :return: `True` if the reduction was applied; `False` if it is not supported and `out` is untouched.
+    """
+    if reduction not in SLIDING_WINDOW_REDUCTIONS:
+        return False
+
+    if x.dtype.kind not in "fc":
+        x = x.astype(np.float64)
+
+    if NUMBA_AVAILABLE:
+        if reduction in ("min", "max"):
+            _sliding_extremum_numba(window.first, window.stride, window.size, x, out, reduction == "max")
+        else:
+            mode = {"sum": 0, "mean": 1, "count": 2}[reduction]
+            _sliding_sum_numba(window.first, window.stride, window.size, x, out, mode)
+    else:
+        _reduce_sliding_window_numpy(reduction, window, x, out)
+
+    return True
+
+
+def _reduce_sliding_window_numpy(reduction: str, window: SlidingWindow, x: np.ndarray, out: np.ndarray) -> None:
+    m = out.shape[0]
+    span = x[window.first:(window.first + (m - 1) * window.stride + window.size), :]
+
+    if reduction in ("min", "max"):
+        windows = np.lib.stride_tricks.sliding_window_view(span, window.size, axis=0)[::window.stride]
+        (np.fmin if reduction == "min" else np.fmax).reduce(windows, axis=-1, out=out)
+        return
+
+    valid = ~np.isnan(span)
+    starts = np.arange(m) * window.stride
+    ends = starts + window.size
+
+    counts = np.zeros((span.shape[0] + 1, span.shape[1]), dtype=np.int64)
+    np.cumsum(valid, axis=0, out=counts[1:])
+    n_valid = counts[ends] - counts[starts]
+    if reduction == "count":
+        out[...] = n_valid
+        return
+
+    sums = np.zeros((span.shape[0] + 1, span.shape[1]), dtype=np.float64)
+    np.cumsum(np.where(valid, span, 0.0), axis=0, out=sums[1:])
+    out[...] = sums[ends] - sums[starts]
+    if reduction == "mean":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out /= n_valid
+    out[n_valid == 0] = np.nan
+
+
+# number of columns that are processed together; each block of columns is processed by one thread.
+_COLUMN_BLOCK = 64
+
+
+@njit(cache=True, inline="always")
+def _nan_extremum(a, b, is_max):
+    # the same as np.fmax/np.fmin, i.e. NaN is returned only if both are NaN.
+    if np.isnan(a):
+        return b
+    if np.isnan(b):
+        return a
+    if is_max:
+        return a if a >= b else b
+    return a if a <= b else b
+
+
+# The sliding window kernels follow the van Herk/Gil-Werman scheme: the source is split into blocks of `size`
+# elements, starting at the first pending window. Each window starting inside the block [bs, bs + size) is the union
+# of a suffix of that block and a prefix of the next one; so, after one backward pass over the block and one forward
+# pass over the next, each window is reduced with a single operation. Each source element is visited at most twice
+# regardless of the window size, and unlike subtracting the elements leaving the window, no round-off is accumulated.
+
+
+@parallel_kernel
+def _sliding_sum_numba(first, stride, size, x, out, mode):
+    # mode: 0: sum, 1: mean, 2: count
+    m = out.shape[0]
+    k = out.shape[1]
+    n_blocks = (k + _COLUMN_BLOCK - 1) // _COLUMN_BLOCK
+    for b in prange(n_blocks):
+        q0 = b * _COLUMN_BLOCK
+        q1 = min(q0 + _COLUMN_BLOCK, k)
+        suffix_sum = np.empty((size + 1, q1 - q0), dtype=np.float64)
+        suffix_count = np.empty((size + 1, q1 - q0), dtype=np.int64)
+        prefix_sum = np.empty((size + 1, q1 - q0), dtype=np.float64)
+        prefix_count = np.empty((size + 1, q1 - q0), dtype=np.int64)
+
+        r = 0
+        while r < m:
+            bs = first + r * stride
+            r_end = r
+            while (r_end < m) and (first + r_end * stride < bs + size):
+                r_end += 1
+            pe = first + (r_end - 1) * stride + size
+
+            # suffix_*[i] covers [bs + i, bs + size); prefix_*[i] covers [bs + size, bs + size + i).
+            suffix_sum[size, :] = 0.0
+            suffix_count[size, :] = 0
+            for i in range(size - 1, -1, -1):
+                for q in range(q0, q1):
+                    v = x[bs + i, q]
+                    valid = not np.isnan(v)
+                    suffix_sum[i, q - q0] = suffix_sum[i + 1, q - q0] + (v if valid else 0.0)
+                    suffix_count[i, q - q0] = suffix_count[i + 1, q - q0] + (1 if valid else 0)
+
+            prefix_sum[0, :] = 0.0
+            prefix_count[0, :] = 0
+            for i in range(pe - bs - size):
+                for q in range(q0, q1):
+                    v = x[bs + size + i, q]
+                    valid = not np.isnan(v)
+                    prefix_sum[i + 1, q - q0] = prefix_sum[i, q - q0] + (v if valid else 0.0)
+                    prefix_count[i + 1, q - q0] = prefix_count[i, q - q0] + (1 if valid else 0)
+
+            for rr in range(r, r_end):
+                i = first + rr * stride - bs
+                for q in range(q0, q1):
+                    n_valid = suffix_count[i, q - q0] + prefix_count[i, q - q0]
+                    total = suffix_sum[i, q - q0] + prefix_sum[i, q - q0]
+                    if mode == 2:
+                        out[rr, q] = n_valid
+                    elif n_valid == 0:
+                        out[rr, q] = np.nan
+                    elif mode == 1:
+                        out[rr, q] = total / n_valid
+                    else:
+                        out[rr, q] = total
+
+            r = r_end
+
+
+@parallel_kernel
+def _sliding_extremum_numba(first, stride, size, x, out, is_max):
+    m = out.shape[0]
+    k = out.shape[1]
+    n_blocks = (k + _COLUMN_BLOCK - 1) // _COLUMN_BLOCK
+    for b in prange(n_blocks):
+        q0 = b * _COLUMN_BLOCK
+        q1 = min(q0 + _COLUMN_BLOCK, k)
+        suffix = np.empty((size + 1, q1 - q0), dtype=np.float64)
+        prefix = np.empty((size + 1, q1 - q0), dtype=np.float64)
+
+        r = 0
+        while r < m:
+            bs = first + r * stride
+            r_end = r
+            while (r_end < m) and (first + r_end * stride < bs + size):
+                r_end += 1
+            pe = first + (r_end - 1) * stride + size
+
+            # suffix[i] covers [bs + i, bs + size); prefix[i] covers [bs + size, bs + size + i).
+            suffix[size, :] = np.nan
+            for i in range(size - 1, -1, -1):
+                for q in range(q0, q1):
+                    suffix[i, q - q0] = _nan_extremum(x[bs + i, q], suffix[i + 1, q - q0], is_max)
+
+            prefix[0, :] = np.nan
+            for i in range(pe - bs - size):
+                for q in range(q0, q1):
+                    prefix[i + 1, q - q0] = _nan_extremum(prefix[i, q - q0], x[bs + size + i, q], is_max)
+
+            for rr in range(r, r_end):
+                i = first + rr * stride - bs
+                for q in range(q0, q1):
+                    out[rr, q] = _nan_extremum(suffix[i, q - q0], prefix[i, q - q0], is_max)
+
+            r = r_end
+
+
+def detect_structure(weights) -> (Partition, SlidingWindow, None):
+    """
+    Detects whether the weight matrix has a structure that a specialized engine could take advantage of, i.e. a
+    `Partition` or a `SlidingWindow`. Returns `None` if there is no such structure.
+    """
+    partition = partition_parameters(weights)
+    if (partition is not None) and (partition.group_size > 0):
+        return partition
+
+    window = sliding_window_parameters(weights)
+    if window is not None:
+        return window
+
+    return partition
+
+
+def reduce_structured(reduction: str, structure, x: np.ndarray, out: np.ndarray) -> bool:
+    """
+    Applies the reduction using the engine specialized for the provided structure, i.e. the one returned by
+    `detect_structure`.
+
+    :return: `True` if the reduction was applied; `False` if it is not supported and `out` is untouched.
+    """
+    if isinstance(structure, Partition):
+        return reduce_partition(reduction, structure, x, out)
+    if isinstance(structure, SlidingWindow):
+        return reduce_sliding_window(reduction, structure, x, out)
+    return False
+
+
+def locate_bounds(lower_bound: np.ndarray, upper_bound: np.ndarray, values: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    Finds the element containing each value, i.e. the last element whose lower bound is at or before the value,
+    provided that the value is also before its upper bound. The values that are outside all the elements, or fall
+    in a gap between them, are set to -1.
+
+    The compiled kernel first looks the value up in a table of evenly spaced buckets, i.e. one holding the number of
+    lower bounds before each bucket, and then searches only the lower bounds within that bucket; hence, for axes that
+    are close to regular, each lookup touches a couple of cache lines instead of `log(n)`; check `bucket_table`.
+
+    :param lower_bound: The (n,) lower bounds; they must be monotonically increasing.
+    :param upper_bound: The (n,) upper bounds.
+    :param values: The (k,) int64 values.
+    :param out: The (k,) int64 output, which is overwritten.
+    """
+    if lower_bound.size == 0:
+        out[...] = -1
+    elif NUMBA_AVAILABLE:
+        lower_bound = np.ascontiguousarray(lower_bound)
+        origin, shift, table = bucket_table(lower_bound)
+        _locate_bounds_numba(lower_bound, np.ascontiguousarray(upper_bound), origin, shift, table, values, out)
+    else:
+        np.subtract(np.searchsorted(lower_bound, values, side="right"), 1, out=out)
+        miss = out < 0
+        out[miss] = 0
+        miss |= values >= upper_bound[out]
+        out[miss] = -1
+
+    return out
+
+
+# the average number of elements per bucket of a `bucket_table`, i.e. the elements of a bucket share a cache line,
+# and the largest number of buckets.
+BUCKET_SIZE = 4
+MAX_BUCKETS = 1 << 22
+
+
+def bucket_table(a: np.ndarray, bucket_size: int = BUCKET_SIZE) -> (int, int, np.ndarray):
+    """
+    Returns `(origin, shift, table)` for the non-empty, sorted `a`, where bucket `b` covers the values `v` with
+    `(v - origin) >> shift == b`, and `table[b]` is the number of elements of `a` before the beginning of bucket `b`.
+    There are about `bucket_size` elements per bucket, and the last entry of the table is the number of elements. The
+    table is kept small, i.e. int32 if possible, so that it stays in cache.
+    """
+    n = a.size
+    origin = int(a[0])
+    span = int(a[-1]) - origin + 1
+    n_buckets = min(1 << max((n - 1) // bucket_size, 1).bit_length(), MAX_BUCKETS)
+    shift = max((span - 1) // n_buckets, 0).bit_length()
+    # the beginning of each bucket, plus one past the last element.
+    edges = origin + (np.arange(((span - 1) >> shift) + 2, dtype=np.int64) << shift)
+    table = np.searchsorted(a, edges, side="left")
+    return origin, shift, table.astype(np.int32 if n < np.iinfo(np.int32).max else np.int64)
+
+
+@njit(cache=True, inline="always")
+def _count_at_or_before(a, origin, shift, table, v):
+    """
+    Returns the number of the elements of `a` that are at or before `v`, using the `bucket_table` of `a`. The binary
+    search within the bucket is branch free, since the values are usually in random order.
+    """
+    if v < origin:
+        return 0
+
+    b = (v - origin) >> shift
+    if b >= table.size - 1:
+        return a.size
+
+    # the count is between table[b] and table[b + 1].
+    base = table[b]
+    length = table[b + 1] - base
+    if length == 0:
+        return base
+    while length > 1:
+        half = length >> 1
+        base += half * (a[base + half - 1] <= v)
+        length -= half
+    return base + (a[base] <= v)
+
+
+@parallel_kernel
+def _locate_bounds_numba(lower_bound, upper_bound, origin, shift, table, values, out):
+    for j in prange(values.size):
+        v = values[j]
+        i = _count_at_or_before(lower_bound, origin, shift, table, v) - 1
+        out[j] = i if (i >= 0) and (v < upper_bound[i]) else -1
+
+
+def locate_runs(runs: np.ndarray, run_index: np.ndarray, values: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    Same as `locate_bounds` for an axis stored as runs of evenly spaced elements, i.e. a `RegularAxis` or a
+    `PiecewiseRegularAxis`. Only the runs are searched; the element within the run is calculated in closed form.
+
+    :param runs: The (5, nruns) `start`, `stride`, `length`, `width`, and `data_tick_offset` of the runs.
+    :param run_index: The (nruns + 1,) index of the first element of each run, followed by the number of elements.
+    """
+    if NUMBA_AVAILABLE:
+        start = np.ascontiguousarray(runs[0, :])
+        # there are usually few runs; so, the table is small even with one run per bucket.
+        origin, shift, table = bucket_table(start, bucket_size=1)
+        _locate_runs_numba(
+            start, np.ascontiguousarray(runs[1, :]), np.ascontiguousarray(runs[2, :]), np.ascontiguousarray(runs[3, :]),
+            run_index, origin, shift, table, values, out
+        )
+    else:
+        r = np.searchsorted(runs[0, :], values, side="right") - 1
+        miss = r < 0
+        r[miss] = 0
+        start = runs[0, r]
+        k = np.minimum((values - start) // runs[1, r], runs[2, r] - 1)
+        miss |= values >= start + k * runs[1, r] + runs[3, r]
+        np.add(run_index[r], k, out=out)
+        out[miss] = -1
+
+    return out
+
+
+@parallel_kernel
+def _locate_runs_numba(start, stride, length, width, run_index, origin, shift, table, values, out):
+    for j in prange(values.size):
+        v = values[j]
+        r = _count_at_or_before(start, origin, shift, table, v) - 1
+        if r < 0:
+            out[j] = -1
+            continue
+
+        k = min((v - start[r]) // stride[r], length[r] - 1)
+        if v < start[r] + k * stride[r] + width[r]:
+            out[j] = run_index[r] + k
+        else:
+            out[j] = -1
@@ -0,0 +1,205 @@
+"""
+Applies user-defined functions over the destination elements on a pool of worker processes; used by
+`AxisRemapper.apply_function`.
+
+Arbitrary Python functions hold the GIL; hence, they only scale across cores in separate processes. To avoid pickling
+the data, the (n, k) input, the (m, k) output, and the index arrays of the weight matrix are placed in
+`multiprocessing.shared_memory` blocks, and only their names, along with the pickled function and a range of
+destination elements, are sent to the workers. Each worker attaches the shared blocks and fills the rows of the
+output that it is given; the rows are split so that each task covers about the same number of source elements.
+
+The function is pickled with cloudpickle, if available, so that lambdas and locally defined functions could be used
+as well.
+
+`multiprocessing.shared_memory` is only available on Python 3.8 and later; on older versions, `apply_function` raises
+a `RuntimeError`.
+"""
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from typing import Callable
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+try:
+    import cloudpickle as pickle
+except ImportError:  # pragma: no cover
+    import pickle
+
+try:
+    from multiprocessing import shared_memory
+    SHARED_MEMORY_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    shared_memory = None
+    SHARED_MEMORY_AVAILABLE = False
+
+
+# The number of tasks per worker process; more tasks balance the load better, at the cost of more round trips.
+TASKS_PER_PROCESS = 4
+
+_SHARED_POOLS = {}
+_SHARED_POOLS_LOCK = threading.Lock()
+
+
+def shared_process_pool(processes: int) -> ProcessPoolExecutor:
+    """
+    Returns the process-wide pool with `processes` worker processes, creating it on first use. The workers are
+    started with the "spawn" method, so that they do not inherit the threads, e.g. those of numba, of the parent.
+    """
+    processes = int(processes)
+    with _SHARED_POOLS_LOCK:
+        pool = _SHARED_POOLS.get(processes)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=processes, mp_context=get_context("spawn"))
+            _SHARED_POOLS[processes] = pool
+        return pool
+
+
+def apply_function(data: np.ndarray,
+                   func2apply: Callable,
+                   weights: csr_matrix,
+                   processes: (int, Executor),
+                   out: np.ndarray = None) -> np.ndarray:
+    """
+    Applies `func2apply` on the source elements overlapping each destination element, i.e. the same as
+    `AxisRemapper._apply_function`, on worker processes.
+
+    :param data: The (n, t_1, t_2, ...) input data, i.e. with the source axis first; it is copied into the shared
+                 memory as the (n, k) matrix, where k is the product of the trailing dimensions, without any other
+                 intermediate copy.
+    :param func2apply: The user-defined function; it receives the (n_r, k) source elements of one destination element
+                       and must return k values.
+    :param weights: The (m, n) weight matrix.
+    :param processes: Either the number of worker processes of a shared pool (check `shared_process_pool`), or a
+                      `concurrent.futures.ProcessPoolExecutor`.
+    :param out: Optionally, the (m, t_1, t_2, ...) array, e.g. a view of the caller's output buffer, to write the
+                result into; the result is copied out of the shared memory directly into it.
+    :return: The (m, k) output, or `out` if provided; the destination elements that are not covered are set to `NaN`.
+    """
+    if not SHARED_MEMORY_AVAILABLE:
+        raise RuntimeError("processes requires multiprocessing.shared_memory, i.e. Python 3.8 or later.")
+
+    if isinstance(processes, Executor):
+        pool = processes
+        n_processes = getattr(processes, "_max_workers", 1)
+    else:
+        if isinstance(processes, str) or int(processes) < 1:
+            raise ValueError(f"processes must be a positive integer or a ProcessPoolExecutor; got {processes}.")
+        n_processes = int(processes)
+        pool = shared_process_pool(n_processes)
+
+    m, n = weights.shape
+    k = int(np.prod(data.shape[1:], dtype=np.int64))
+    func_bytes = pickle.dumps(func2apply)
+
+    blocks = []
+    try:
+        shared_data = _SharedArray.empty((n, k), np.float64)
+        blocks.append(shared_data)
+        shared_data.array.reshape(data.shape)[...] = data
+        blocks.append(_SharedArray.copy_of(weights.indptr))
+        blocks.append(_SharedArray.copy_of(weights.indices))
+        output = _SharedArray.empty((m, k), np.float64)
+        blocks.append(output)
+        output.array.fill(np.nan)
+
+        descriptors = tuple(b.descriptor for b in blocks)
+        futures = [
+            pool.submit(_apply_rows, func_bytes, descriptors, r0, r1)
+            for r0, r1 in split_rows(weights.indptr, n_processes * TASKS_PER_PROCESS)
+        ]
+        # all the tasks must finish before the shared blocks are released, even if one of them fails.
+        wait(futures)
+        for future in futures:
+            future.result()
+
+        # the shared block is released below; so, the result is copied out of it exactly once.
+        if out is None:
+            return output.array.copy()
+        out[...] = output.array.reshape(out.shape)
+        return out
+    finally:
+        for b in blocks:
+            b.release()
+
+
+def split_rows(indptr: np.ndarray, n_tasks: int) -> list:
+    """
+    Splits the rows of a CSR matrix into at most `n_tasks` contiguous ranges, each having about the same number of
+    non-zeros.
+
+    :return: a list of `(first_row, last_row + 1)`.
+    """
+    m = indptr.size - 1
+    if m == 0:
+        return []
+
+    n_tasks = max(1, min(int(n_tasks), m))
+    targets = np.linspace(indptr[0], indptr[-1], n_tasks + 1)[1:-1]
+    bounds = np.unique(np.concatenate(([0], np.searchsorted(indptr[1:], targets, side="left") + 1, [m])))
+    bounds = np.minimum(bounds, m)
+    return [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+
+class _SharedArray:
+    """
+    A NumPy array stored in a `multiprocessing.shared_memory.SharedMemory` block. The owner creates it; the workers
+    attach to it using its `descriptor`, i.e. `(name, shape, dtype)`.
+    """
+    def __init__(self, shm: shared_memory.SharedMemory, shape: tuple, dtype, owner: bool) -> None:
+        self._shm = shm
+        self._owner = owner
+        self.array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    @classmethod
+    def empty(cls, shape: tuple, dtype) -> _SharedArray:
+        size = max(1, int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize)
+        return cls(shared_memory.SharedMemory(create=True, size=size), tuple(shape), np.dtype(dtype), True)
+
+    @classmethod
+    def copy_of(cls, array: np.ndarray) -> _SharedArray:
+        shared = cls.empty(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, descriptor: tuple) -> _SharedArray:
+        name, shape, dtype = descriptor
+        return cls(shared_memory.SharedMemory(name=name), shape, dtype, False)
+
+    @property
+    def descriptor(self) -> tuple:
+        return self._shm.name, self.array.shape, self.array.dtype.str
+
+    def release(self) -> None:
+        self.array = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def _apply_rows(func_bytes: bytes, descriptors: tuple, r0: int, r1: int) -> None:
+    func = pickle.loads(func_bytes)
+    blocks = [_SharedArray.attach(d) for d in descriptors]
+    try:
+        _apply_rows_core(func, *(b.array for b in blocks), r0, r1)
+    finally:
+        for b in blocks:
+            b.release()
+
+
+def _apply_rows_core(func: Callable,
+                     data: np.ndarray,
+                     indptr: np.ndarray,
+                     indices: np.ndarray,
+                     output: np.ndarray,
+                     r0: int,
+                     r1: int) -> None:
+    for r in range(r0, r1):
+        start = indptr[r]
+        end = indptr[r + 1]
+        if end > start:
+            output[r, :] = func(data[indices[start:end], :])
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import numpy as np
+
+from axisutilities.axisremapper import AxisRemapper
+from axisutilities.kernels import REDUCTIONS, partial_reduce, empty_partial, combine_partials, finalize_partial
+
+
+class StreamingAxisRemapper:
+    """
+    `StreamingAxisRemapper` remaps the data incrementally, as consecutive slices of the source axis arrive, e.g. one
+    hourly slab at a time from a queue, instead of requiring the entire source data at once.
+
+    Only the destination elements that are still open, i.e. those that are partially covered by the slices pushed so
+    far, are kept in memory, as the partial state of the reduction, e.g. the running weighted sums and the effective
+    weights for the average. As soon as all the source elements overlapping a destination element are pushed, the
+    destination element is finalized and returned, and its state is dropped. Hence, the memory is proportional to the
+    number of open destination elements, and not to the amount of data that has been pushed.
+
+    Any of the built-in reductions, i.e. "mean" (the default), "min", "max", "sum", "count", "var", or "std", could be
+    used; the results are the same as those of the corresponding `AxisRemapper` method (up to the floating point
+    round-off of the summation order).
+
+    You could either pass an existing `AxisRemapper` as `remapper`, or the same arguments as `AxisRemapper`, e.g.
+    `from_axis` and `to_axis`.
+
+    Examples:
+        * Calculating daily averages from hourly slabs as they arrive:
+
+        >>> from axisutilities import StreamingAxisRemapper, FixedIntervalAxisBuilder
+        >>> hourly_axis = FixedIntervalAxisBuilder(start=0, interval=1, n_interval=3 * 24).build()
+        >>> daily_axis = FixedIntervalAxisBuilder(start=0, interval=24, n_interval=3).build()
+        >>> sr = StreamingAxisRemapper(from_axis=hourly_axis, to_axis=daily_axis)
+        >>> rows, values = sr.push(np.random.random((18, 10, 20)))
+        >>> rows
+        array([], dtype=int64)
+        >>> rows, values = sr.push(np.random.random((12, 10, 20)))
+        >>> rows, values.shape
+        (array([0]), (1, 10, 20))
+        >>> sr.next_index
+        30
+
+        * Emitting whatever is left at the end of the stream, e.g. the last day if only part of it has arrived:
+
+        >>> rows, values = sr.flush()
+
+    """
+    def __init__(self, **kwargs) -> None:
+        remapper = kwargs.pop("remapper", None)
+        if remapper is None:
+            remapper = AxisRemapper(**kwargs)
+        elif not isinstance(remapper, AxisRemapper):
+            raise TypeError("remapper must be of type AxisRemapper.")
+
+        reduction = kwargs.get("reduction", "mean")
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"reduction must be one of {REDUCTIONS}; got {reduction}.")
+
+        self._remapper = remapper
+        self._reduction = reduction
+        self._dimension = int(kwargs.get("dimension", 0))
+
+        weights = remapper._weight_matrix
+        indptr = weights.indptr
+        m = weights.shape[0]
+        non_empty = np.diff(indptr) > 0
+
+        # the index of the first/last source element that overlaps each destination element, and the number of source
+        # elements that must be pushed before the destination element is finalized. The destination elements that are
+        # not covered at all are finalized once the source passes their upper bound.
+        self._first_column = np.zeros(m, dtype=np.int64)
+        self._last_column = np.full(m, -1, dtype=np.int64)
+        close_index = np.searchsorted(remapper.from_axis.lower_bound[0, :], remapper.to_axis.upper_bound[0, :])
+        if np.any(non_empty):
+            self._first_column[non_empty] = np.minimum.reduceat(weights.indices, indptr[:-1][non_empty])
+            self._last_column[non_empty] = np.maximum.reduceat(weights.indices, indptr[:-1][non_empty])
+            close_index[non_empty] = self._last_column[non_empty] + 1
+
+        # the covered destination elements ordered by their first source element; so, those that a slice opens are
+        # found by a binary search, instead of a scan over all the destination elements.
+        self._open_order = np.flatnonzero(non_empty)[np.argsort(self._first_column[non_empty], kind="stable")]
+        self._open_index = self._first_column[self._open_order]
+
+        self._close_order = np.argsort(close_index, kind="stable")
+        self._close_index = close_index[self._close_order]
+
+        self._next_index = 0
+        self._n_closed = 0
+        self._trailing_shape = None
+        self._open_rows = np.empty(0, dtype=np.int64)
+        self._state = None
+
+    @property
+    def remapper(self) -> AxisRemapper:
+        return self._remapper
+
+    @property
+    def reduction(self) -> str:
+        return self._reduction
+
+    @property
+    def next_index(self) -> int:
+        """
+        The index of the source element that the next pushed slice must start at.
+        """
+        return self._next_index
+
+    @property
+    def n_open(self) -> int:
+        """
+        The number of destination elements that are partially covered and kept in memory.
+        """
+        return self._open_rows.size
+
+    def push(self, data, start_index: int = None) -> (np.ndarray, np.ndarray):
+        """
+        Consumes the next slice of the source data.
+
+        :param data: The data of the source elements `start_index` up to `start_index + data.shape[dimension]`.
+        :param start_index: The index of the first source element in `data`; it must be the same as `next_index`,
+                            i.e. the slices must be consecutive. It defaults to `next_index`.
+        :return: `(rows, values)`, where `rows` are the indices of the destination elements that are finalized by
+                 this slice, in the order they are finalized, and `values` are their values, with the destination axis
+                 being at `dimension`.
+        """
+        start_index = self._next_index if start_index is None else int(start_index)
+        if start_index != self._next_index:
+            raise ValueError(f"The slices must be consecutive; expected start_index to be {self._next_index}; "
+                             f"got {start_index}.")
+
+        x = np.asarray(data) if isinstance(data, np.ndarray) else np.asarray(data, dtype="float64")
+        # a negative dimension refers to the data as pushed; so, it is normalized before a 1-D slice is reshaped.
+        self._dimension = self._dimension % x.ndim
+        if x.ndim == 1:
+            x = x.reshape((-1, 1))
+        x = np.moveaxis(x, self._dimension, 0)
+
+        end_index = start_index + x.shape[0]
+        if end_index > self._remapper.from_nelem:
+            raise ValueError("The pushed data goes beyond the end of the source axis.")
+
+        if self._trailing_shape is None:
+            self._trailing_shape = x.shape[1:]
+        elif self._trailing_shape != x.shape[1:]:
+            raise ValueError(f"The shape of the pushed data, other than the source axis, must remain the same; "
+                             f"expected {self._trailing_shape}; got {x.shape[1:]}.")
+        x = x.reshape((x.shape[0], -1))
+
+        if self._state is None:
+            self._state = empty_partial(self._reduction, (0, x.shape[1]))
+
+        # the destination elements overlapping the slice are those already open, plus those that it opens.
+        opened = self._open_order[np.searchsorted(self._open_index, start_index, side="left"):
+                                  np.searchsorted(self._open_index, end_index, side="left")]
+        still_open = self._open_rows[self._last_column[self._open_rows] >= start_index]
+        touched = np.union1d(still_open, opened)
+        if touched.size > 0:
+            weights = self._remapper._weight_matrix[touched, :][:, start_index:end_index]
+            self._merge(touched, partial_reduce(self._reduction, weights, x))
+
+        self._next_index = end_index
+
+        n_closed = int(np.searchsorted(self._close_index, end_index, side="right"))
+        rows = self._close_order[self._n_closed:n_closed]
+        self._n_closed = n_closed
+        return rows, self._finalize(rows)
+
+    def flush(self) -> (np.ndarray, np.ndarray):
+        """
+        Finalizes and returns all the destination elements that are not returned yet, e.g. at the end of the stream,
+        even if not all of their source elements have been pushed. Once flushed, no more data could be pushed.
+
+        :return: `(rows, values)`; check `push`.
+        """
+        if self._state is None:
+            self._state = empty_partial(self._reduction, (0, 1))
+            self._trailing_shape = (1,)
+
+        rows = self._close_order[self._n_closed:]
+        self._n_closed = self._close_order.size
+        self._next_index = self._remapper.from_nelem
+        return rows, self._finalize(rows)
+
+    def _merge(self, rows: np.ndarray, state: tuple) -> None:
+        open_rows = np.union1d(self._open_rows, rows)
+        merged = empty_partial(self._reduction, (open_rows.size, state[0].shape[1]))
+
+        old = np.searchsorted(open_rows, self._open_rows)
+        new = np.searchsorted(open_rows, rows)
+        for merged_array, old_array in zip(merged, self._state):
+            merged_array[old] = old_array
+
+        combined = combine_partials(self._reduction, tuple(a[new] for a in merged), state)
+        for merged_array, combined_array in zip(merged, combined):
+            merged_array[new] = combined_array
+
+        self._open_rows = open_rows
+        self._state = merged
+
+    def _finalize(self, rows: np.ndarray) -> np.ndarray:
+        k = self._state[0].shape[1]
+        state = empty_partial(self._reduction, (rows.size, k))
+
+        if self._open_rows.size > 0:
+            position = np.searchsorted(self._open_rows, rows)
+            is_open = position < self._open_rows.size
+            is_open[is_open] = self._open_rows[position[is_open]] == rows[is_open]
+            for array, open_array in zip(state, self._state):
+                array[is_open] = open_array[position[is_open]]
+
+            keep = np.ones(self._open_rows.size, dtype=bool)
+            keep[position[is_open]] = False
+            self._open_rows = self._open_rows[keep]
+            self._state = tuple(a[keep] for a in self._state)
+
+        output = finalize_partial(self._reduction, state, np.empty((rows.size, k), dtype=np.float64))
+        return np.moveaxis(output.reshape((rows.size, *self._trailing_shape)), 0, self._dimension)
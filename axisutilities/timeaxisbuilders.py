@@ -366,11 +366,14 @@ class TimeAxisBuilderFromDataTicks(TimeAxisBuilder):
 
             n = data_ticks.size
 
-            lower_boundary: np.ndarray = np.ndarray((n, ), dtype=np.int64)
+            # both are the rows of one (2, n) array; so, `Axis` stores them without copying.
+            bounds: np.ndarray = np.ndarray((2, n), dtype=np.int64)
+
+            lower_boundary: np.ndarray = bounds[0, :]
             lower_boundary[0] = 2 * data_ticks[0] - avg[0]
             lower_boundary[1:] = avg
 
-            upper_boundary: np.ndarray = np.ndarray((n, ), dtype=np.int64)
+            upper_boundary: np.ndarray = bounds[1, :]
             upper_boundary[-1] = 2 * data_ticks[-1] - avg[-1]
             upper_boundary[:-1] = avg
 
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from threading import RLock
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from axisutilities import Axis, RegularAxis, PiecewiseRegularAxis
+
+
+# Bump this whenever the layout or the content of the stored weight matrices changes, so that the entries that were
+# persisted by an older version are not picked up.
+WEIGHT_MATRIX_FORMAT_VERSION = 2
+
+
+class WeightMatrixCache:
+    """
+    A bounded, thread-safe, least-recently-used (LRU) cache of the weight matrices that `AxisRemapper` builds.
+
+    Building the weight matrix is the bulk of the work when an `AxisRemapper` is created. If the same pair of axes
+    are remapped over and over, e.g. one `AxisRemapper` is created per processed file, the weight matrix could be
+    reused instead. The entries are keyed by a content hash of the bounds of both axes; hence, two different `Axis`
+    objects with the same bounds share the same entry.
+
+    The cache is bounded both by the number of entries, i.e. `max_entries`, and by the total number of bytes that the
+    stored matrices occupy, i.e. `max_bytes`. Once either of them is exceeded, the least recently used entries are
+    evicted. A matrix that is larger than `max_bytes` on its own is never stored.
+
+    `AxisRemapper` consults a process-wide instance of this class, accessible as `AxisRemapper.weight_cache`.
+
+    Examples:
+        * Checking the cache statistics:
+
+        >>> from axisutilities import AxisRemapper
+        >>> AxisRemapper.weight_cache.stats
+        {'hits': 0, 'misses': 0, 'evictions': 0, 'entries': 0, 'nbytes': 0}
+
+        * Clearing, disabling, or resizing the process-wide cache:
+
+        >>> AxisRemapper.weight_cache.clear()
+        >>> AxisRemapper.weight_cache.enabled = False
+        >>> AxisRemapper.weight_cache.max_entries = 16
+        >>> AxisRemapper.weight_cache.max_bytes = 64 * 1024 ** 2
+
+        * Bypassing the cache for one `AxisRemapper` only:
+
+        >>> ac = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis, use_cache=False)
+
+    """
+    def __init__(self, max_entries: int = 64, max_bytes: int = 256 * 1024 ** 2, enabled: bool = True) -> None:
+        self._lock = RLock()
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._max_entries = self._max_bytes = 0
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries
+
+    @max_entries.setter
+    def max_entries(self, v: int) -> None:
+        if int(v) < 0:
+            raise ValueError("max_entries must be a non-negative integer.")
+        with self._lock:
+            self._max_entries = int(v)
+            self._evict()
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, v: int) -> None:
+        if int(v) < 0:
+            raise ValueError("max_bytes must be a non-negative integer.")
+        with self._lock:
+            self._max_bytes = int(v)
+            self._evict()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, v: bool) -> None:
+        self._enabled = bool(v)
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "nbytes": self._nbytes
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def get(self, key) -> (csr_matrix, None):
+        """
+        Returns the cached weight matrix associated with `key`, or `None` if there is none (or the cache is disabled).
+        The returned matrix is shared and must not be modified.
+        """
+        if not self._enabled:
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            else:
+                self._misses += 1
+                return None
+
+    def put(self, key, weight_matrix: csr_matrix) -> None:
+        """
+        Stores `weight_matrix` under `key`, evicting the least recently used entries if needed.
+        """
+        if not self._enabled:
+            return
+
+        nbytes = WeightMatrixCache.nbytes_of(weight_matrix)
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= WeightMatrixCache.nbytes_of(self._entries.pop(key))
+
+            if (nbytes > self._max_bytes) or (self._max_entries == 0):
+                return
+
+            self._entries[key] = weight_matrix
+            self._nbytes += nbytes
+            self._evict()
+
+    def clear(self, reset_stats: bool = False) -> None:
+        """
+        Removes all the entries. If `reset_stats` is set to `True`, the hit/miss/eviction counters are reset as well.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            if reset_stats:
+                self._hits = 0
+                self._misses = 0
+                self._evictions = 0
+
+    def _evict(self) -> None:
+        while (len(self._entries) > self._max_entries) or (self._nbytes > self._max_bytes):
+            _, weight_matrix = self._entries.popitem(last=False)
+            self._nbytes -= WeightMatrixCache.nbytes_of(weight_matrix)
+            self._evictions += 1
+
+    @staticmethod
+    def nbytes_of(weight_matrix: csr_matrix) -> int:
+        return weight_matrix.data.nbytes + weight_matrix.indices.nbytes + weight_matrix.indptr.nbytes
+
+    @staticmethod
+    def axis_fingerprint(axis: Axis) -> str:
+        """
+        Returns a content hash of the bounds of the provided axis. A `RegularAxis` is hashed by its parameters
+        instead, and a `PiecewiseRegularAxis` by its runs; so, their bounds are never generated just to key the
+        cache.
+        """
+        if isinstance(axis, RegularAxis):
+            h = hashlib.blake2b(digest_size=16)
+            h.update(str(("regular", axis.start, axis.stride, axis.width, axis.nelem)).encode())
+            return h.hexdigest()
+
+        if isinstance(axis, PiecewiseRegularAxis):
+            h = hashlib.blake2b(digest_size=16)
+            h.update(str(("piecewise", axis.runs.shape)).encode())
+            h.update(np.ascontiguousarray(axis.runs[:4, :]).data)
+            return h.hexdigest()
+
+        bounds = np.ascontiguousarray(axis._bounds)
+        h = hashlib.blake2b(digest_size=16)
+        h.update(str((bounds.dtype.str, bounds.shape)).encode())
+        h.update(bounds.data)
+        return h.hexdigest()
+
+    @staticmethod
+    def make_key(from_axis: Axis, to_axis: Axis) -> tuple:
+        return WeightMatrixCache.axis_fingerprint(from_axis), WeightMatrixCache.axis_fingerprint(to_axis)
+
+
+class WeightMatrixStore:
+    """
+    A persistent, on-disk store of the weight matrices that `AxisRemapper` builds.
+
+    Each weight matrix is stored in its own sub-directory of `path` as three `.npy` files, i.e. the `indptr`,
+    `indices`, and `data` arrays of the CSR matrix, under a key derived from the bounds of both axes. When the same
+    pair of axes is seen again, the arrays are memory-mapped back in read-only mode instead of being recomputed. Hence,
+    multiple processes on the same host share one copy of the weight matrix through the page cache.
+
+    Entries are written to a temporary directory first and then renamed into place; so, concurrent writers and
+    readers never observe a partially written entry.
+
+    The store is opt-in. Either pass it, or just the path, to `AxisRemapper` as `weight_store`, or set it process-wide
+    through `AxisRemapper.weight_store`.
+
+    Examples:
+        * Using the store for one `AxisRemapper`:
+
+        >>> from axisutilities import AxisRemapper, WeightMatrixStore
+        >>> store = WeightMatrixStore("/scratch/axisutilities_weights")
+        >>> ac = AxisRemapper(from_axis=hourly_axis, to_axis=daily_axis, weight_store=store)
+
+        * Using the store for all `AxisRemapper` objects:
+
+        >>> AxisRemapper.weight_store = WeightMatrixStore("/scratch/axisutilities_weights")
+
+    """
+    _array_names = ("indptr", "indices", "data", "shape")
+
+    def __init__(self, path: str) -> None:
+        self._path = os.path.abspath(os.fspath(path))
+        os.makedirs(self._path, exist_ok=True)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @path.setter
+    def path(self, v) -> None:
+        pass
+
+    @staticmethod
+    def make_key(from_axis: Axis, to_axis: Axis) -> str:
+        return WeightMatrixStore.format_key(WeightMatrixCache.make_key(from_axis, to_axis))
+
+    @staticmethod
+    def format_key(fingerprints: tuple) -> str:
+        """
+        Converts the `(from, to)` fingerprints, i.e. the `WeightMatrixCache` key, into a store key.
+        """
+        from_fingerprint, to_fingerprint = fingerprints
+        return f"v{WEIGHT_MATRIX_FORMAT_VERSION}-{from_fingerprint}-{to_fingerprint}"
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self._path, key)
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.isfile(os.path.join(self._entry_path(key), "data.npy"))
+
+    def load(self, key: str) -> (csr_matrix, None):
+        """
+        Returns the weight matrix stored under `key` with its arrays memory-mapped in read-only mode, or `None` if
+        there is no such entry.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            arrays = {
+                name: np.load(os.path.join(entry_path, f"{name}.npy"), mmap_mode="r" if name != "shape" else None)
+                for name in self._array_names
+            }
+        except FileNotFoundError:
+            return None
+
+        return csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]),
+            shape=tuple(int(e) for e in arrays["shape"]),
+            copy=False
+        )
+
+    def save(self, key: str, weight_matrix: csr_matrix) -> None:
+        """
+        Stores `weight_matrix` under `key`. If the entry already exists, it is left untouched.
+        """
+        if key in self:
+            return
+
+        tmp_path = tempfile.mkdtemp(prefix=f".{key}.", dir=self._path)
+        try:
+            np.save(os.path.join(tmp_path, "indptr.npy"), weight_matrix.indptr)
+            np.save(os.path.join(tmp_path, "indices.npy"), weight_matrix.indices)
+            np.save(os.path.join(tmp_path, "data.npy"), weight_matrix.data)
+            np.save(os.path.join(tmp_path, "shape.npy"), np.asarray(weight_matrix.shape, dtype=np.int64))
+            os.rename(tmp_path, self._entry_path(key))
+        except OSError:
+            # Another process has stored the same entry in the meantime.
+            if key not in self:
+                raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def remove(self, key: str) -> None:
+        shutil.rmtree(self._entry_path(key), ignore_errors=True)
+
+    def clear(self) -> None:
+        """
+        Removes all the stored entries.
+        """
+        for name in os.listdir(self._path):
+            entry_path = os.path.join(self._path, name)
+            if os.path.isdir(entry_path):
+                shutil.rmtree(entry_path, ignore_errors=True)
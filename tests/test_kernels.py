@@ -0,0 +1,307 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from axisutilities import kernels
+
+
+class TestKernels(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._weights = csr_matrix(np.asarray([
+            [1.0, 1.0, 0.5, 0.0, 0.0],
+            [0.0, 0.0, 0.5, 1.0, 0.0],
+            [0.0, 0.0, 0.0, 0.0, 0.0],
+            [0.0, 0.0, 0.0, 0.0, 0.25],
+        ]))
+
+    def _expected_average(self, x: np.ndarray) -> np.ndarray:
+        dense = self._weights.toarray()
+        valid = ~np.isnan(x)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (dense @ np.where(valid, x, 0.0)) / (dense @ valid)
+
+    def test_has_nan_01(self):
+        x = np.random.random((5, 3))
+        self.assertFalse(kernels.has_nan(x))
+        self.assertFalse(kernels.has_nan(np.arange(15).reshape((5, 3))))
+        x[3, 1] = np.nan
+        self.assertTrue(kernels.has_nan(x))
+
+        with patch.object(kernels, "NUMBA_AVAILABLE", False):
+            self.assertTrue(kernels.has_nan(x))
+
+    def test_weighted_average_01(self):
+        x = np.random.random((5, 3))
+        x[2, 0] = np.nan
+        x[4, :] = np.nan
+        x_copy = x.copy()
+
+        for numba_available in (True, False):
+            with patch.object(kernels, "NUMBA_AVAILABLE", numba_available):
+                out = np.empty((4, 3))
+                kernels.weighted_average(self._weights, x, out)
+
+                np.testing.assert_almost_equal(self._expected_average(x), out)
+                np.testing.assert_array_equal(x_copy, x)
+
+    def test_weighted_average_02(self):
+        x = np.random.random((5, 3))
+
+        for numba_available in (True, False):
+            with patch.object(kernels, "NUMBA_AVAILABLE", numba_available):
+                out = np.empty((4, 3))
+                kernels.weighted_average(self._weights, x, out)
+
+                expected = self._expected_average(x)
+                np.testing.assert_almost_equal(expected, out)
+                self.assertTrue(np.all(np.isnan(out[2, :])))
+
+    def test_reduce_rows_01(self):
+        x = np.random.random((5, 3))
+        x[2, 0] = np.nan
+        x[3:, 2] = np.nan
+        x_copy = x.copy()
+
+        dense = self._weights.toarray()
+        valid = ~np.isnan(x)
+        coverage = dense > 0
+
+        expected = {
+            "min": np.asarray([np.nanmin(np.where(coverage[r][:, None], x, np.nan), axis=0) for r in (0, 1)]),
+            "max": np.asarray([np.nanmax(np.where(coverage[r][:, None], x, np.nan), axis=0) for r in (0, 1)]),
+            "sum": dense[:2] @ np.where(valid, x, 0.0),
+            "count": coverage[:2].astype(float) @ valid,
+            "mean": self._expected_average(x)[:2],
+        }
+        variance = np.empty((2, 3))
+        for r in (0, 1):
+            w = np.where(valid, dense[r][:, None], 0.0)
+            mean = (w * np.nan_to_num(x)).sum(axis=0) / w.sum(axis=0)
+            variance[r] = (w * np.nan_to_num(x - mean) ** 2).sum(axis=0) / w.sum(axis=0)
+        expected["var"] = variance
+        expected["std"] = np.sqrt(variance)
+
+        for numba_available in (True, False):
+            with patch.object(kernels, "NUMBA_AVAILABLE", numba_available):
+                for reduction in kernels.REDUCTIONS:
+                    out = np.empty((4, 3))
+                    kernels.reduce_rows(reduction, self._weights, x, out)
+
+                    np.testing.assert_almost_equal(expected[reduction], out[:2], err_msg=reduction)
+                    np.testing.assert_array_equal(x_copy, x)
+
+                    # the third row is not covered and the last row is covered only by NaN in the last column.
+                    if reduction == "count":
+                        np.testing.assert_array_equal([0.0, 0.0, 0.0], out[2])
+                        np.testing.assert_array_equal([1.0, 1.0, 0.0], out[3])
+                    else:
+                        self.assertTrue(np.all(np.isnan(out[2])))
+                        self.assertTrue(np.isnan(out[3, 2]))
+
+    def test_reduce_rows_02(self):
+        with self.assertRaises(ValueError):
+            kernels.reduce_rows("median", self._weights, np.random.random((5, 3)), np.empty((4, 3)))
+
+        out = np.empty((4, 2))
+        kernels.reduce_rows("sum", self._weights, np.arange(10).reshape((5, 2)), out)
+        np.testing.assert_almost_equal([[4.0, 6.5], [8.0, 9.5]], out[:2])
+
+    def test_partition_01(self):
+        self.assertIsNone(kernels.partition_parameters(self._weights))
+
+        # source elements 1..6 are grouped as [1, 2], [], [3, 4, 5, 6]; source elements 0 and 7 are not covered.
+        weights = csr_matrix((np.ones(6), np.arange(1, 7), np.asarray([0, 2, 2, 6])), shape=(3, 8))
+        partition = kernels.partition_parameters(weights)
+        self.assertEqual(1, partition.first)
+        self.assertEqual(0, partition.group_size)
+
+        x = np.random.random((8, 3))
+        for numba_available in (True, False):
+            with patch.object(kernels, "NUMBA_AVAILABLE", numba_available):
+                for has_nan in (True, False):
+                    x[3, 1] = np.nan if has_nan else 0.5
+                    for reduction in kernels.PARTITION_REDUCTIONS:
+                        expected = np.empty((3, 3))
+                        kernels.reduce_rows(reduction, weights, x, expected)
+
+                        # uneven groups are only reduced here for "sum" and "mean" without numba.
+                        out = np.empty((3, 3))
+                        applied = kernels.reduce_partition(reduction, partition, x, out)
+                        self.assertEqual(
+                            (not numba_available) and (not has_nan) and (reduction in ("sum", "mean")),
+                            applied
+                        )
+                        if applied:
+                            np.testing.assert_almost_equal(expected, out, err_msg=reduction)
+                            self.assertTrue(np.all(np.isnan(out[1])))
+
+    def test_partition_02(self):
+        weights = csr_matrix((np.ones(6), np.arange(6), np.asarray([0, 3, 6])), shape=(2, 6))
+        partition = kernels.partition_parameters(weights)
+        self.assertEqual(3, partition.group_size)
+
+        x = np.arange(12).reshape((6, 2))
+        for reduction in kernels.PARTITION_REDUCTIONS:
+            expected = np.empty((2, 2))
+            kernels.reduce_rows(reduction, weights, x, expected)
+
+            out = np.empty((2, 2))
+            self.assertTrue(kernels.reduce_partition(reduction, partition, x, out))
+            np.testing.assert_almost_equal(expected, out, err_msg=reduction)
+
+        self.assertIsNone(kernels.partition_parameters(weights.multiply(0.5).tocsr()))
+
+    def test_sliding_window_01(self):
+        self.assertIsNone(kernels.sliding_window_parameters(self._weights))
+
+        n = 40
+        x = np.random.random((n, 20))
+        x[5:17, 3] = np.nan
+        x[::3, 4] = np.nan
+        x[:, 5] = np.nan
+
+        for first, stride, size in ((0, 1, 7), (2, 3, 5), (1, 6, 4), (0, 2, 1)):
+            m = (n - first - size) // stride + 1
+            columns = first + stride * np.arange(m).reshape((-1, 1)) + np.arange(size).reshape((1, -1))
+            weights = csr_matrix(
+                (np.ones(m * size), columns.ravel(), np.arange(m + 1) * size),
+                shape=(m, n)
+            )
+            window = kernels.sliding_window_parameters(weights)
+            self.assertEqual(kernels.SlidingWindow(first, stride, size), window)
+
+            for numba_available in (True, False):
+                with patch.object(kernels, "NUMBA_AVAILABLE", numba_available):
+                    for reduction in kernels.SLIDING_WINDOW_REDUCTIONS:
+                        expected = np.empty((m, x.shape[1]))
+                        kernels.reduce_rows(reduction, weights, x, expected)
+
+                        out = np.empty((m, x.shape[1]))
+                        self.assertTrue(kernels.reduce_sliding_window(reduction, window, x, out))
+                        np.testing.assert_almost_equal(expected, out, err_msg=f"{reduction}: {window}")
+
+    def test_detect_structure_01(self):
+        self.assertIsNone(kernels.detect_structure(self._weights))
+
+        weights = csr_matrix((np.ones(6), np.arange(6), np.asarray([0, 3, 6])), shape=(2, 6))
+        self.assertIsInstance(kernels.detect_structure(weights), kernels.Partition)
+        self.assertFalse(kernels.reduce_structured("var", kernels.detect_structure(weights), None, None))
+
+        weights = csr_matrix((np.ones(6), np.asarray([0, 1, 2, 1, 2, 3]), np.asarray([0, 3, 6])), shape=(2, 6))
+        self.assertIsInstance(kernels.detect_structure(weights), kernels.SlidingWindow)
+
+    def test_partials_01(self):
+        x = np.random.random((5, 3))
+        x[2, 0] = np.nan
+        x[3:, 2] = np.nan
+
+        for numba_available in (True, False):
+            with patch.object(kernels, "NUMBA_AVAILABLE", numba_available):
+                for reduction in kernels.REDUCTIONS:
+                    expected = np.empty((4, 3))
+                    kernels.reduce_rows(reduction, self._weights, x, expected)
+
+                    # the columns are split into three chunks; one of them only covers the empty row.
+                    states = [
+                        kernels.partial_reduce(reduction, self._weights[:, lo:hi], x[lo:hi, :])
+                        for lo, hi in ((0, 2), (2, 4), (4, 5))
+                    ]
+                    state = kernels.combine_partials(
+                        reduction,
+                        states[0],
+                        kernels.combine_partials(reduction, states[1], states[2])
+                    )
+                    out = kernels.finalize_partial(reduction, state, np.empty((4, 3)))
+                    np.testing.assert_almost_equal(expected, out, err_msg=reduction)
+
+    def test_parallel_kernel_01(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        x = np.random.random((5, 3))
+        x[2, 0] = np.nan
+
+        expected = np.empty((4, 3))
+        kernels.reduce_rows("var", self._weights, x, expected)
+
+        def run():
+            out = np.empty((4, 3))
+            kernels.reduce_rows("var", self._weights, x, out)
+            return out
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for out in executor.map(lambda _: run(), range(4)):
+                np.testing.assert_array_equal(expected, out)
+
+    def test_column_block_indices_01(self):
+        for order in ("C", "F"):
+            x = np.asarray(np.random.random((5, 4, 3, 2)), order=order)
+            flat = x.reshape((5, -1))
+            for block_size in (1, 2, 5, 6, 7, 24, 100):
+                covered = np.zeros(24, dtype=bool)
+                for index, q0, q1 in kernels.column_block_indices(x.shape[1:], block_size):
+                    self.assertLessEqual(q1 - q0, max(block_size, 1))
+                    self.assertFalse(np.any(covered[q0:q1]))
+                    covered[q0:q1] = True
+                    np.testing.assert_array_equal(flat[:, q0:q1], x[index].reshape((5, -1)))
+                self.assertTrue(np.all(covered))
+
+        # a block of a C-contiguous input is viewed, not copied.
+        x = np.random.random((5, 4, 3))
+        for index, q0, q1 in kernels.column_block_indices(x.shape[1:], 6):
+            self.assertTrue(np.shares_memory(x, x[index].reshape((5, q1 - q0))))
+
+    def test_resolve_block_size_01(self):
+        self.assertEqual(10, kernels.resolve_block_size(10, 5))
+        self.assertGreaterEqual(kernels.resolve_block_size(None, 10 ** 9), kernels.MIN_BLOCK_COLUMNS)
+        self.assertEqual(kernels.resolve_block_size(None, 100), kernels.resolve_block_size("auto", 100))
+        self.assertRaises(ValueError, kernels.resolve_block_size, 0, 5)
+        self.assertRaises(ValueError, kernels.resolve_block_size, "large", 5)
+
+    def test_shared_executor_01(self):
+        self.assertIs(kernels.shared_executor(2), kernels.shared_executor(2))
+        self.assertIsNot(kernels.shared_executor(2), kernels.shared_executor(3))
+
+    def test_trailing_order_01(self):
+        x = np.empty((5, 4, 3, 2))
+        self.assertEqual((0, 1, 2, 3), kernels.trailing_order(x))
+        self.assertEqual((0, 3, 2, 1), kernels.trailing_order(np.asfortranarray(x)))
+
+        # the source axis moved first from the end of a C-ordered array.
+        y = np.moveaxis(np.empty((4, 3, 5)), 2, 0)
+        self.assertEqual((0, 1, 2), kernels.trailing_order(y))
+        z = np.asfortranarray(x)
+        z_t = z.transpose(kernels.trailing_order(z))
+        for index, q0, q1 in kernels.column_block_indices(z_t.shape[1:], 6):
+            self.assertTrue(np.shares_memory(z, z_t[index].reshape((5, q1 - q0))))
+
+    def test_locate_01(self):
+        rng = np.random.default_rng(0)
+        lower_bound = np.cumsum(rng.integers(1, 50, 1000))
+        upper_bound = lower_bound + rng.integers(1, 50, 1000)
+        values = np.concatenate([rng.integers(-100, lower_bound[-1] + 100, 10000), lower_bound, upper_bound])
+
+        i = np.searchsorted(lower_bound, values, side="right") - 1
+        expected = np.where((i >= 0) & (values < upper_bound[np.maximum(i, 0)]), i, -1)
+        for numba_available in (True, False):
+            with patch.object(kernels, "NUMBA_AVAILABLE", numba_available):
+                out = np.empty_like(values)
+                np.testing.assert_array_equal(expected, kernels.locate_bounds(lower_bound, upper_bound, values, out))
+
+    def test_locate_02(self):
+        # two hourly runs with a gap, a 3-hourly run, and a single element.
+        runs = np.asarray([[0, 48, 72, 100], [1, 1, 3, 7], [24, 24, 8, 1], [1, 1, 3, 7], [0, 0, 0, 0]])
+        run_index = np.concatenate([[0], np.cumsum(runs[2, :])])
+        lower_bound = np.concatenate([runs[0, r] + np.arange(runs[2, r]) * runs[1, r] for r in range(4)])
+        upper_bound = lower_bound + np.repeat(runs[3, :], runs[2, :])
+        values = np.arange(-5, 115)
+
+        expected = kernels.locate_bounds(lower_bound, upper_bound, values, np.empty_like(values))
+        self.assertEqual(-1, expected[values == 30])
+        for numba_available in (True, False):
+            with patch.object(kernels, "NUMBA_AVAILABLE", numba_available):
+                out = np.empty_like(values)
+                np.testing.assert_array_equal(expected, kernels.locate_runs(runs, run_index, values, out))
+
@@ -0,0 +1,120 @@
+from datetime import date
+from unittest import TestCase
+
+import numpy as np
+
+from axisutilities import AxisRemapper, StreamingAxisRemapper, FixedIntervalAxisBuilder, DailyTimeAxisBuilder, \
+    RollingWindowTimeAxisBuilder
+
+
+class TestStreamingAxisRemapper(TestCase):
+    @staticmethod
+    def _collect(sr: StreamingAxisRemapper, from_data: np.ndarray, slab_sizes: list, dimension=0):
+        rows, values = [], []
+        start = 0
+        for size in slab_sizes:
+            index = [slice(None)] * from_data.ndim
+            index[dimension] = slice(start, start + size)
+            r, v = sr.push(from_data[tuple(index)], start)
+            rows.append(r)
+            values.append(v)
+            start += size
+
+        r, v = sr.flush()
+        rows.append(r)
+        values.append(v)
+
+        rows = np.concatenate(rows)
+        values = np.concatenate(values, axis=dimension)
+        order = np.argsort(rows)
+        return rows[order], np.take(values, order, axis=dimension)
+
+    def test_push_01(self):
+        hourly_axis = FixedIntervalAxisBuilder(start=0, interval=1, n_interval=24 * 5).build()
+        daily_axis = FixedIntervalAxisBuilder(start=0, interval=24, n_interval=5).build()
+        tc = AxisRemapper(from_axis=hourly_axis, to_axis=daily_axis)
+
+        from_data = np.random.random((hourly_axis.nelem, 3, 2))
+        from_data[30:60, 1, 0] = np.nan
+
+        for reduction in ("mean", "min", "max", "sum", "count", "var", "std"):
+            sr = StreamingAxisRemapper(remapper=tc, reduction=reduction)
+            rows, values = self._collect(sr, from_data, [5, 19, 1, 50, 45])
+
+            expected = getattr(tc, "average" if reduction == "mean" else reduction)(from_data)
+            np.testing.assert_array_equal(np.arange(5), rows)
+            np.testing.assert_almost_equal(expected, values, err_msg=reduction)
+            self.assertEqual(0, sr.n_open)
+
+    def test_push_02(self):
+        hourly_axis = FixedIntervalAxisBuilder(start=0, interval=1, n_interval=24 * 3).build()
+        daily_axis = FixedIntervalAxisBuilder(start=0, interval=24, n_interval=3).build()
+        sr = StreamingAxisRemapper(from_axis=hourly_axis, to_axis=daily_axis)
+
+        # the day is emitted as soon as its last hour is pushed, and only the open days are kept.
+        rows, values = sr.push(np.arange(23.0))
+        self.assertEqual(0, rows.size)
+        self.assertEqual(1, sr.n_open)
+
+        rows, values = sr.push(np.arange(23.0, 25.0), 23)
+        np.testing.assert_array_equal([0], rows)
+        np.testing.assert_almost_equal([[11.5]], values)
+        self.assertEqual(1, sr.n_open)
+        self.assertEqual(25, sr.next_index)
+
+        with self.assertRaises(ValueError):
+            sr.push(np.arange(5.0), 30)
+
+        with self.assertRaises(ValueError):
+            sr.push(np.ones((5, 2)))
+
+        # flushing emits the partially covered day and the day that was not covered at all.
+        rows, values = sr.flush()
+        np.testing.assert_array_equal([1, 2], rows)
+        np.testing.assert_almost_equal([[24.0], [np.nan]], values)
+
+    def test_push_03(self):
+        daily_axis = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=40).build()
+        rolling_axis = RollingWindowTimeAxisBuilder(
+            start_date=date(2019, 1, 1),
+            end_date=date(2019, 2, 10),
+            window_size=7
+        ).build()
+        tc = AxisRemapper(from_axis=daily_axis, to_axis=rolling_axis)
+
+        from_data = np.random.random((2, daily_axis.nelem))
+        sr = StreamingAxisRemapper(remapper=tc, dimension=1)
+        rows, values = self._collect(sr, from_data, [3] * 13 + [1], dimension=1)
+
+        np.testing.assert_array_equal(np.arange(tc.to_nelem), rows)
+        np.testing.assert_almost_equal(tc.average(from_data, dimension=1), values)
+
+    def test_push_04(self):
+        hourly_axis = FixedIntervalAxisBuilder(start=0, interval=1, n_interval=24 * 3).build()
+        daily_axis = FixedIntervalAxisBuilder(start=0, interval=24, n_interval=3).build()
+        tc = AxisRemapper(from_axis=hourly_axis, to_axis=daily_axis)
+
+        # a negative dimension refers to the pushed data, also when it is 1-D.
+        from_data = np.random.random(hourly_axis.nelem)
+        sr = StreamingAxisRemapper(remapper=tc, dimension=-1)
+        rows, values = self._collect(sr, from_data, [30, 42])
+        np.testing.assert_array_equal(np.arange(3), rows)
+        np.testing.assert_almost_equal(tc.average(from_data), values)
+
+        from_data = np.random.random((2, hourly_axis.nelem))
+        sr = StreamingAxisRemapper(remapper=tc, dimension=-1)
+        rows, values = self._collect(sr, from_data, [30, 42], dimension=1)
+        np.testing.assert_almost_equal(tc.average(from_data, dimension=1), values)
+
+    def test_init_01(self):
+        with self.assertRaises(TypeError):
+            StreamingAxisRemapper(remapper=42)
+
+        axis = FixedIntervalAxisBuilder(start=0, interval=1, n_interval=4).build()
+        with self.assertRaises(ValueError):
+            StreamingAxisRemapper(from_axis=axis, to_axis=axis, reduction="median")
+
+        # the properties are read-only.
+        sr = StreamingAxisRemapper(from_axis=axis, to_axis=axis)
+        with self.assertRaises(AttributeError):
+            sr.next_index = 2
@@ -1,7 +1,9 @@
-from datetime import date
+from datetime import date, datetime
 from unittest import TestCase
 
-from axisutilities import Axis, DailyTimeAxisBuilder
+import numpy as np
+
+from axisutilities import Axis, RegularAxis, PiecewiseRegularAxis, DailyTimeAxisBuilder, FixedIntervalAxisBuilder, RollingWindowAxisBuilder
 
 
 class TestTimeAxis(TestCase):
@@ -163,20 +165,217 @@ class TestTimeAxis(TestCase):
         self.assertEqual("2019-01-06 12:00:00", ta[5].asDict()["data_tick"])
         self.assertEqual("2019-01-07 12:00:00", ta[6].asDict()["data_tick"])
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    def test_fromBounds_01(self):
+        bounds = np.asarray([self._sample_date[0]["lower_bound"], self._sample_date[0]["upper_bound"]], dtype=np.int64)
+        data_ticks = np.asarray(self._sample_date[0]["data_ticks"], dtype=np.int64)
+
+        ta = Axis.fromBounds(bounds, data_ticks=data_ticks)
+        self.assertFalse(np.shares_memory(bounds, ta._bounds))
+        self.assertEqual(Axis(bounds[0, :], bounds[1, :], data_ticks=data_ticks).asDict(), ta.asDict())
+
+        # only the trusted bounds are stored without copying.
+        self.assertIs(bounds, Axis.fromBounds(bounds, data_ticks=data_ticks, trusted=True)._bounds.base)
+        self.assertFalse(np.shares_memory(bounds, Axis(bounds[0, :], bounds[1, :], binding="middle")._bounds))
+
+        self.assertRaises(ValueError, Axis.fromBounds, bounds[:, ::-1], binding="middle")
+        self.assertEqual(6, Axis.fromBounds(bounds[:, ::-1], binding="middle", trusted=True).nelem)
+        self.assertRaises(ValueError, Axis.fromBounds, bounds[0, :], binding="middle")
+
+    def test_fromBounds_02(self):
+        ta = FixedIntervalAxisBuilder(start=0, interval=24, n_interval=7).build()
+        self.assertTrue(ta._bounds.flags.c_contiguous)
+        self.assertEqual([i * 24 for i in range(7)], ta.asDict()["lower_bound"])
+        self.assertEqual([12 + i * 24 for i in range(7)], ta.asDict()["data_ticks"])
+        self.assertEqual("middle", ta.asDict()["binding"])
+
+    def test_read_only_01(self):
+        ta = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=7).build()
+        for array in (ta.lower_bound, ta.upper_bound, ta.data_ticks, ta.fraction):
+            self.assertFalse(array.flags.writeable)
+        self.assertTrue(np.shares_memory(ta.lower_bound, ta.lower_bound))
+        self.assertEqual((1, 7), ta.lower_bound.shape)
+
+        with self.assertRaises(ValueError):
+            ta.lower_bound[0, 0] = 0
+
+        self.assertEqual(int(ta.lower_bound[0, 0]), ta.start)
+        self.assertEqual(int(ta.upper_bound[0, -1]), ta.end)
+
+        # the arrays passed in are left writable.
+        bounds = np.asarray([[0, 24], [24, 48]], dtype=np.int64)
+        Axis.fromBounds(bounds, binding="middle")
+        self.assertTrue(bounds.flags.writeable)
+
+    def test_read_only_02(self):
+        # modifying the arrays passed in, after the axis is created, does not change it.
+        bounds = np.asarray([[0, 24, 48], [24, 48, 72]], dtype=np.int64)
+        data_ticks = np.asarray([12, 36, 60], dtype=np.int64)
+        fraction = np.asarray([0.25, 0.5, 0.75])
+        axes = (
+            Axis(bounds[0, :], bounds[1, :], data_ticks=data_ticks),
+            Axis(bounds[0, :], bounds[1, :], fraction=fraction),
+            Axis.fromBounds(bounds, data_ticks=data_ticks)
+        )
+        expected = [ta.asDict() for ta in axes]
+        lower_bound = axes[0].lower_bound
+
+        bounds += 1
+        data_ticks += 1
+        fraction[:] = 0.0
+        self.assertEqual(expected, [ta.asDict() for ta in axes])
+        np.testing.assert_array_equal([[0, 24, 48]], lower_bound)
+
+    def test_regular_axis_01(self):
+        ta = RegularAxis(start=0, stride=24, nelem=7, binding="middle")
+        expected = Axis(lower_bound=np.arange(7) * 24, upper_bound=np.arange(1, 8) * 24, binding="middle")
+        self.assertIsInstance(ta, Axis)
+        self.assertEqual(expected.asDict(), ta.asDict())
+        self.assertEqual(0, ta.start)
+        self.assertEqual(168, ta.end)
+        self.assertEqual(36, ta[1].data_tick)
+        self.assertEqual(144, ta[-1].lower_bound)
+        self.assertRaises(IndexError, ta.__getitem__, 7)
+
+        sliced = ta[1::2]
+        self.assertIsInstance(sliced, RegularAxis)
+        self.assertEqual((3, 48, 24, 24), (sliced.nelem, sliced.stride, sliced.width, sliced.start))
+        self.assertEqual([36, 84, 132], sliced.asDict()["data_ticks"])
+        self.assertRaises(IndexError, ta.__getitem__, slice(None, None, -1))
+
+        self.assertEqual([0, 24, 48], RegularAxis(start=0, stride=24, nelem=3, binding="beginning").asDict()["data_ticks"])
+        self.assertRaises(ValueError, RegularAxis, start=0, stride=0, nelem=3, binding="middle")
+        self.assertRaises(ValueError, RegularAxis, start=0, stride=24, nelem=3)
+        self.assertRaises(ValueError, RegularAxis, start=0.5, stride=24, nelem=3, binding="middle")
+
+    def test_regular_axis_02(self):
+        # about 52 million one minute intervals; nothing is generated unless the arrays are requested.
+        minute = 60 * 1_000_000
+        ta = RegularAxis(start=0, stride=minute, nelem=100 * 525_600, binding="middle")
+        self.assertEqual(100 * 525_600 * minute, ta.end)
+        self.assertEqual({}, ta._arrays)
+        self.assertEqual((52_560, 1000 * minute), (ta[::1000].nelem, ta[::1000].stride))
+        self.assertEqual({}, ta._arrays)
+
+    def test_regular_axis_03(self):
+        ta = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=7).build()
+        self.assertIsInstance(ta, RegularAxis)
+
+        # the data ticks of odd intervals are not evenly spaced; so, those are materialized.
+        ta = FixedIntervalAxisBuilder(start=0, interval=5, n_interval=4).build()
+        self.assertNotIsInstance(ta, RegularAxis)
+        self.assertEqual([2, 7, 12, 17], ta.asDict()["data_ticks"])
+
+        ta = RollingWindowAxisBuilder(start=0, end=10, base=2, window_size=3).build()
+        self.assertIsInstance(ta, RegularAxis)
+        self.assertEqual([0, 2, 4], ta.asDict()["lower_bound"])
+        self.assertEqual([6, 8, 10], ta.asDict()["upper_bound"])
+        self.assertEqual([3, 5, 7], ta.asDict()["data_ticks"])
+
+    def test_regular_axis_04(self):
+        bounds = np.asarray([np.arange(7) * 24, np.arange(1, 8) * 24], dtype=np.int64)
+        expected = Axis.fromBounds(bounds, binding="middle")
+        ta = RegularAxis.fromBounds(bounds, binding="middle")
+        self.assertIsInstance(ta, RegularAxis)
+        self.assertEqual((0, 24, 24), (ta.start, ta.stride, ta.width))
+        self.assertEqual(expected.asDict(), ta.asDict())
+
+        # evenly spaced data ticks that do not match a binding are kept as an offset.
+        ta = RegularAxis.fromBounds(bounds, data_ticks=bounds[0, :] + 5)
+        self.assertIsInstance(ta, RegularAxis)
+        self.assertEqual(5, ta.data_tick_offset)
+
+        # otherwise, the bounds are kept as they are.
+        ta = RegularAxis.fromBounds(bounds, data_ticks=bounds[0, :] + np.arange(7))
+        self.assertNotIsInstance(ta, RegularAxis)
+        bounds[1, -1] += 1
+        ta = RegularAxis.fromBounds(bounds, binding="middle")
+        self.assertNotIsInstance(ta, RegularAxis)
+        self.assertEqual(Axis.fromBounds(bounds, binding="middle").asDict(), ta.asDict())
+
+    def test_piecewise_regular_axis_01(self):
+        # hourly with a missing day, then 3-hourly, and an irregular element at the end.
+        lower_bound = np.concatenate([np.arange(24), np.arange(48, 72), np.arange(72, 96, 3), [100]])
+        upper_bound = np.concatenate([np.arange(1, 25), np.arange(49, 73), np.arange(75, 99, 3), [107]])
+        expected = Axis(lower_bound=lower_bound, upper_bound=upper_bound, binding="beginning")
+
+        ta = PiecewiseRegularAxis.fromAxis(expected)
+        self.assertIsInstance(ta, Axis)
+        self.assertEqual(4, ta.nruns)
+        self.assertEqual([[0, 48, 72, 100], [1, 1, 3, 7], [24, 24, 8, 1], [1, 1, 3, 7], [0, 0, 0, 0]],
+                         ta.runs.tolist())
+        self.assertEqual(expected.nelem, ta.nelem)
+        self.assertEqual((0, 107), (ta.start, ta.end))
+        for i in (0, 23, 24, 47, 48, 55, 56, -1, -57):
+            self.assertEqual(expected[i].asDict(), ta[i].asDict())
+        self.assertRaises(IndexError, ta.__getitem__, ta.nelem)
+
+        self.assertEqual({}, ta._arrays)
+        self.assertEqual(expected.asDict(), ta.asDict())
+
+        for item in (slice(None), slice(5, 50), slice(3, None, 7), slice(20, 30, 2), slice(None, None, 100)):
+            sliced = ta[item]
+            self.assertIsInstance(sliced, PiecewiseRegularAxis)
+            np.testing.assert_array_equal(expected.lower_bound[:, item], sliced.lower_bound)
+            np.testing.assert_array_equal(expected.upper_bound[:, item], sliced.upper_bound)
+            np.testing.assert_array_equal(expected.data_ticks[:, item], sliced.data_ticks)
+
+    def test_piecewise_regular_axis_02(self):
+        ta = PiecewiseRegularAxis(start=[0, 48], stride=2, length=[12, 6], binding="middle")
+        self.assertEqual(18, ta.nelem)
+        self.assertEqual([1, 3], ta.asDict()["data_ticks"][:2])
+        self.assertEqual([0.5], ta.asDict()["fraction"])
+        self.assertEqual(ta.asDict(), PiecewiseRegularAxis.fromRuns(ta.runs).asDict())
+
+        # the fraction could be different per run.
+        ta = PiecewiseRegularAxis(start=[0, 48], stride=[2, 4], length=[2, 2], fraction=[0.5, 0.25])
+        self.assertEqual([1, 3, 49, 53], ta.asDict()["data_ticks"])
+        self.assertEqual([0.5, 0.5, 0.25, 0.25], ta.asDict()["fraction"])
+        self.assertEqual("end", ta.adjust_binding_to(binding="end").asDict()["binding"])
+
+        regular = RegularAxis(start=0, stride=24, nelem=7, binding="middle")
+        self.assertEqual(regular.asDict(), PiecewiseRegularAxis.fromAxis(regular).asDict())
+        self.assertEqual(1, PiecewiseRegularAxis.fromAxis(regular).nruns)
+
+        self.assertRaises(ValueError, PiecewiseRegularAxis, start=[0, 10], stride=2, length=[6, 1], binding="middle")
+        self.assertRaises(ValueError, PiecewiseRegularAxis, start=[0, 10], stride=[2, 0], length=1, binding="middle")
+        self.assertRaises(ValueError, PiecewiseRegularAxis, start=[0, 10], stride=2, length=1, fraction=[0.5] * 3)
+
+    def test_locate_01(self):
+        ta = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=7).build()
+        values = np.asarray(["2018-12-31T23:00", "2019-01-01T06:00", "2019-01-03", "2019-01-08", "NaT"],
+                            dtype="datetime64")
+        expected = [-1, 0, 2, -1, -1]
+        np.testing.assert_array_equal(expected, ta.locate(values))
+        dense = Axis.fromBounds(np.asarray(ta._bounds), binding="middle")
+        np.testing.assert_array_equal(expected, dense.locate(values))
+        np.testing.assert_array_equal(expected, PiecewiseRegularAxis.fromAxis(dense).locate(values))
+
+        # time stamps in microseconds, floats, and datetime objects.
+        self.assertEqual(1, ta.locate(ta[1].lower_bound))
+        np.testing.assert_array_equal([[0, 6]], ta.locate([[ta.start + 0.5, ta.end - 0.5]]))
+        self.assertEqual(-1, ta.locate(np.nan))
+        self.assertEqual(1, ta.locate([datetime(2019, 1, 2, 5)])[0])
+
+        out = np.full((2, 5), 7, dtype=np.int64)
+        self.assertIs(out, ta.locate(np.stack([values, values]), out=out))
+        np.testing.assert_array_equal([expected, expected], out)
+        # non-contiguous outputs are written into as well.
+        out = np.zeros((5, 2), dtype=np.int64)
+        ta.locate(values, out=out[:, 1])
+        np.testing.assert_array_equal(expected, out[:, 1])
+        self.assertRaises(ValueError, ta.locate, values, out=np.empty(5))
+        self.assertRaises(TypeError, ta.locate, ["a"])
+
+    def test_locate_02(self):
+        # overlapping windows: the last window starting at or before the value is picked.
+        ta = RollingWindowAxisBuilder(start=0, end=10, base=2, window_size=3).build()
+        dense = Axis.fromBounds(np.asarray(ta._bounds), binding="middle")
+        values = np.arange(-1, 12)
+        expected = [-1, 0, 0, 1, 1, 2, 2, 2, 2, 2, 2, -1, -1]
+        np.testing.assert_array_equal(expected, ta.locate(values))
+        np.testing.assert_array_equal(expected, dense.locate(values))
+
+        # an axis with a gap.
+        ta = Axis(lower_bound=[0, 10, 30], upper_bound=[10, 20, 40], binding="beginning")
+        np.testing.assert_array_equal([0, 1, -1, 2, -1], ta.locate([5, 10, 25, 39, 40]))
 
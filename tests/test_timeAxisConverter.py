@@ -1,11 +1,14 @@
+import warnings
 from datetime import date
 from unittest import TestCase, skip
+from unittest.mock import patch
 
 import numpy as np
 import dask.array as da
 
-from axisutilities import Axis, AxisRemapper, DailyTimeAxisBuilder, WeeklyTimeAxisBuilder, \
-    RollingWindowTimeAxisBuilder, MonthlyTimeAxisBuilder
+from axisutilities import Axis, RegularAxis, AxisRemapper, DailyTimeAxisBuilder, WeeklyTimeAxisBuilder, \
+    RollingWindowTimeAxisBuilder, MonthlyTimeAxisBuilder, FixedIntervalAxisBuilder
+from axisutilities.kernels import Partition, SlidingWindow
 
 
 class TestTimeAxisConverter(TestCase):
@@ -77,6 +80,149 @@ class TestTimeAxisConverter(TestCase):
         self.assertListEqual(list(range(7)), col_idx)
         self.assertListEqual([1.0] * 7, weights)
 
+    def test_get_coverage_04(self):
+        from_axis = Axis(
+            lower_bound=np.arange(0, 7) * 24,
+            upper_bound=np.arange(1, 8) * 24,
+            fraction=0.5
+        )
+
+        to_axis = Axis(
+            lower_bound=[12, 60],
+            upper_bound=[36, 168],
+            fraction=0.5
+        )
+
+        row_idx, col_idx, weights = AxisRemapper._get_coverage(
+            from_axis.lower_bound, from_axis.upper_bound,
+            to_axis.lower_bound, to_axis.upper_bound
+        )
+
+        self.assertListEqual([0, 0, 1, 1, 1, 1, 1], row_idx)
+        self.assertListEqual([0, 1, 2, 3, 4, 5, 6], col_idx)
+        self.assertListEqual([0.5, 0.5, 0.5, 1.0, 1.0, 1.0, 1.0], weights)
+
+    def test_get_coverage_05(self):
+        from_axis = Axis(
+            lower_bound=np.arange(0, 10 * 365 * 24),
+            upper_bound=np.arange(1, 10 * 365 * 24 + 1),
+            fraction=0.5
+        )
+
+        to_axis = Axis(
+            lower_bound=np.arange(0, 10 * 365) * 24,
+            upper_bound=np.arange(1, 10 * 365 + 1) * 24,
+            fraction=0.5
+        )
+
+        row_idx, col_idx, weights = AxisRemapper._get_coverage_coo(
+            from_axis.lower_bound, from_axis.upper_bound,
+            to_axis.lower_bound, to_axis.upper_bound
+        )
+
+        np.testing.assert_array_equal(np.arange(from_axis.nelem) // 24, row_idx)
+        np.testing.assert_array_equal(np.arange(from_axis.nelem), col_idx)
+        np.testing.assert_array_equal(np.ones(from_axis.nelem), weights)
+
+    def test_get_coverage_06(self):
+        rng = np.random.default_rng(42)
+        from_lower_bound = np.cumsum(rng.integers(1, 10, 500)).reshape((1, -1))
+        from_upper_bound = from_lower_bound + rng.integers(1, 30, 500)
+        to_lower_bound = np.sort(rng.integers(-5, from_lower_bound[0, -1] + 20, 100)).reshape((1, -1))
+        to_upper_bound = to_lower_bound + rng.integers(1, 60, 100)
+
+        numpy_triplets = AxisRemapper._get_coverage_coo(
+            from_lower_bound, from_upper_bound,
+            to_lower_bound, to_upper_bound,
+            engine="numpy"
+        )
+        numba_triplets = AxisRemapper._get_coverage_coo(
+            from_lower_bound, from_upper_bound,
+            to_lower_bound, to_upper_bound,
+            engine="numba"
+        )
+
+        for expected, actual in zip(numpy_triplets, numba_triplets):
+            self.assertEqual(expected.dtype, actual.dtype)
+            np.testing.assert_array_equal(expected, actual)
+
+    def test_get_coverage_07(self):
+        from_axis = DailyTimeAxisBuilder(
+            start_date=date(2019, 1, 1),
+            n_interval=14
+        ).build()
+
+        to_axis = WeeklyTimeAxisBuilder(
+            start_date=date(2019, 1, 1),
+            n_interval=2
+        ).build()
+
+        with self.assertRaises(ValueError):
+            AxisRemapper(from_axis=from_axis, to_axis=to_axis, coverage_engine="cython")
+
+        numpy_tc = AxisRemapper(from_axis=from_axis, to_axis=to_axis, coverage_engine="numpy")
+        numba_tc = AxisRemapper(from_axis=from_axis, to_axis=to_axis, coverage_engine="numba")
+        self.assertEqual(0, (numpy_tc.weights != numba_tc.weights).nnz)
+
+    def test_get_coverage_08(self):
+        from_lower_bound = (np.arange(200) * 5 - 17).reshape((1, -1))
+        from_upper_bound = from_lower_bound + 12
+        to_lower_bound = np.arange(-40, 1000, 37).reshape((1, -1))
+        to_upper_bound = to_lower_bound + 55
+
+        numpy_triplets = AxisRemapper._get_coverage_coo(
+            from_lower_bound, from_upper_bound,
+            to_lower_bound, to_upper_bound,
+            engine="numpy"
+        )
+        analytic_triplets = AxisRemapper._get_coverage_coo(
+            from_lower_bound, from_upper_bound,
+            to_lower_bound, to_upper_bound,
+            engine="analytic"
+        )
+
+        for expected, actual in zip(numpy_triplets, analytic_triplets):
+            self.assertEqual(expected.dtype, actual.dtype)
+            np.testing.assert_array_equal(expected, actual)
+
+    def test_get_coverage_09(self):
+        from_axis = Axis(
+            lower_bound=[0, 24, 72],
+            upper_bound=[24, 72, 96],
+            fraction=0.5
+        )
+
+        to_axis = Axis(
+            lower_bound=[0],
+            upper_bound=[96],
+            fraction=0.5
+        )
+
+        with self.assertRaises(ValueError):
+            AxisRemapper._get_coverage_coo(
+                from_axis.lower_bound, from_axis.upper_bound,
+                to_axis.lower_bound, to_axis.upper_bound,
+                engine="analytic"
+            )
+
+        _, _, weights = AxisRemapper._get_coverage(
+            from_axis.lower_bound, from_axis.upper_bound,
+            to_axis.lower_bound, to_axis.upper_bound
+        )
+        self.assertListEqual([1.0, 1.0, 1.0], weights)
+
+    def test_get_coverage_10(self):
+        from_axis = RegularAxis(start=-17, stride=5, nelem=200, width=12, binding="middle")
+        to_axis = Axis(lower_bound=np.arange(-40, 1000, 37), upper_bound=np.arange(-40, 1000, 37) + 55, binding="middle")
+
+        # the weight matrix of a regular from-axis is built, and cached, without generating its bounds.
+        regular_tc = AxisRemapper(from_axis=from_axis, to_axis=to_axis, assure_no_bound_mismatch=False)
+        self.assertEqual({}, from_axis._arrays)
+
+        numpy_tc = AxisRemapper(from_axis=from_axis, to_axis=to_axis, coverage_engine="numpy", use_cache=False,
+                                assure_no_bound_mismatch=False)
+        self.assertEqual(0, (numpy_tc.weights != regular_tc.weights).nnz)
+
     def test_creation_01(self):
         from_axis = DailyTimeAxisBuilder()\
             .set_start_date(date(2019, 1, 1)) \
@@ -370,6 +516,53 @@ class TestTimeAxisConverter(TestCase):
         self.assertAlmostEqual(4.167, to_data[0, 0], 3)
         self.assertAlmostEqual(11.0, to_data[1, 0], 3)
 
+    def test_average_13(self):
+        from_axis = DailyTimeAxisBuilder(
+            start_date=date(2019, 1, 1),
+            n_interval=14
+        ).build()
+
+        to_axis = WeeklyTimeAxisBuilder(
+            start_date=date(2018, 12, 25),
+            n_interval=4
+        ).build()
+
+        tc = AxisRemapper(from_axis=from_axis, to_axis=to_axis, assure_no_bound_mismatch=False)
+
+        self.assertTrue(np.all(np.isfinite(tc.weights.data)))
+        self.assertEqual(14, tc.weights.nnz)
+        np.testing.assert_array_equal([0, 7, 7, 0], np.diff(tc.weights.indptr))
+
+        to_data = tc.average(list(range(1, 15)))
+        np.testing.assert_almost_equal([np.nan, 4.0, 11.0, np.nan], to_data[:, 0])
+
+        to_data = tc.apply_function(list(range(1, 15)), lambda e: np.nansum(e, axis=0))
+        np.testing.assert_almost_equal([np.nan, 28.0, 77.0, np.nan], to_data[:, 0])
+
+    def test_average_14(self):
+        from_axis = DailyTimeAxisBuilder(
+            start_date=date(2019, 1, 1),
+            n_interval=14
+        ).build()
+
+        to_axis = WeeklyTimeAxisBuilder(
+            start_date=date(2019, 1, 1),
+            n_interval=2
+        ).build()
+
+        tc = AxisRemapper(from_axis=from_axis, to_axis=to_axis)
+
+        from_data = np.stack([np.arange(1, 15, dtype="float64")] * 2, axis=1)
+        from_data[2, 0] = np.nan
+        from_data[:, 1] = np.nan
+        from_data_copy = from_data.copy()
+
+        to_data = tc.average(from_data)
+
+        # the input is not modified
+        np.testing.assert_array_equal(from_data_copy, from_data)
+        np.testing.assert_almost_equal([[25.0 / 6.0, np.nan], [11.0, np.nan]], to_data)
+
     def test_min_01(self):
         from_axis = DailyTimeAxisBuilder(
             start_date=date(2019, 1, 1),
@@ -614,6 +807,34 @@ class TestTimeAxisConverter(TestCase):
         self.assertAlmostEqual(14.0, to_data[1, 0], 0)
         self.assertTrue(np.isnan(to_data[2, 0]))
 
+    def test_reductions_01(self):
+        from_axis = DailyTimeAxisBuilder(
+            start_date=date(2019, 1, 1),
+            n_interval=14
+        ).build()
+
+        to_axis = WeeklyTimeAxisBuilder(
+            start_date=date(2019, 1, 1),
+            n_interval=3
+        ).build()
+
+        tc = AxisRemapper(from_axis=from_axis, to_axis=to_axis, assure_no_bound_mismatch=False)
+
+        from_data = np.random.random((3, 14, 4))
+        from_data[0, 2, 1] = np.nan
+
+        weekly_data = from_data[:, :, :].reshape((3, 2, 7, 4))
+        np.testing.assert_almost_equal(np.nansum(weekly_data, axis=2), tc.sum(from_data, dimension=1)[:, :2, :])
+        np.testing.assert_almost_equal(np.sum(~np.isnan(weekly_data), axis=2),
+                                       tc.count(from_data, dimension=1)[:, :2, :])
+        np.testing.assert_almost_equal(np.nanvar(weekly_data, axis=2), tc.var(from_data, dimension=1)[:, :2, :])
+        np.testing.assert_almost_equal(np.nanstd(weekly_data, axis=2), tc.std(from_data, dimension=1)[:, :2, :])
+        np.testing.assert_almost_equal(np.nanmin(weekly_data, axis=2), tc.min(from_data, dimension=1)[:, :2, :])
+        np.testing.assert_almost_equal(np.nanmax(weekly_data, axis=2), tc.max(from_data, dimension=1)[:, :2, :])
+
+        self.assertTrue(np.all(np.isnan(tc.sum(from_data, dimension=1)[:, 2, :])))
+        self.assertTrue(np.all(tc.count(from_data, dimension=1)[:, 2, :] == 0))
+
     def test_apply_function_01(self):
         daily_axis = DailyTimeAxisBuilder(
             start_date=date(2019, 1, 1),
@@ -634,6 +855,381 @@ class TestTimeAxisConverter(TestCase):
 
         weekly_user_defined = ac.apply_function(daily_data, user_defined_function, dimension=3)
 
+    def test_compose_01(self):
+        hourly_axis = FixedIntervalAxisBuilder(start=0, interval=1, n_interval=21 * 24).build()
+        daily_axis = FixedIntervalAxisBuilder(start=0, interval=24, n_interval=21).build()
+        weekly_axis = FixedIntervalAxisBuilder(start=0, interval=7 * 24, n_interval=3).build()
+
+        hourly_to_daily = AxisRemapper(from_axis=hourly_axis, to_axis=daily_axis)
+        daily_to_weekly = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis)
+        hourly_to_weekly = AxisRemapper.compose(hourly_to_daily, daily_to_weekly)
+
+        self.assertEqual(hourly_axis.nelem, hourly_to_weekly.from_nelem)
+        self.assertEqual(weekly_axis.nelem, hourly_to_weekly.to_nelem)
+        self.assertIs(hourly_axis, hourly_to_weekly.from_axis)
+        self.assertIs(weekly_axis, hourly_to_weekly.to_axis)
+
+        from_data = np.random.random((hourly_axis.nelem, 3, 4))
+        np.testing.assert_almost_equal(
+            daily_to_weekly.average(hourly_to_daily.average(from_data)),
+            hourly_to_weekly.average(from_data)
+        )
+        np.testing.assert_array_equal(
+            daily_to_weekly.min(hourly_to_daily.min(from_data)),
+            hourly_to_weekly.min(from_data)
+        )
+        np.testing.assert_array_equal(
+            daily_to_weekly.max(hourly_to_daily.max(from_data)),
+            hourly_to_weekly.max(from_data)
+        )
+
+        # an entirely missing day is dropped, the same as the two step remapping.
+        from_data[24:48] = np.nan
+        np.testing.assert_almost_equal(
+            daily_to_weekly.average(hourly_to_daily.average(from_data.copy())),
+            hourly_to_weekly.average(from_data.copy())
+        )
+
+    def test_compose_02(self):
+        daily_axis = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=14).build()
+        weekly_axis = WeeklyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=3).build()
+        rolling_axis = RollingWindowTimeAxisBuilder(
+            start_date=date(2019, 1, 1),
+            end_date=date(2019, 1, 15),
+            window_size=7
+        ).build()
+
+        daily_to_weekly = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis, assure_no_bound_mismatch=False)
+        weekly_to_daily = AxisRemapper(from_axis=weekly_axis, to_axis=daily_axis, assure_no_bound_mismatch=False)
+        daily_to_rolling = AxisRemapper(from_axis=daily_axis, to_axis=rolling_axis)
+
+        with self.assertRaises(ValueError):
+            AxisRemapper.compose(daily_to_weekly, daily_to_rolling)
+
+        with self.assertRaises(TypeError):
+            AxisRemapper.compose(daily_to_weekly, None)
+
+        # the third week is not covered by the daily axis
+        daily_to_daily = AxisRemapper.compose(daily_to_weekly, weekly_to_daily)
+        to_data = daily_to_daily.average(list(range(1, 15)))
+        np.testing.assert_almost_equal([4.0] * 7 + [11.0] * 7, to_data[:, 0])
+
+    def test_partition_01(self):
+        daily_axis = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=14).build()
+        weekly_axis = WeeklyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=2).build()
+        hourly_axis = FixedIntervalAxisBuilder(
+            start=int(daily_axis.lower_bound[0, 0]),
+            interval=3600 * 10 ** 6,
+            n_interval=24 * 14
+        ).build()
+
+        daily_to_weekly = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis)
+        self.assertEqual(7, daily_to_weekly._structure.group_size)
+
+        rolling_axis = RollingWindowTimeAxisBuilder(
+            start_date=date(2019, 1, 1),
+            end_date=date(2019, 1, 15),
+            window_size=7
+        ).build()
+        self.assertNotIsInstance(AxisRemapper(from_axis=daily_axis, to_axis=rolling_axis)._structure, Partition)
+
+        from_data = np.random.random((daily_axis.nelem, 3))
+        weekly_data = from_data.reshape((2, 7, 3))
+        np.testing.assert_almost_equal(weekly_data.mean(axis=1), daily_to_weekly.average(from_data))
+        np.testing.assert_almost_equal(weekly_data.sum(axis=1), daily_to_weekly.sum(from_data))
+        np.testing.assert_almost_equal(weekly_data.min(axis=1), daily_to_weekly.min(from_data))
+        np.testing.assert_almost_equal(weekly_data.max(axis=1), daily_to_weekly.max(from_data))
+
+        from_data[3, 0] = np.nan
+        weekly_data = from_data.reshape((2, 7, 3))
+        np.testing.assert_almost_equal(np.nanmean(weekly_data, axis=1), daily_to_weekly.average(from_data))
+        np.testing.assert_almost_equal(np.nanmin(weekly_data, axis=1), daily_to_weekly.min(from_data))
+
+        hourly_to_daily = AxisRemapper(from_axis=hourly_axis, to_axis=daily_axis)
+        self.assertEqual(24, hourly_to_daily._structure.group_size)
+
+    def test_sliding_window_01(self):
+        daily_axis = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=60).build()
+        rolling_axis = RollingWindowTimeAxisBuilder(
+            start_date=date(2019, 1, 1),
+            end_date=date(2019, 3, 2),
+            window_size=31
+        ).build()
+
+        tc = AxisRemapper(from_axis=daily_axis, to_axis=rolling_axis)
+        self.assertEqual(SlidingWindow(0, 1, 31), tc._structure)
+
+        from_data = np.random.random((2, daily_axis.nelem, 3))
+        from_data[0, 10:45, 1] = np.nan
+        windows = np.lib.stride_tricks.sliding_window_view(from_data, 31, axis=1)
+
+        with np.errstate(invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            np.testing.assert_almost_equal(np.nanmean(windows, axis=-1), tc.average(from_data, dimension=1))
+            np.testing.assert_almost_equal(np.nanmin(windows, axis=-1), tc.min(from_data, dimension=1))
+            np.testing.assert_almost_equal(np.nanmax(windows, axis=-1), tc.max(from_data, dimension=1))
+        np.testing.assert_almost_equal(np.sum(~np.isnan(windows), axis=-1), tc.count(from_data, dimension=1))
+
+        # the windows 10 through 14 are entirely NaN for the second column.
+        self.assertTrue(np.all(np.isnan(tc.sum(from_data, dimension=1)[0, 10:15, 1])))
+
+    def test_block_size_01(self):
+        daily_axis = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=14).build()
+        weekly_axis = WeeklyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=2).build()
+
+        from_data = np.random.random((4, 14, 3, 5))
+        from_data[1, 3, 2, 4] = np.nan
+        expected = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis)
+
+        for block_size in (1, 3, 7, "auto"):
+            tc = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis, block_size=block_size)
+            np.testing.assert_array_equal(
+                expected.average(from_data, dimension=1),
+                tc.average(from_data, dimension=1)
+            )
+            np.testing.assert_array_equal(expected.std(from_data, dimension=1), tc.std(from_data, dimension=1))
+            np.testing.assert_array_equal(
+                expected.apply_function(from_data, lambda x: np.nanmax(x, axis=0), dimension=1),
+                tc.apply_function(from_data, lambda x: np.nanmax(x, axis=0), dimension=1)
+            )
+
+        self.assertIsNone(AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis, block_size="auto").block_size)
+        self.assertRaises(ValueError, AxisRemapper, from_axis=daily_axis, to_axis=weekly_axis, block_size=0)
+
+    def test_workers_01(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        daily_axis = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=14).build()
+        weekly_axis = WeeklyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=2).build()
+
+        from_data = np.random.random((14, 7, 300))
+        from_data[3, 2, 4] = np.nan
+        serial = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis)
+        func = lambda x: np.nanmedian(x, axis=0)
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            for tc in (AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis, workers=4),
+                       AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis, executor=executor, block_size=50)):
+                np.testing.assert_array_equal(serial.average(from_data), tc.average(from_data))
+                np.testing.assert_array_equal(serial.min(from_data), tc.min(from_data))
+                np.testing.assert_array_equal(serial.max(from_data), tc.max(from_data))
+                np.testing.assert_array_equal(serial.var(from_data), tc.var(from_data))
+                np.testing.assert_array_equal(serial.apply_function(from_data, func),
+                                              tc.apply_function(from_data, func))
+
+        self.assertRaises(ValueError, AxisRemapper, from_axis=daily_axis, to_axis=weekly_axis, workers=0)
+        self.assertRaises(TypeError, AxisRemapper, from_axis=daily_axis, to_axis=weekly_axis, executor=4)
+
+    def test_processes_01(self):
+        from axisutilities import processpool
+
+        daily_axis = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=14).build()
+        weekly_axis = WeeklyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=2).build()
+        tc = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis)
+
+        from_data = np.random.random((3, 14, 5))
+        from_data[1, 3, 2] = np.nan
+        func = lambda e: np.nanstd(e, axis=0) / np.nanmean(e, axis=0)
+
+        np.testing.assert_array_equal(
+            tc.apply_function(from_data, func, dimension=1),
+            tc.apply_function(from_data, func, dimension=1, processes=2)
+        )
+        self.assertRaises(ValueError, tc.apply_function, from_data, func, dimension=1, processes=0)
+
+        # the result is written from the shared memory straight into the provided output.
+        out = np.empty((3, 2, 5))
+        self.assertIs(out, tc.apply_function(from_data, func, dimension=1, processes=2, out=out))
+        np.testing.assert_array_equal(tc.apply_function(from_data, func, dimension=1), out)
+
+        self.assertEqual([(0, 1), (1, 3), (3, 4)], processpool.split_rows(np.asarray([0, 2, 2, 4, 6]), 3))
+        self.assertEqual([(0, 4)], processpool.split_rows(np.asarray([0, 2, 2, 4, 6]), 1))
+
+        # without multiprocessing.shared_memory, i.e. before Python 3.8, processes raises a clear error.
+        with patch.object(processpool, "SHARED_MEMORY_AVAILABLE", False):
+            self.assertRaises(RuntimeError, tc.apply_function, from_data, func, dimension=1, processes=2)
+
+    def test_out_01(self):
+        import os
+        import tempfile
+
+        daily_axis = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=14).build()
+        weekly_axis = WeeklyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=2).build()
+
+        from_data = np.random.random((3, 14, 5))
+        from_data[1, 3, 2] = np.nan
+        func = lambda e: np.nanmedian(e, axis=0)
+
+        for block_size in (None, 2):
+            tc = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis, block_size=block_size)
+
+            # a non-contiguous view along the destination axis.
+            buffer = np.full((3, 6, 5), -1.0)
+            out = buffer[:, 1::3, :]
+            self.assertIs(out, tc.average(from_data, dimension=1, out=out))
+            np.testing.assert_array_equal(tc.average(from_data, dimension=1), out)
+            np.testing.assert_array_equal(-1.0, buffer[:, 0::3, :])
+
+            self.assertIs(out, tc.std(from_data, dimension=1, out=out))
+            np.testing.assert_array_equal(tc.std(from_data, dimension=1), out)
+
+            self.assertIs(out, tc.apply_function(from_data, func, dimension=1, out=out))
+            np.testing.assert_array_equal(tc.apply_function(from_data, func, dimension=1), out)
+
+            out = np.empty((3, 2, 5), dtype=np.float32)
+            tc.max(from_data, dimension=1, out=out)
+            np.testing.assert_array_equal(tc.max(from_data, dimension=1).astype(np.float32), out)
+
+        with tempfile.TemporaryDirectory() as folder:
+            out = np.memmap(os.path.join(folder, "out.dat"), dtype=np.float64, mode="w+", shape=(3, 2, 5))
+            tc.min(from_data, dimension=1, out=out)
+            np.testing.assert_array_equal(tc.min(from_data, dimension=1), out)
+
+            tc.sum(da.from_array(from_data, chunks=(3, 7, 5)), dimension=1, out=out)
+            np.testing.assert_almost_equal(tc.sum(from_data, dimension=1), out)
+            del out
+
+        out = np.empty(2)
+        tc.average(from_data[0, :, 0], out=out)
+        np.testing.assert_array_equal(tc.average(from_data[0, :, 0])[:, 0], out)
+
+        # the same holds for a one-dimensional dask array.
+        out = np.empty(2)
+        self.assertIs(out, tc.average(da.from_array(from_data[0, :, 0], chunks=5), out=out))
+        np.testing.assert_almost_equal(tc.average(from_data[0, :, 0])[:, 0], out)
+        self.assertRaises(ValueError, tc.average, da.from_array(from_data[0, :, 0], chunks=5), out=np.empty(3))
+
+        self.assertRaises(ValueError, tc.average, from_data, dimension=1, out=np.empty((3, 3, 5)))
+        self.assertRaises(TypeError, tc.average, from_data, dimension=1, out=[[0.0]])
+        read_only = np.empty((3, 2, 5))
+        read_only.flags.writeable = False
+        self.assertRaises(ValueError, tc.average, from_data, dimension=1, out=read_only)
+
+    def test_strided_input_01(self):
+        from axisutilities import axisremapper
+
+        daily_axis = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=14).build()
+        weekly_axis = WeeklyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=2).build()
+        tc = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis, block_size=4)
+
+        from_data = np.random.random((6, 5, 14))
+        from_data[1, 3, 2] = np.nan
+        expected = tc.var(np.ascontiguousarray(np.moveaxis(from_data, 2, 0)))
+
+        shared = []
+
+        def spy(reduction, weights, x, out):
+            shared.append(np.shares_memory(x, source))
+            return reduce_rows(reduction, weights, x, out)
+
+        reduce_rows = axisremapper.reduce_rows
+        with patch.object(axisremapper, "reduce_rows", side_effect=spy):
+            for source, dimension in ((from_data, 2),
+                                      (np.asfortranarray(from_data), 2),
+                                      (np.asfortranarray(np.moveaxis(from_data, 2, 0)), 0)):
+                output = tc.var(source, dimension=dimension)
+                np.testing.assert_array_equal(expected, np.moveaxis(output, dimension, 0))
+
+        # the kernels read every block in place, i.e. none of them is copied.
+        self.assertTrue(len(shared) > 3)
+        self.assertTrue(all(shared))
+
+    def test_dask_chunked_01(self):
+        daily_axis = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=59).build()
+        monthly_axis = MonthlyTimeAxisBuilder(start_year=2019, start_month=1, end_year=2019, end_month=2).build()
+        rolling_axis = RollingWindowTimeAxisBuilder(
+            start_date=date(2019, 1, 1),
+            end_date=date(2019, 3, 1),
+            window_size=9
+        ).build()
+
+        from_data = np.random.random((3, daily_axis.nelem, 2))
+        from_data[1, 20:40, 1] = np.nan
+
+        for to_axis in (monthly_axis, rolling_axis):
+            tc = AxisRemapper(from_axis=daily_axis, to_axis=to_axis)
+            for chunks in ((1, 59, 2), (2, 10, 1), (3, (5, 30, 1, 23), 2)):
+                dask_data = da.from_array(from_data, chunks=chunks)
+                for reduction in ("average", "min", "max", "sum", "count", "var", "std"):
+                    expected = getattr(tc, reduction)(from_data, dimension=1)
+                    to_data = getattr(tc, reduction)(dask_data, dimension=1)
+                    self.assertIsInstance(to_data, da.Array)
+                    self.assertEqual(expected.shape, to_data.shape)
+                    np.testing.assert_almost_equal(expected, to_data.compute(), err_msg=f"{reduction}, {chunks}")
+
+                expected = tc.apply_function(from_data, lambda e: np.nanmedian(e, axis=0), dimension=1)
+                to_data = tc.apply_function(dask_data, lambda e: np.nanmedian(e, axis=0), dimension=1)
+                np.testing.assert_almost_equal(expected, to_data.compute())
+
+    def test_dask_chunked_02(self):
+        daily_axis = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=28).build()
+        weekly_axis = WeeklyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=4).build()
+        tc = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis)
+
+        from_data = da.from_array(np.arange(28.0), chunks=5)
+        to_data = tc.average(from_data)
+
+        # the output chunks follow the destination elements and no task depends on more than one source chunk.
+        self.assertEqual(4, sum(to_data.chunks[0]))
+        graph = dict(to_data.__dask_graph__())
+        for task in graph.values():
+            if isinstance(task, tuple) and callable(task[0]):
+                arguments = [a for e in task[1:] for a in (e if isinstance(e, list) else [e])]
+                inputs = [e for e in arguments if isinstance(e, tuple) and e and e[0] == from_data.name]
+                self.assertLessEqual(len(inputs), 1)
+
+        np.testing.assert_almost_equal([[3.0], [10.0], [17.0], [24.0]], to_data.compute())
+
+    def test_dask_graph_01(self):
+        from scipy.sparse import issparse
+
+        daily_axis = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=28).build()
+        weekly_axis = WeeklyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=4).build()
+        tc = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis)
+
+        from_data = da.random.random((28, 10, 8), chunks=(5, 1, 1))
+        for to_data in (tc.max(from_data), tc.apply_function(from_data, lambda e: np.max(e, axis=0))):
+            graph = dict(to_data.__dask_graph__())
+
+            # each week overlaps at most three source chunks; the weights are stored once per slice, and not
+            # embedded in the 80 tasks per output chunk.
+            n_weights = sum(1 for v in graph.values() if issparse(v))
+            self.assertLessEqual(n_weights, 4 * 3)
+            for task in graph.values():
+                if isinstance(task, tuple):
+                    self.assertFalse(any(issparse(e) for e in task))
+
+            np.testing.assert_almost_equal(tc.max(from_data.compute()), to_data.compute())
+
+    def test_dask_tree_reduction_01(self):
+        hourly_axis = FixedIntervalAxisBuilder(start=0, interval=1, n_interval=24 * 60).build()
+        monthly_axis = FixedIntervalAxisBuilder(start=0, interval=24 * 30, n_interval=2).build()
+        tc = AxisRemapper(from_axis=hourly_axis, to_axis=monthly_axis)
+
+        from_data = np.random.random((hourly_axis.nelem, 3))
+        from_data[100:200, 1] = np.nan
+        dask_data = da.from_array(from_data, chunks=(24, 3))
+
+        for split_every in (2, 3, 8):
+            with patch.object(AxisRemapper, "dask_split_every", split_every):
+                for reduction in ("min", "max", "sum", "count", "average", "std"):
+                    to_data = getattr(tc, reduction)(dask_data)
+
+                    # each month spans 30 source chunks; no task merges more than `split_every` of them.
+                    graph = dict(to_data.__dask_graph__())
+                    for task in graph.values():
+                        if isinstance(task, tuple):
+                            for e in task[1:]:
+                                if isinstance(e, list):
+                                    self.assertLessEqual(len(e), split_every)
+
+                    np.testing.assert_almost_equal(getattr(tc, reduction)(from_data), to_data.compute(),
+                                                   err_msg=f"{reduction}, {split_every}")
+
+        with patch.object(AxisRemapper, "dask_split_every", 1):
+            with self.assertRaises(ValueError):
+                tc.max(dask_data)
+
     @skip
     def test_speed_01(self):
         from_axis = DailyTimeAxisBuilder(
@@ -794,6 +1390,31 @@ class TestTimeAxisConverter(TestCase):
             np.asarray([3] * 12 + [10]*12).reshape(2, 3, 4)
         )
 
+    def test_dask_array_06(self):
+        daily_axis = DailyTimeAxisBuilder(
+            start_date=date(2019, 1, 1),
+            n_interval=14
+        ).build()
+
+        weekly_axis = WeeklyTimeAxisBuilder(
+            start_date=date(2019, 1, 1),
+            n_interval=2
+        ).build()
+
+        tc = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis)
+
+        # a negative dimension, with the source axis split into chunks that straddle the weeks.
+        x = np.random.random((3, 14))
+        expected = tc.average(x, dimension=-1)
+        for reduction in ("average", "max"):
+            to_data = getattr(tc, reduction)(da.from_array(x, chunks=(1, 5)), dimension=-1)
+            self.assertTrue(isinstance(to_data, da.Array))
+            np.testing.assert_almost_equal(getattr(tc, reduction)(x, dimension=-1), to_data.compute())
+        np.testing.assert_almost_equal(expected, tc.average(da.from_array(x, chunks=(1, 7)), dimension=-1).compute())
+
+        to_data = tc.average(da.from_array(x[0, :], chunks=5), dimension=-1).compute()
+        np.testing.assert_almost_equal(expected[0, :], to_data[:, 0])
+
     def test_dask_min(self):
         from_axis = DailyTimeAxisBuilder(
             start_date=date(2019, 1, 1),
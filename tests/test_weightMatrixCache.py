@@ -0,0 +1,156 @@
+from datetime import date
+from unittest import TestCase
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from axisutilities import Axis, AxisRemapper, WeightMatrixCache, WeightMatrixStore, DailyTimeAxisBuilder, \
+    WeeklyTimeAxisBuilder
+
+
+class TestWeightMatrixCache(TestCase):
+    def setUp(self) -> None:
+        AxisRemapper.weight_cache.clear(reset_stats=True)
+        AxisRemapper.weight_cache.enabled = True
+
+    def tearDown(self) -> None:
+        AxisRemapper.weight_cache.clear(reset_stats=True)
+        AxisRemapper.weight_cache.enabled = True
+
+    @staticmethod
+    def _build_axes():
+        daily_axis = DailyTimeAxisBuilder(
+            start_date=date(2019, 1, 1),
+            n_interval=14
+        ).build()
+
+        weekly_axis = WeeklyTimeAxisBuilder(
+            start_date=date(2019, 1, 1),
+            n_interval=2
+        ).build()
+
+        return daily_axis, weekly_axis
+
+    def test_fingerprint_01(self):
+        axis1 = Axis(lower_bound=[0, 24], upper_bound=[24, 48], fraction=0.5)
+        axis2 = Axis(lower_bound=[0, 24], upper_bound=[24, 48], fraction=0.0)
+        axis3 = Axis(lower_bound=[0, 24], upper_bound=[24, 49], fraction=0.5)
+
+        self.assertEqual(WeightMatrixCache.axis_fingerprint(axis1), WeightMatrixCache.axis_fingerprint(axis2))
+        self.assertNotEqual(WeightMatrixCache.axis_fingerprint(axis1), WeightMatrixCache.axis_fingerprint(axis3))
+
+    def test_remapper_01(self):
+        daily_axis, weekly_axis = self._build_axes()
+        tc1 = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis)
+
+        # Building the axes again, so that the cache is hit based on the content and not the object.
+        daily_axis, weekly_axis = self._build_axes()
+        tc2 = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis)
+
+        stats = AxisRemapper.weight_cache.stats
+        self.assertEqual(1, stats["hits"])
+        self.assertEqual(1, stats["misses"])
+        self.assertEqual(1, stats["entries"])
+        self.assertIs(tc1._weight_matrix, tc2._weight_matrix)
+
+        np.testing.assert_almost_equal(tc1.average(np.arange(14)), tc2.average(np.arange(14)))
+
+    def test_remapper_02(self):
+        daily_axis, weekly_axis = self._build_axes()
+        tc1 = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis, use_cache=False)
+        tc2 = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis, use_cache=False)
+
+        self.assertIsNot(tc1._weight_matrix, tc2._weight_matrix)
+        self.assertEqual(0, len(AxisRemapper.weight_cache))
+
+        AxisRemapper.weight_cache.enabled = False
+        AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis)
+        self.assertEqual({'hits': 0, 'misses': 0, 'evictions': 0, 'entries': 0, 'nbytes': 0},
+                         AxisRemapper.weight_cache.stats)
+
+    def test_eviction_01(self):
+        cache = WeightMatrixCache(max_entries=2)
+        matrices = [csr_matrix(np.eye(3) * i) for i in range(1, 4)]
+
+        cache.put("a", matrices[0])
+        cache.put("b", matrices[1])
+        self.assertIs(matrices[0], cache.get("a"))  # "b" is now the least recently used
+        cache.put("c", matrices[2])
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(1, cache.stats["evictions"])
+
+    def test_eviction_02(self):
+        matrix = csr_matrix(np.eye(10))
+        nbytes = WeightMatrixCache.nbytes_of(matrix)
+        cache = WeightMatrixCache(max_bytes=2 * nbytes)
+
+        cache.put("a", matrix)
+        cache.put("b", matrix.copy())
+        cache.put("c", matrix.copy())
+        self.assertEqual(2, len(cache))
+        self.assertEqual(2 * nbytes, cache.stats["nbytes"])
+        self.assertNotIn("a", cache)
+
+        # matrices larger than max_bytes are never stored.
+        cache.put("d", csr_matrix(np.eye(100)))
+        self.assertNotIn("d", cache)
+
+        cache.max_bytes = nbytes
+        self.assertEqual(1, len(cache))
+
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.stats["nbytes"])
+        self.assertEqual(2, cache.stats["evictions"])
+
+
+class TestWeightMatrixStore(TestCase):
+    def setUp(self) -> None:
+        import tempfile
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        AxisRemapper.weight_cache.clear(reset_stats=True)
+
+    def tearDown(self) -> None:
+        self._tmp_dir.cleanup()
+        AxisRemapper.weight_cache.clear(reset_stats=True)
+
+    def test_save_load_01(self):
+        store = WeightMatrixStore(self._tmp_dir.name)
+        matrix = csr_matrix(np.asarray([[1.0, 0.0, 0.5], [0.0, 0.25, 0.0]]))
+
+        self.assertIsNone(store.load("key"))
+        store.save("key", matrix)
+        self.assertIn("key", store)
+
+        loaded = store.load("key")
+        self.assertEqual(matrix.shape, loaded.shape)
+        self.assertEqual(0, (matrix != loaded).nnz)
+        for array in (loaded.data, loaded.indices, loaded.indptr):
+            self.assertFalse(array.flags.owndata)
+            self.assertFalse(array.flags.writeable)
+
+        store.remove("key")
+        self.assertNotIn("key", store)
+
+    def test_remapper_01(self):
+        daily_axis = DailyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=14).build()
+        weekly_axis = WeeklyTimeAxisBuilder(start_date=date(2019, 1, 1), n_interval=2).build()
+
+        tc1 = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis, use_cache=False,
+                           weight_store=self._tmp_dir.name)
+        self.assertIn(WeightMatrixStore.make_key(daily_axis, weekly_axis), WeightMatrixStore(self._tmp_dir.name))
+
+        tc2 = AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis, use_cache=False,
+                           weight_store=WeightMatrixStore(self._tmp_dir.name))
+        self.assertFalse(tc2._weight_matrix.data.flags.writeable)
+        self.assertEqual(0, (tc1.weights != tc2.weights).nnz)
+
+        from_data = np.arange(14, dtype="float64")
+        np.testing.assert_almost_equal(tc1.average(from_data), tc2.average(from_data))
+        np.testing.assert_almost_equal(from_data, np.arange(14, dtype="float64"))
+
+        with self.assertRaises(TypeError):
+            AxisRemapper(from_axis=daily_axis, to_axis=weekly_axis, use_cache=False, weight_store=42)